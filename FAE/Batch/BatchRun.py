@@ -0,0 +1,297 @@
+'''
+The headless batch runner of the FAE pipelines. The run is described by a JSON config, and it does not import any Qt
+module, so it could be scheduled on the compute nodes without the display.
+
+    python -m FAE.Batch.BatchRun run config.json
+    python -m FAE.Batch.BatchRun check config.json
+    python -m FAE.Batch.BatchRun example > config.json
+
+The progress is printed to stderr, and the summary is printed to stdout as one JSON line and stored in
+batch_summary.json of the store folder. The exit code is one of EXIT_CODE_DICT.
+'''
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import contextlib
+
+# Use the non-interactive backend, so the visualization modules do not load the GUI toolkit of matplotlib.
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+EXIT_SUCCESS = 0
+EXIT_FAILURE = 1
+EXIT_CONFIG_ERROR = 2
+EXIT_CANCELLED = 3
+EXIT_CODE_DICT = {'success': EXIT_SUCCESS, 'failure': EXIT_FAILURE, 'config_error': EXIT_CONFIG_ERROR,
+                  'cancelled': EXIT_CANCELLED}
+
+NORMALIZER_NAME_LIST = ['NormNone', 'NormUnit', 'Norm0Center', 'Norm0CenterUnit']
+DIMENSION_REDUCTION_NAME_LIST = ['PCA', 'Cos']
+FEATURE_SELECTOR_NAME_LIST = ['ANOVA', 'RFE', 'Relief']
+CLASSIFIER_NAME_LIST = ['SVM', 'LDA', 'AE', 'RF', 'LR', 'LRLasso', 'AB', 'DT', 'NB', 'GP']
+CROSS_VALIDATION_NAME_LIST = ['LeaveOneOut', '5-Folder', '10-Folder']
+OUTPUT_FORMAT_LIST = ['npy', 'archive']
+
+# The names are the same as GetName of the components, which are also used in pipeline_info.csv.
+EXAMPLE_CONFIG = {'train_data': 'train_numeric_feature.csv',
+                  'test_data': '',
+                  'store_folder': 'result',
+                  'normalizer': ['Norm0CenterUnit'],
+                  'dimension_reduction': ['PCA'],
+                  'feature_selector': ['ANOVA', 'Relief'],
+                  'feature_number': [1, 10],
+                  'classifier': ['SVM', 'LR'],
+                  'cross_validation': '5-Folder',
+                  'worker_number': 1,
+                  'output_format': 'npy',
+                  'is_overwrite': False}
+REQUIRED_KEY_LIST = ['train_data', 'store_folder', 'feature_selector', 'feature_number', 'classifier']
+# The dimension reduction of FeatureAnalysisPipelines is Cos if none is given.
+DEFAULT_CONFIG = {'test_data': '',
+                  'normalizer': ['NormNone'],
+                  'dimension_reduction': [],
+                  'cross_validation': '5-Folder',
+                  'worker_number': 1,
+                  'output_format': 'npy',
+                  'is_overwrite': False}
+
+
+class ConfigError(Exception):
+    pass
+
+
+def _CheckNameList(config, key, name_list, is_required=True):
+    value = config.get(key, [])
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        raise ConfigError('{} should be a list of the names.'.format(key))
+    if is_required and len(value) == 0:
+        raise ConfigError('{} should not be empty.'.format(key))
+    unknown_name = [name for name in value if name not in name_list]
+    if unknown_name:
+        raise ConfigError('Unknown {}: {}. Choose from {}.'.format(key, unknown_name, name_list))
+    return value
+
+def _GetFeatureNumberList(value):
+    '''
+    The feature number is given by [min, max] (both included), or {"list": [the feature numbers]}.
+    '''
+    if isinstance(value, dict) and isinstance(value.get('list'), list):
+        number_list = value['list']
+    elif isinstance(value, list) and len(value) == 2:
+        number_list = list(range(value[0], value[1] + 1)) if all(isinstance(temp, int) for temp in value) else []
+    else:
+        number_list = []
+    if len(number_list) == 0 or not all(isinstance(temp, int) and temp > 0 for temp in number_list):
+        raise ConfigError('feature_number should be [min, max] or {"list": [...]} of the positive integers.')
+    return number_list
+
+def LoadConfig(config_path):
+    '''
+    Load and check the config.
+    :return: The config dict, where the missing optional items are filled by the default values.
+    :raise ConfigError: If the config is not valid.
+    '''
+    try:
+        with open(config_path, 'r') as file:
+            raw_config = json.load(file)
+    except (IOError, ValueError) as e:
+        raise ConfigError('Could not load the config {}: {}'.format(config_path, e))
+    if not isinstance(raw_config, dict):
+        raise ConfigError('The config should be a JSON object.')
+
+    unknown_key = sorted(set(raw_config.keys()) - set(EXAMPLE_CONFIG.keys()))
+    if unknown_key:
+        raise ConfigError('Unknown config items: {}'.format(unknown_key))
+
+    # The relative paths are relative to the folder of the config.
+    config_folder = os.path.dirname(os.path.abspath(config_path))
+    missing_key = [key for key in REQUIRED_KEY_LIST if key not in raw_config]
+    if missing_key:
+        raise ConfigError('Missing config items: {}'.format(missing_key))
+    config = dict(DEFAULT_CONFIG)
+    config.update(raw_config)
+    for key in ['train_data', 'store_folder', 'test_data']:
+        if not isinstance(config[key], str):
+            raise ConfigError('{} should be a path.'.format(key))
+    for key in ['train_data', 'test_data', 'store_folder']:
+        if config[key]:
+            config[key] = os.path.join(config_folder, os.path.expanduser(config[key]))
+    for key in ['train_data', 'test_data']:
+        if config[key] and not os.path.isfile(config[key]):
+            raise ConfigError('{} does not exist: {}'.format(key, config[key]))
+
+    config['normalizer'] = _CheckNameList(config, 'normalizer', NORMALIZER_NAME_LIST)
+    config['dimension_reduction'] = _CheckNameList(config, 'dimension_reduction', DIMENSION_REDUCTION_NAME_LIST,
+                                                   is_required=False)
+    config['feature_selector'] = _CheckNameList(config, 'feature_selector', FEATURE_SELECTOR_NAME_LIST)
+    config['classifier'] = _CheckNameList(config, 'classifier', CLASSIFIER_NAME_LIST)
+    config['feature_number'] = _GetFeatureNumberList(config['feature_number'])
+    if config['cross_validation'] not in CROSS_VALIDATION_NAME_LIST:
+        raise ConfigError('Unknown cross_validation: {}. Choose from {}.'.format(config['cross_validation'],
+                                                                                CROSS_VALIDATION_NAME_LIST))
+    if not isinstance(config['is_overwrite'], bool):
+        raise ConfigError('is_overwrite should be true or false.')
+    if not isinstance(config['worker_number'], int) or config['worker_number'] < 1:
+        raise ConfigError('worker_number should be a positive integer.')
+    if config['output_format'] not in OUTPUT_FORMAT_LIST:
+        raise ConfigError('Unknown output_format: {}. Choose from {}.'.format(config['output_format'],
+                                                                             OUTPUT_FORMAT_LIST))
+    return config
+
+def SetWorkerNumber(worker_number):
+    '''
+    The pipelines run one by one, the worker number limits the threads of the numerical libraries. It must be set
+    before numpy is imported.
+    '''
+    for key in ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS']:
+        os.environ.setdefault(key, str(worker_number))
+
+def LoadDataContainer(file_path):
+    from FAE.DataContainer.DataContainer import DataContainer
+    data_container = DataContainer()
+    if file_path.endswith('.npz'):
+        data_container.LoadBinary(file_path)
+    else:
+        data_container.Load(file_path)
+    if data_container.IsEmpty():
+        raise ConfigError('Could not load the data: {}'.format(file_path))
+    return data_container
+
+def GeneratePipelines(config):
+    from FAE.FeatureAnalysis.IndexDict import Index2Dict
+    from FAE.FeatureAnalysis.FeatureSelector import FeatureSelectPipeline
+    from FAE.FeatureAnalysis.FeaturePipeline import FeatureAnalysisPipelines
+
+    index_dict = Index2Dict()
+    return FeatureAnalysisPipelines(
+        normalizer_list=[index_dict.GetInstantByIndex(name) for name in config['normalizer']],
+        dimension_reduction_list=[index_dict.GetInstantByIndex(name) for name in config['dimension_reduction']],
+        feature_selector_list=[FeatureSelectPipeline([index_dict.GetInstantByIndex(name)])
+                               for name in config['feature_selector']],
+        feature_selector_num_list=config['feature_number'],
+        classifier_list=[index_dict.GetInstantByIndex(name) for name in config['classifier']],
+        cross_validation=index_dict.GetInstantByIndex(config['cross_validation']),
+        is_archive_prediction=config['output_format'] == 'archive')
+
+def PrepareStoreFolder(store_folder, is_overwrite):
+    if os.path.isdir(store_folder) and len(os.listdir(store_folder)) > 0:
+        if not is_overwrite:
+            raise ConfigError('The store folder is not empty: {}. Set is_overwrite to clear it.'.format(store_folder))
+        import shutil
+        for file in os.listdir(store_folder):
+            if os.path.isdir(os.path.join(store_folder, file)):
+                shutil.rmtree(os.path.join(store_folder, file))
+            else:
+                os.remove(os.path.join(store_folder, file))
+    os.makedirs(store_folder, exist_ok=True)
+    # The mark of the result folder, which the Visualization and the Report of the GUI check.
+    with open(os.path.join(store_folder, '.FAEresult4129074093819729087'), 'wb'):
+        pass
+
+def GenerateSummary(fae, status, start_time, finished_number, total_number, store_folder, message=''):
+    summary = {'status': status, 'exit_code': EXIT_CODE_DICT[status], 'message': message,
+               'store_folder': store_folder, 'finished_pipeline_number': finished_number,
+               'total_pipeline_number': total_number, 'elapsed_second': round(time.perf_counter() - start_time, 3)}
+    if fae is not None and finished_number > 0:
+        top_list = fae.GetAUCAggregate()['val'].GetTop(1)
+        if top_list:
+            value, index = top_list[0]
+            summary['best_pipeline'] = fae.GetPipelineName(index)
+            summary['best_val_auc'] = float(value)
+            for data_type in ['train', 'test']:
+                auc = float(fae.GetAUCMetric()[data_type][index])
+                if auc > 0:
+                    summary['best_{}_auc'.format(data_type)] = auc
+    return summary
+
+def Run(config):
+    '''
+    Run the pipelines of the config. SIGINT and SIGTERM cancel the run after the running fold, and the finished
+    pipelines are kept.
+    :return: The summary dict.
+    '''
+    start_time = time.perf_counter()
+    SetWorkerNumber(config['worker_number'])
+    fae, finished_number, total_number = None, 0, 0
+    try:
+        train_data_container = LoadDataContainer(config['train_data'])
+        if config['test_data']:
+            test_data_container = LoadDataContainer(config['test_data'])
+        else:
+            from FAE.DataContainer.DataContainer import DataContainer
+            test_data_container = DataContainer()
+        fae = GeneratePipelines(config)
+        PrepareStoreFolder(config['store_folder'], config['is_overwrite'])
+    except ConfigError as e:
+        return GenerateSummary(fae, 'config_error', start_time, 0, 0, config['store_folder'], str(e))
+
+    run_control = fae.GetRunControl()
+    def Cancel(signal_number, frame):
+        print('Signal {} is received, the run would be cancelled.'.format(signal_number), file=sys.stderr)
+        run_control.Cancel()
+    former_handler_dict = {}
+    for signal_number in [signal.SIGINT, signal.SIGTERM]:
+        former_handler_dict[signal_number] = signal.signal(signal_number, Cancel)
+
+    try:
+        for progress in fae.Run(train_data_container, test_data_container, config['store_folder']):
+            finished_number, total_number = progress.current_number - 1, progress.total_number
+            print('[{:d}/{:d}] {}_{}_{}_{}_{} {}'.format(
+                progress.current_number, progress.total_number, progress.normalizer_name,
+                progress.dimension_reduction_name, progress.feature_selector_name, progress.feature_number,
+                progress.classifier_name, progress.GetStatusText().replace('\n', ', ')), file=sys.stderr)
+        finished_number = fae.GetFinishedNumber()
+    except Exception as e:
+        return GenerateSummary(fae, 'failure', start_time, finished_number, total_number, config['store_folder'],
+                               '{}: {}'.format(type(e).__name__, e))
+    finally:
+        for signal_number, handler in former_handler_dict.items():
+            signal.signal(signal_number, handler)
+
+    # A signal which arrives after the last pipeline finished does not drop any pipeline.
+    status = 'success' if finished_number == total_number else 'cancelled'
+    return GenerateSummary(fae, status, start_time, finished_number, total_number, config['store_folder'])
+
+def main():
+    parser = argparse.ArgumentParser(description='The headless batch runner of the FAE pipelines.')
+    sub_parsers = parser.add_subparsers(dest='command')
+
+    run_parser = sub_parsers.add_parser('run', help='Run the pipelines of the config.')
+    run_parser.add_argument('config', help='The path of the JSON config.')
+    check_parser = sub_parsers.add_parser('check', help='Check the config without running.')
+    check_parser.add_argument('config', help='The path of the JSON config.')
+    sub_parsers.add_parser('example', help='Print an example config.')
+
+    args = parser.parse_args()
+    if args.command == 'example':
+        print(json.dumps(EXAMPLE_CONFIG, indent=2))
+        return EXIT_SUCCESS
+    if args.command not in ['run', 'check']:
+        parser.print_help()
+        return EXIT_CONFIG_ERROR
+
+    try:
+        config = LoadConfig(args.config)
+    except ConfigError as e:
+        print(json.dumps({'status': 'config_error', 'exit_code': EXIT_CONFIG_ERROR, 'message': str(e)}))
+        return EXIT_CONFIG_ERROR
+
+    if args.command == 'check':
+        print(json.dumps({'status': 'success', 'exit_code': EXIT_SUCCESS, 'config': config}))
+        return EXIT_SUCCESS
+
+    # The messages of the FAE modules are printed to stderr, so stdout only has the summary.
+    with contextlib.redirect_stdout(sys.stderr):
+        summary = Run(config)
+    if os.path.isdir(config['store_folder']) and summary['status'] != 'config_error':
+        with open(os.path.join(config['store_folder'], 'batch_summary.json'), 'w') as file:
+            json.dump(summary, file, indent=2)
+    print(json.dumps(summary))
+    return summary['exit_code']
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,333 @@
+'''
+The benchmark of the FAE analysis engine. Each benchmark case runs a stage (or a grid of pipelines) on the seeded
+synthetic data in a new process, and the wall time and the peak resident memory are appended to a JSON history with the
+git commit. Two commits in the history could be compared to find the regressions. The startup cases time the import of
+the main modules in a new interpreter.
+
+    python -m FAE.Benchmark.Benchmark list
+    python -m FAE.Benchmark.Benchmark run --size small medium --repeat 3
+    python -m FAE.Benchmark.Benchmark compare <base commit> <new commit> --threshold 0.1
+'''
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+from copy import deepcopy
+
+import numpy as np
+
+from FAE.Benchmark.SyntheticData import GenerateDataBySize, DATA_SIZE_DICT
+
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The history is ignored by git (.gitignore), so it is kept when the commits to compare are checked out.
+DEFAULT_HISTORY_PATH = os.path.join(REPO_FOLDER, 'benchmark_history.json')
+
+
+def _RunRelief(data_container, work_folder):
+    from FAE.FeatureAnalysis.FeatureSelector import FeatureSelectByRelief
+    FeatureSelectByRelief(10).Run(data_container)
+
+def _RunCos(data_container, work_folder):
+    from FAE.FeatureAnalysis.DimensionReduction import DimensionReductionByCos
+    DimensionReductionByCos().Run(data_container)
+
+def _RunANOVA(data_container, work_folder):
+    from FAE.FeatureAnalysis.FeatureSelector import FeatureSelectByANOVA
+    FeatureSelectByANOVA(10).Run(data_container)
+
+def _RunRFE(data_container, work_folder):
+    from FAE.FeatureAnalysis.FeatureSelector import FeatureSelectByRFE
+    FeatureSelectByRFE(10).Run(data_container)
+
+def _RunAUCConfidenceInterval(data_container, work_folder):
+    from FAE.Func.Metric import AUC_Confidence_Interval
+    label = data_container.GetLabel()
+    prediction = np.random.RandomState(0).rand(len(label)) * 0.5 + label * 0.5
+    AUC_Confidence_Interval(label, prediction)
+
+def _RunCrossValidation(data_container, work_folder):
+    from FAE.FeatureAnalysis.Classifier import SVM
+    from FAE.FeatureAnalysis.CrossValidation import CrossValidation5Folder
+    from FAE.FeatureAnalysis.FeatureSelector import FeatureSelector
+    from FAE.FeatureAnalysis.Normalizer import NormalizerZeroCenterAndUnit
+    # The SVM hardly converges on the raw radiomics scales, so the features are normalized like the pipelines do.
+    data_container = NormalizerZeroCenterAndUnit().Run(data_container)
+    selected_data_container = FeatureSelector().SelectFeatureByIndex(data_container, list(range(10)), is_replace=False)
+    cv = CrossValidation5Folder()
+    cv.SetClassifier(SVM())
+    cv.Run(selected_data_container)
+
+# The pipelines of each grid: (normalizer, dimension reduction, feature selector, classifier) names and the max number of
+# the selected features.
+GRID_DICT = {'small': (['NormalizerZeroCenter'], ['DimensionReductionByCos'], ['FeatureSelectByANOVA'], ['SVM'], 3),
+             'medium': (['NormalizerZeroCenter'], ['DimensionReductionByCos'],
+                        ['FeatureSelectByANOVA', 'FeatureSelectByRelief'], ['SVM', 'LR'], 5),
+             'large': (['NormalizerZeroCenter', 'NormalizerZeroCenterAndUnit'],
+                       ['DimensionReductionByCos', 'DimensionReductionByPCA'],
+                       ['FeatureSelectByANOVA', 'FeatureSelectByRelief'], ['SVM', 'LR'], 10)}
+
+def _RunGrid(grid_name):
+    def RunGrid(data_container, work_folder):
+        from FAE.FeatureAnalysis import Normalizer, DimensionReduction, FeatureSelector, Classifier
+        from FAE.FeatureAnalysis.CrossValidation import CrossValidation5Folder
+        from FAE.FeatureAnalysis.FeaturePipeline import FeatureAnalysisPipelines
+
+        normalizer_name, dimension_reduction_name, feature_selector_name, classifier_name, max_feature_number = \
+            GRID_DICT[grid_name]
+        fae = FeatureAnalysisPipelines(
+            normalizer_list=[getattr(Normalizer, name)() for name in normalizer_name],
+            dimension_reduction_list=[getattr(DimensionReduction, name)() for name in dimension_reduction_name],
+            feature_selector_list=[getattr(FeatureSelector, name)() for name in feature_selector_name],
+            feature_selector_num_list=list(range(1, max_feature_number + 1)),
+            classifier_list=[getattr(Classifier, name)() for name in classifier_name],
+            cross_validation=CrossValidation5Folder())
+        for _ in fae.Run(data_container, store_folder=work_folder):
+            pass
+    return RunGrid
+
+# The modules whose import is timed by the startup cases. Each import runs in a new interpreter, since the modules are
+# cached in the benchmark process, so the time includes the start of the interpreter. The memory is of the benchmark
+# process.
+STARTUP_DICT = {'index_dict': 'FAE.FeatureAnalysis.IndexDict',
+                'pipeline': 'FAE.FeatureAnalysis.FeaturePipeline',
+                'batch': 'FAE.Batch.BatchRun',
+                'gui': 'MainFrameCall'}
+
+def _RunStartup(module_name):
+    def RunStartup(data_container, work_folder):
+        subprocess.check_call([sys.executable, '-c', 'import {}'.format(module_name)], cwd=REPO_FOLDER)
+    return RunStartup
+
+STAGE_DICT = {'relief': _RunRelief,
+              'cos': _RunCos,
+              'anova': _RunANOVA,
+              'rfe': _RunRFE,
+              'auc_ci': _RunAUCConfidenceInterval,
+              'cv': _RunCrossValidation}
+
+def GetCaseDict():
+    '''
+    :return: The dict of the case name and (the function, the data size). Each stage runs on each data size, the
+    grids run on the medium data, and the startup cases do not use the data.
+    '''
+    case_dict = {}
+    for stage_name, function in STAGE_DICT.items():
+        for size_name in DATA_SIZE_DICT.keys():
+            case_dict['{}_{}'.format(stage_name, size_name)] = (function, size_name)
+    for grid_name in GRID_DICT.keys():
+        case_dict['grid_{}'.format(grid_name)] = (_RunGrid(grid_name), 'medium')
+    for startup_name, module_name in STARTUP_DICT.items():
+        case_dict['startup_{}'.format(startup_name)] = (_RunStartup(module_name), 'small')
+    return case_dict
+
+def GetPeakMemory():
+    '''
+    :return: The peak resident memory of the current process (MB).
+    '''
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024. / 1024. if sys.platform == 'darwin' else peak / 1024.
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024. / 1024.
+    except Exception:
+        return float('nan')
+
+def _RunCaseInProcess(case_name, repeat, warmup, random_seed, result_queue):
+    try:
+        import warnings
+        warnings.filterwarnings('ignore')
+
+        function, size_name = GetCaseDict()[case_name]
+        data_container = GenerateDataBySize(size_name, random_seed)
+        base_memory = GetPeakMemory()
+
+        time_list = []
+        for repeat_index in range(warmup + repeat):
+            input_data_container = deepcopy(data_container)
+            work_folder = tempfile.mkdtemp(prefix='fae_benchmark_')
+            try:
+                start_time = time.perf_counter()
+                function(input_data_container, work_folder)
+                if repeat_index >= warmup:
+                    time_list.append(time.perf_counter() - start_time)
+            finally:
+                shutil.rmtree(work_folder, ignore_errors=True)
+
+        result_queue.put({'wall_time': float(np.median(time_list)), 'min_time': float(np.min(time_list)),
+                          'time_list': time_list, 'peak_rss_mb': GetPeakMemory(), 'base_rss_mb': base_memory})
+    except Exception as e:
+        result_queue.put({'error': '{}: {}'.format(type(e).__name__, e)})
+
+def RunCase(case_name, repeat=3, warmup=1, random_seed=0):
+    '''
+    Run one benchmark case in a new process, so the peak memory is not affected by the other cases. The first warmup
+    runs (lazy imports, first calls of the libraries) are not timed.
+    :return: The dict of the wall time (the median and the min of the repeats, second) and the peak memory (MB).
+    '''
+    context = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+    process = context.Process(target=_RunCaseInProcess, args=(case_name, repeat, warmup, random_seed, result_queue))
+    process.start()
+    while True:
+        try:
+            result = result_queue.get(timeout=1.)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                result = {'error': 'The process exited with code {}'.format(process.exitcode)}
+                break
+    process.join()
+    return result
+
+def GetCommit():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_FOLDER,
+                                         stderr=subprocess.DEVNULL).decode().strip()
+        status = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_FOLDER,
+                                         stderr=subprocess.DEVNULL).decode().strip()
+        return commit, status != ''
+    except Exception:
+        return '', False
+
+def LoadHistory(history_path):
+    if not os.path.exists(history_path):
+        return []
+    with open(history_path, 'r') as file:
+        return json.load(file)
+
+def SaveHistory(history, history_path):
+    temp_path = history_path + '.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump(history, file, indent=2)
+    os.replace(temp_path, history_path)
+
+def Run(case_name_list, repeat=3, warmup=1, random_seed=0, history_path=DEFAULT_HISTORY_PATH):
+    '''
+    Run the benchmark cases and append the results to the history.
+    :return: The record of this run.
+    '''
+    import sklearn
+    commit, is_dirty = GetCommit()
+    record = {'commit': commit, 'dirty': is_dirty, 'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+              'python': platform.python_version(), 'platform': platform.platform(),
+              'numpy': np.__version__, 'sklearn': sklearn.__version__,
+              'repeat': repeat, 'warmup': warmup, 'random_seed': random_seed, 'results': {}}
+
+    for case_name in case_name_list:
+        result = RunCase(case_name, repeat, warmup, random_seed)
+        record['results'][case_name] = result
+        if 'error' in result:
+            print('{:<20s} failed: {}'.format(case_name, result['error']))
+        else:
+            print('{:<20s} {:10.4f} s (min {:.4f} s) {:10.1f} MB'.format(
+                case_name, result['wall_time'], result['min_time'], result['peak_rss_mb']))
+
+    history = LoadHistory(history_path)
+    history.append(record)
+    SaveHistory(history, history_path)
+    return record
+
+def FindRecord(history, commit):
+    '''
+    :return: The last record whose commit starts with the given commit (or the index in the history, e.g. -1).
+    '''
+    for record in reversed(history):
+        if commit and record['commit'].startswith(commit):
+            return record
+    try:
+        return history[int(commit)]
+    except (ValueError, IndexError):
+        return None
+
+def Compare(base_commit, new_commit, threshold=0.1, history_path=DEFAULT_HISTORY_PATH):
+    '''
+    Compare the results of two commits. A case is flagged as a regression if its minimal wall time (or the peak memory)
+    increases more than the threshold.
+    :return: The list of the regression cases.
+    '''
+    history = LoadHistory(history_path)
+    base_record, new_record = FindRecord(history, base_commit), FindRecord(history, new_commit)
+    if base_record is None or new_record is None:
+        print('Check the commits, they could not be found in the history: ', history_path)
+        return None
+
+    print('Base: {} ({})'.format(base_record['commit'][:10], base_record['time']))
+    print('New:  {} ({})'.format(new_record['commit'][:10], new_record['time']))
+    print('{:<20s} {:>10s} {:>10s} {:>8s} {:>10s} {:>10s}'.format('Case', 'Base(s)', 'New(s)', 'Ratio',
+                                                               'Base(MB)', 'New(MB)'))
+
+    regression_list = []
+    for case_name in sorted(set(base_record['results']) & set(new_record['results'])):
+        base_result, new_result = base_record['results'][case_name], new_record['results'][case_name]
+        if 'error' in base_result or 'error' in new_result:
+            print('{:<20s} skipped (failed in one of the runs)'.format(case_name))
+            continue
+
+        time_ratio = new_result['min_time'] / max(base_result['min_time'], 1e-9)
+        memory_ratio = new_result['peak_rss_mb'] / max(base_result['peak_rss_mb'], 1e-9)
+        flag = ''
+        if time_ratio > 1 + threshold or memory_ratio > 1 + threshold:
+            flag = 'REGRESSION'
+            regression_list.append(case_name)
+        elif time_ratio < 1 - threshold:
+            flag = 'improved'
+        print('{:<20s} {:10.4f} {:10.4f} {:8.2f} {:10.1f} {:10.1f} {}'.format(
+            case_name, base_result['min_time'], new_result['min_time'], time_ratio,
+            base_result['peak_rss_mb'], new_result['peak_rss_mb'], flag))
+    return regression_list
+
+def main():
+    parser = argparse.ArgumentParser(description='The benchmark of the FAE analysis engine.')
+    parser.add_argument('--history', default=DEFAULT_HISTORY_PATH, help='The path of the JSON history.')
+    sub_parsers = parser.add_subparsers(dest='command')
+
+    sub_parsers.add_parser('list', help='List the benchmark cases.')
+
+    run_parser = sub_parsers.add_parser('run', help='Run the benchmark cases and append the results to the history.')
+    run_parser.add_argument('--case', nargs='*', default=[],
+                            help='The case names. All cases of the sizes and the startup cases by default.')
+    run_parser.add_argument('--size', nargs='*', default=['small', 'medium'], help='The data / grid sizes to run.')
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--warmup', type=int, default=1, help='The number of the runs before timing.')
+    run_parser.add_argument('--seed', type=int, default=0)
+
+    compare_parser = sub_parsers.add_parser('compare', help='Compare the results of two commits in the history.')
+    compare_parser.add_argument('base', help='The base commit (prefix), or the index of the run in the history.')
+    compare_parser.add_argument('new', help='The new commit (prefix), or the index of the run in the history.')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+
+    args = parser.parse_args()
+    case_dict = GetCaseDict()
+    if args.command == 'list':
+        for case_name in sorted(case_dict.keys()):
+            print(case_name)
+    elif args.command == 'run':
+        case_name_list = args.case if args.case else \
+            sorted(name for name in case_dict.keys() if name.split('_')[-1] in args.size or name.startswith('startup_'))
+        unknown_case = [name for name in case_name_list if name not in case_dict]
+        if unknown_case:
+            print('Unknown cases: ', unknown_case)
+            return 2
+        Run(case_name_list, args.repeat, args.warmup, args.seed, args.history)
+    elif args.command == 'compare':
+        regression_list = Compare(args.base, args.new, args.threshold, args.history)
+        if regression_list is None:
+            return 2
+        return 1 if regression_list else 0
+    else:
+        parser.print_help()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
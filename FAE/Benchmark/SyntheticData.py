@@ -0,0 +1,65 @@
+import numpy as np
+
+from FAE.DataContainer.DataContainer import DataContainer
+
+FEATURE_CLASS_LIST = ['firstorder', 'shape', 'glcm', 'glrlm', 'glszm', 'gldm', 'ngtdm']
+MODALITY_LIST = ['ADC', 'DWI', 'T2']
+
+# The (case number, feature number) of each data size. 'medium' is the shape of Example/numeric_feature.csv.
+DATA_SIZE_DICT = {'small': (100, 100),
+                  'medium': (260, 264),
+                  'large': (1000, 1500)}
+
+
+def GenerateFeatureName(feature_number):
+    feature_name_list = []
+    for index in range(feature_number):
+        modality = MODALITY_LIST[index % len(MODALITY_LIST)]
+        feature_class = FEATURE_CLASS_LIST[(index // len(MODALITY_LIST)) % len(FEATURE_CLASS_LIST)]
+        feature_name_list.append('{}_original_{}_Feature{:d}'.format(modality, feature_class, index))
+    return feature_name_list
+
+def GenerateSyntheticData(case_number, feature_number, random_seed=0, positive_ratio=0.4, informative_ratio=0.1,
+                          group_size=8):
+    '''
+    Generate a radiomics-like data set. The features are made of groups of correlated features (each group is driven by
+    one latent factor), the latent factors of some groups are shifted by the label, and the values are heavy-tailed and
+    in different scales like the radiomics features.
+    :param case_number: The number of the cases.
+    :param feature_number: The number of the features.
+    :param random_seed: The seed of the random generator, the same seed always gives the same data.
+    :param positive_ratio: The ratio of the positive cases.
+    :param informative_ratio: The ratio of the feature groups which are related to the label.
+    :param group_size: The number of the correlated features in each group.
+    :return: The DataContainer.
+    '''
+    rng = np.random.RandomState(random_seed)
+
+    label = np.zeros((case_number,), dtype=int)
+    label[:int(round(case_number * positive_ratio))] = 1
+    rng.shuffle(label)
+
+    group_number = int(np.ceil(feature_number / group_size))
+    latent = rng.randn(case_number, group_number)
+    informative_group = rng.choice(group_number, max(1, int(round(group_number * informative_ratio))), replace=False)
+    latent[:, informative_group] += label[:, np.newaxis] * rng.uniform(0.5, 1.5, size=(len(informative_group),))
+
+    group_index = np.arange(feature_number) // group_size
+    loading = rng.uniform(0.6, 1.0, size=(feature_number,))
+    array = latent[:, group_index] * loading + rng.randn(case_number, feature_number) * np.sqrt(1 - loading ** 2)
+
+    # Heavy tails and different scales
+    is_log_normal = rng.rand(feature_number) < 0.3
+    array[:, is_log_normal] = np.exp(array[:, is_log_normal])
+    array = array * np.power(10., rng.randint(-3, 5, size=(feature_number,))) + rng.randn(feature_number)
+
+    case_name = ['Case{:d}'.format(index) for index in range(case_number)]
+    return DataContainer(array.astype(np.float32), label, GenerateFeatureName(feature_number), case_name)
+
+def GenerateDataBySize(size_name, random_seed=0):
+    case_number, feature_number = DATA_SIZE_DICT[size_name]
+    return GenerateSyntheticData(case_number, feature_number, random_seed)
+
+if __name__ == '__main__':
+    data_container = GenerateDataBySize('medium')
+    data_container.ShowInformation()
@@ -10,6 +10,8 @@ import pandas as pd
 import copy
 import math
 
+from FAE.Func.Timer import Timed
+
 
 class DataContainer:
     '''
@@ -72,10 +74,12 @@ class DataContainer:
                     return index0,index1
         return None,None
 
+    @Timed('data save')
     def Save(self, store_path):
         self.UpdateFrameByData()
         self.__df.to_csv(store_path, index='CaseName')
 
+    @Timed('data load')
     def LoadWithoutCase(self, file_path):
         self.__init__()
         try:
@@ -84,6 +88,7 @@ class DataContainer:
         except:
             print('Check the CSV file path. ')
 
+    @Timed('data load')
     def Load(self, file_path):
         self.__init__()
         try:
@@ -92,6 +97,47 @@ class DataContainer:
         except:
             print('Check the CSV file path. ')
 
+    @Timed('data save')
+    def SaveBinary(self, store_path):
+        '''
+        Store the data as a float32 matrix (the label is the first column) with the case names and the feature names in
+        a npz file, which could be loaded by LoadBinary without parsing.
+        '''
+        array = np.concatenate((self.__label[..., np.newaxis], self._array), axis=1).astype(np.float32)
+        np.savez(store_path, array=array, case_name=np.array(list(map(str, self.__case_name)), dtype=str),
+                 feature_name=np.array(['label'] + list(self.__feature_name), dtype=str))
+
+    @Timed('data load')
+    def LoadBinary(self, file_path):
+        self.__init__()
+        try:
+            with np.load(file_path) as data:
+                array = data['array']
+                case_name = [str(name) for name in data['case_name']]
+                feature_name = [str(name) for name in data['feature_name']]
+        except:
+            print('Check the binary file path. ')
+            return
+
+        if 'label' in feature_name:
+            index = feature_name.index('label')
+        elif 'Label' in feature_name:
+            index = feature_name.index('Label')
+        else:
+            print('No "label" in the index')
+            return
+
+        label = array[:, index]
+        if np.all(np.mod(label, 1) == 0):
+            label = label.astype(int)
+        feature_name.pop(index)
+
+        self.__label = label
+        self.__feature_name = feature_name
+        self.__case_name = case_name
+        self._array = np.delete(array, index, axis=1).astype(np.float32)
+        self.UpdateFrameByData()
+
     def ShowInformation(self):
         print('The number of cases is ', str(len(self.__case_name)))
         print('The number of features is ', str(len(self.__feature_name)))
@@ -2,14 +2,7 @@ import numpy as np
 import pickle
 import os
 import pandas as pd
-from sklearn.svm import SVC
-from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
-from sklearn.ensemble import RandomForestClassifier, AdaBoostClassifier
-from sklearn.neural_network import MLPClassifier
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.gaussian_process import GaussianProcessClassifier
-from sklearn.naive_bayes import GaussianNB
-from sklearn.linear_model import LogisticRegression
+from copy import deepcopy
 
 from abc import ABCMeta,abstractmethod
 from FAE.DataContainer.DataContainer import DataContainer
@@ -17,6 +10,8 @@ from FAE.DataContainer.DataContainer import DataContainer
 class Classifier:
     '''
     This is the base class of the classifer. All the specific classifier need to be artributed from this base class.
+    The sklearn model is imported in the constructor of each classifier, so importing this module does not load the
+    estimators which are not used.
     '''
     def __init__(self):
         self.__model = None
@@ -55,6 +50,17 @@ class Classifier:
     def GetModel(self):
         return self.__model
 
+    def SetParameter(self, **kwargs):
+        self.__model.set_params(**kwargs)
+
+    def GetSearchSpace(self):
+        '''
+        The hyper-parameters which could be explored by the HyperParameterSearch. Each item maps the parameter name of
+        the model to a tuple: ('float', low, high), ('log', low, high), ('int', low, high) or ('choice', [candidates]).
+        :return: A dictionary of the search space. Empty if the classifier has nothing to tune.
+        '''
+        return {}
+
     def Fit(self):
         self.__model.fit(self._x, self._y)
 
@@ -65,6 +71,71 @@ class Classifier:
     def Predict(self, x):
         return self.__model.predict(x)
 
+    def PredictProbability(self, x):
+        '''
+        Predict the probability. For the binary classification, the probability of the positive class is returned with
+        shape (number of cases, ). For the multi-class classification, the probability of all classes is returned with
+        shape (number of cases, number of classes).
+        '''
+        probability = self.__model.predict_proba(x)
+        if probability.shape[1] == 2:
+            return probability[:, 1]
+        return probability
+
+    def _GetPathModel(self):
+        # The unfitted copy, so the warm start does not begin from the coefficients of the former fit.
+        from sklearn.base import clone
+        return clone(self.__model)
+
+    def __WarmStartCoef(self, model, solution, feature_index):
+        previous_feature_index, coef, intercept = solution
+        previous_position = {feature: position for position, feature in enumerate(previous_feature_index)}
+        new_coef = np.zeros((coef.shape[0], len(feature_index)))
+        for position, feature in enumerate(feature_index):
+            if feature in previous_position:
+                new_coef[:, position] = coef[:, previous_position[feature]]
+        model.coef_ = new_coef
+        model.intercept_ = deepcopy(intercept)
+
+    def FitPath(self, data, label, split_list, c_list, feature_index_list):
+        '''
+        Fit the model along the path of the regularization parameter C and the feature subsets. The folds are shared by
+        all points on the path. In each fold, C is visited from the strongest regularization to the weakest one and each
+        fit starts from the previous solution. When the feature subset changes, the solution of the same C on the previous
+        subset is mapped to the new subset (the new features start from 0). Warm start only works for the model which
+        supports it (e.g. LogisticRegression), others are refitted from scratch.
+        :param data: The feature array.
+        :param label: The label.
+        :param split_list: The list of (train_index, val_index) of the cross validation.
+        :param c_list: The list of the values of C.
+        :param feature_index_list: The list of the column indexes of each feature subset, e.g. the nested top-k features.
+        :return: The out-of-fold prediction with shape (len(feature_index_list), len(c_list), number of cases).
+        '''
+        prediction = np.zeros((len(feature_index_list), len(c_list), data.shape[0]))
+        c_order = np.argsort(c_list)
+
+        for train_index, val_index in split_list:
+            model = self._GetPathModel()
+            is_warm_start = model.get_params().get('warm_start', False)
+            last_solution = {}
+
+            for feature_list_index, feature_index in enumerate(feature_index_list):
+                train_data = data[np.ix_(train_index, feature_index)]
+                val_data = data[np.ix_(val_index, feature_index)]
+
+                for order_index, c_index in enumerate(c_order):
+                    model.set_params(C=c_list[c_index])
+                    if is_warm_start and order_index == 0 and c_index in last_solution:
+                        self.__WarmStartCoef(model, last_solution[c_index], feature_index)
+
+                    model.fit(train_data, label[train_index])
+                    prediction[feature_list_index, c_index, val_index] = model.predict_proba(val_data)[:, 1]
+
+                    if is_warm_start:
+                        last_solution[c_index] = (feature_index, deepcopy(model.coef_), deepcopy(model.intercept_))
+
+        return prediction
+
     def Save(self, store_path):
         if os.path.isdir(store_path):
             store_path = os.path.join(store_path, 'model.pickle')
@@ -85,6 +156,25 @@ class Classifier:
             with open(store_path, 'rb') as f:
                 self.__model = pickle.load(f)
 
+    def _SaveCoef(self, store_path):
+        '''
+        Save the coefficients of the linear model with the features as the rows. The binary model has one column 'Coef',
+        the multi-class model has one column for each class (one-vs-rest), or for each pair of classes (one-vs-one).
+        '''
+        model = self.GetModel()
+        coef = np.atleast_2d(model.coef_)
+        class_list = list(model.classes_)
+        if coef.shape[0] == 1:
+            columns = ['Coef']
+        elif hasattr(model, 'support_'):
+            # The libsvm model (SVC) is one-vs-one for the multi-class task.
+            columns = ['Coef_{}_{}'.format(class_list[i], class_list[j])
+                       for i in range(len(class_list)) for j in range(i + 1, len(class_list))]
+        else:
+            columns = ['Coef_{}'.format(one_class) for one_class in class_list]
+        df = pd.DataFrame(data=np.transpose(coef), index=self._data_container.GetFeatureName(), columns=columns)
+        df.to_csv(store_path)
+
     @abstractmethod
     def GetName(self):
         pass
@@ -98,6 +188,7 @@ class SVM(Classifier):
             kwargs['C'] = 1.0
         if not 'probability' in kwargs.keys():
             kwargs['probability'] = True
+        from sklearn.svm import SVC
         super(SVM, self).SetModel(SVC(random_state=42, **kwargs))
 
         self.__name = 'SVM_'+ kwargs['kernel'] + '_C_' + '{:.3f}'.format(kwargs['C'])
@@ -105,9 +196,12 @@ class SVM(Classifier):
     def GetName(self):
         return 'SVM'
 
+    def GetSearchSpace(self):
+        return {'C': ('log', 1e-3, 1e3), 'kernel': ('choice', ['linear', 'rbf'])}
+
     def Predict(self, x, is_probability=True):
         if is_probability:
-            return super(SVM, self).GetModel().predict_proba(x)[:, 1]
+            return super(SVM, self).PredictProbability(x)
         else:
             return super(SVM, self).Predict(x)
 
@@ -125,9 +219,7 @@ class SVM(Classifier):
 
         # Save the coefficients
         try:
-            coef_path = os.path.join(store_path, 'svm_coef.csv')
-            df = pd.DataFrame(data=np.transpose(self.GetModel().coef_), index=self._data_container.GetFeatureName(), columns=['Coef'])
-            df.to_csv(coef_path)
+            self._SaveCoef(os.path.join(store_path, 'svm_coef.csv'))
         except:
             print("Not support Coef.")
 
@@ -136,6 +228,7 @@ class SVM(Classifier):
 class LDA(Classifier):
     def __init__(self, **kwargs):
         super(LDA, self).__init__()
+        from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
         super(LDA, self).SetModel(LinearDiscriminantAnalysis(**kwargs))
 
     def GetName(self):
@@ -143,7 +236,7 @@ class LDA(Classifier):
 
     def Predict(self, x, is_probability=True):
         if is_probability:
-            return super(LDA, self).GetModel().predict_proba(x)[:, 1]
+            return super(LDA, self).PredictProbability(x)
         else:
             return super(LDA, self).Predict(x)
 
@@ -159,9 +252,7 @@ class LDA(Classifier):
 
         # Save the coefficients
         try:
-            coef_path = os.path.join(store_path, 'lda_coef.csv')
-            df = pd.DataFrame(data=np.transpose(self.GetModel().coef_), index=self._data_container.GetFeatureName(), columns=['Coef'])
-            df.to_csv(coef_path)
+            self._SaveCoef(os.path.join(store_path, 'lda_coef.csv'))
         except:
             print("Not support Coef.")
 
@@ -170,11 +261,15 @@ class LDA(Classifier):
 class RandomForest(Classifier):
     def __init__(self, **kwargs):
         super(RandomForest, self).__init__()
+        from sklearn.ensemble import RandomForestClassifier
         super(RandomForest, self).SetModel(RandomForestClassifier(random_state=42, **kwargs))
 
     def GetName(self):
         return 'RF'
 
+    def GetSearchSpace(self):
+        return {'n_estimators': ('int', 10, 500), 'max_depth': ('int', 2, 20)}
+
     def GetDescription(self):
         text = "We used random forest as the classifier. Random forest is an ensemble learning method which combining " \
                "multiple decision trees at different subset of the training data set. Random forest is an effective " \
@@ -183,7 +278,7 @@ class RandomForest(Classifier):
 
     def Predict(self, x, is_probability=True):
         if is_probability:
-            return super(RandomForest, self).GetModel().predict_proba(x)[:, 1]
+            return super(RandomForest, self).PredictProbability(x)
         else:
             return super(RandomForest, self).Predict(x)
 
@@ -192,11 +287,15 @@ class AE(Classifier):
         super(AE, self).__init__()
         if not 'early_stopping' in kwargs.keys():
             kwargs['early_stopping'] = True
+        from sklearn.neural_network import MLPClassifier
         super(AE, self).SetModel(MLPClassifier(random_state=42, **kwargs))
 
     def GetName(self):
         return 'AE'
 
+    def GetSearchSpace(self):
+        return {'hidden_layer_sizes': ('choice', [(50,), (100,), (200,), (100, 100)]), 'alpha': ('log', 1e-6, 1e-1)}
+
     def GetDescription(self):
         text = "We used multi-layer perceptron (MLP), sometimes called auto-encoder (AE), as the classifier. MLP is based " \
                "neural network with multi-hidden layers to find the mapping from inputted features to the label. Here " \
@@ -206,18 +305,22 @@ class AE(Classifier):
 
     def Predict(self, x, is_probability=True):
         if is_probability:
-            return super(AE, self).GetModel().predict_proba(x)[:, 1]
+            return super(AE, self).PredictProbability(x)
         else:
             return super(AE, self).Predict(x)
 
 class AdaBoost(Classifier):
     def __init__(self, **kwargs):
         super(AdaBoost, self).__init__()
+        from sklearn.ensemble import AdaBoostClassifier
         super(AdaBoost, self).SetModel(AdaBoostClassifier(random_state=42, **kwargs))
 
     def GetName(self):
         return 'AB'
 
+    def GetSearchSpace(self):
+        return {'n_estimators': ('int', 10, 500), 'learning_rate': ('log', 1e-2, 2.0)}
+
     def GetDescription(self):
         text = "We used AdaBoost as the classifier. AdaBoost is a meta-algorithm that conjunct other type of algorithms " \
                "and combine them to get a final output of boosted classifier. AdaBoost is sensitive to the noise and " \
@@ -226,18 +329,22 @@ class AdaBoost(Classifier):
 
     def Predict(self, x, is_probability=True):
         if is_probability:
-            return super(AdaBoost, self).GetModel().predict_proba(x)[:, 1]
+            return super(AdaBoost, self).PredictProbability(x)
         else:
             return super(AdaBoost, self).Predict(x)
 
 class DecisionTree(Classifier):
     def __init__(self, **kwargs):
         super(DecisionTree, self).__init__()
+        from sklearn.tree import DecisionTreeClassifier
         super(DecisionTree, self).SetModel(DecisionTreeClassifier(random_state=42, **kwargs))
 
     def GetName(self):
         return 'DT'
 
+    def GetSearchSpace(self):
+        return {'max_depth': ('int', 2, 20), 'min_samples_leaf': ('int', 1, 20)}
+
     def GetDescription(self):
         text = "We used decision tree as the classifier. Decision tree is a non-parametric supervised learning method " \
                "and can be used for classification with high interpretation. "
@@ -245,13 +352,14 @@ class DecisionTree(Classifier):
 
     def Predict(self, x, is_probability=True):
         if is_probability:
-            return super(DecisionTree, self).GetModel().predict_proba(x)[:, 1]
+            return super(DecisionTree, self).PredictProbability(x)
         else:
             return super(DecisionTree, self).Predict(x)
 
 class GaussianProcess(Classifier):
     def __init__(self, **kwargs):
         super(GaussianProcess, self).__init__()
+        from sklearn.gaussian_process import GaussianProcessClassifier
         super(GaussianProcess, self).SetModel(GaussianProcessClassifier(random_state=42, **kwargs))
 
     def GetName(self):
@@ -264,18 +372,22 @@ class GaussianProcess(Classifier):
 
     def Predict(self, x, is_probability=True):
         if is_probability:
-            return super(GaussianProcess, self).GetModel().predict_proba(x)[:, 1]
+            return super(GaussianProcess, self).PredictProbability(x)
         else:
             return super(GaussianProcess, self).Predict(x)
 
 class NaiveBayes(Classifier):
     def __init__(self, **kwargs):
         super(NaiveBayes, self).__init__()
+        from sklearn.naive_bayes import GaussianNB
         super(NaiveBayes, self).SetModel(GaussianNB(**kwargs))
 
     def GetName(self):
         return 'NB'
 
+    def GetSearchSpace(self):
+        return {'var_smoothing': ('log', 1e-12, 1e-6)}
+
     def GetDescription(self):
         text = "We used naive Bayes as the classifier. Naive Bayes is a kind of probabilistic classifiers based on Bayes" \
                "theorem. Naive Bayes requires  number of parameters linear in the number of features. "
@@ -283,18 +395,29 @@ class NaiveBayes(Classifier):
 
     def Predict(self, x, is_probability=True):
         if is_probability:
-            return super(NaiveBayes, self).GetModel().predict_proba(x)[:, 1]
+            return super(NaiveBayes, self).PredictProbability(x)
         else:
             return super(NaiveBayes, self).Predict(x)
 
 class LR(Classifier):
     def __init__(self, **kwargs):
         super(LR, self).__init__()
+        from sklearn.linear_model import LogisticRegression
         super(LR, self).SetModel(LogisticRegression(**kwargs))
 
     def GetName(self):
         return 'LR'
 
+    def _GetPathModel(self):
+        model = super(LR, self)._GetPathModel()
+        if model.get_params()['solver'] in ['liblinear', 'warn']:
+            model.set_params(solver='lbfgs')
+        model.set_params(warm_start=True)
+        return model
+
+    def GetSearchSpace(self):
+        return {'C': ('log', 1e-3, 1e3)}
+
     def GetDescription(self):
         text = "We used logistic regression as the classifier. Logistic regression is a linear classifier that " \
                "combines all the features. A hyper-plane was searched in the high dimension to separate the samples.  "
@@ -302,7 +425,7 @@ class LR(Classifier):
 
     def Predict(self, x, is_probability=True):
         if is_probability:
-            return super(LR, self).GetModel().predict_proba(x)[:, 1]
+            return super(LR, self).PredictProbability(x)
         else:
             return super(LR, self).Predict(x)
 
@@ -313,9 +436,7 @@ class LR(Classifier):
 
         # Save the coefficients
         try:
-            coef_path = os.path.join(store_path, 'lr_coef.csv')
-            df = pd.DataFrame(data=np.transpose(self.GetModel().coef_), index=self._data_container.GetFeatureName(), columns=['Coef'])
-            df.to_csv(coef_path)
+            self._SaveCoef(os.path.join(store_path, 'lr_coef.csv'))
         except:
             print("Not support Coef.")
 
@@ -324,11 +445,22 @@ class LR(Classifier):
 class LRLasso(Classifier):
     def __init__(self, **kwargs):
         super(LRLasso, self).__init__()
+        from sklearn.linear_model import LogisticRegression
         super(LRLasso, self).SetModel(LogisticRegression(penalty='l1', **kwargs))
 
     def GetName(self):
         return 'LRLasso'
 
+    def _GetPathModel(self):
+        model = super(LRLasso, self)._GetPathModel()
+        if model.get_params()['solver'] != 'saga':
+            model.set_params(solver='saga')
+        model.set_params(warm_start=True)
+        return model
+
+    def GetSearchSpace(self):
+        return {'C': ('log', 1e-3, 1e3)}
+
     def GetDescription(self):
         text = "We used logistic regression with LASSO constrain as the classifier. Logistic regression with LASSON " \
                "constrain is a linear classifier based on logistic regression. L1 norm is added in the final lost " \
@@ -337,7 +469,7 @@ class LRLasso(Classifier):
 
     def Predict(self, x, is_probability=True):
         if is_probability:
-            return super(LRLasso, self).GetModel().predict_proba(x)[:, 1]
+            return super(LRLasso, self).PredictProbability(x)
         else:
             return super(LRLasso, self).Predict(x)
 
@@ -348,9 +480,7 @@ class LRLasso(Classifier):
 
         # Save the coefficients
         try:
-            coef_path = os.path.join(store_path, 'lrlasso_coef.csv')
-            df = pd.DataFrame(data=np.transpose(self.GetModel().coef_), index=self._data_container.GetFeatureName(), columns=['Coef'])
-            df.to_csv(coef_path)
+            self._SaveCoef(os.path.join(store_path, 'lrlasso_coef.csv'))
         except:
             print("Not support Coef.")
 
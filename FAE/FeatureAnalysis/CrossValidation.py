@@ -5,15 +5,10 @@ import numbers
 import csv
 import pandas as pd
 
-from sklearn.model_selection import KFold, StratifiedKFold, LeaveOneOut
-
 from FAE.DataContainer.DataContainer import DataContainer
 from FAE.FeatureAnalysis.Classifier import Classifier
-from FAE.FeatureAnalysis.FeatureSelector import FeatureSelectPipeline, FeatureSelectByAnalysis, FeatureSelector
 from FAE.Func.Metric import EstimateMetirc
-from FAE.Visualization.PlotMetricVsFeatureNumber import DrawCurve
-from FAE.Visualization.DrawROCList import DrawROCList
-from FAE.Func.Visualization import LoadWaitBar
+from FAE.Func.Timer import Timer
 
 class CrossValidation:
     '''
@@ -23,6 +18,22 @@ class CrossValidation:
     '''
     def __init__(self):
         self._classifier = Classifier()
+        self._prediction = {}
+        self.is_save_prediction = True
+        self.run_control = None
+
+    def GetPrediction(self):
+        '''
+        :return: The dict of the data type ('train', 'val' and 'test') and (prediction, label) of the last run.
+        '''
+        return self._prediction
+
+    def _CheckPoint(self):
+        '''
+        Wait if the run is paused, and raise RunCancelled if it is cancelled (see RunControl).
+        '''
+        if self.run_control is not None:
+            self.run_control.CheckPoint()
 
     def SetClassifier(self, classifier):
         self._classifier = classifier
@@ -30,6 +41,30 @@ class CrossValidation:
     def GetClassifier(self):
         return self._classifier
 
+    def RunPath(self, data_container, c_list, feature_index_list=None):
+        '''
+        Run the cross validation along the path of C and feature subsets in one call. The classifier must support the
+        FitPath (e.g. LR, LRLasso, SVM).
+        :param data_container: The training data container.
+        :param c_list: The list of the values of C.
+        :param feature_index_list: The list of the column indexes of each feature subset. All features are used if None.
+        :return: The validation AUC with shape (len(feature_index_list), len(c_list)) and the out-of-fold prediction.
+        '''
+        data = data_container.GetArray()
+        label = data_container.GetLabel()
+        if feature_index_list is None:
+            feature_index_list = [list(range(data.shape[1]))]
+
+        split_list = list(self.GetCV().split(data, label))
+        prediction = self._classifier.FitPath(data, label, split_list, c_list, feature_index_list)
+
+        from sklearn.metrics import roc_auc_score
+        auc = np.zeros(prediction.shape[:2])
+        for feature_list_index in range(prediction.shape[0]):
+            for c_index in range(prediction.shape[1]):
+                auc[feature_list_index, c_index] = roc_auc_score(label, prediction[feature_list_index, c_index])
+        return auc, prediction
+
     def SaveResult(self, info, store_path):
         info = dict(sorted(info.items(), key= lambda item: item[0]))
 
@@ -57,6 +92,7 @@ class CrossValidation:
 class CrossValidationLeaveOneOut(CrossValidation):
     def __init__(self):
         super(CrossValidationLeaveOneOut, self).__init__()
+        from sklearn.model_selection import LeaveOneOut
         self.__cv = LeaveOneOut()
 
     def GetCV(self):
@@ -81,21 +117,25 @@ class CrossValidationLeaveOneOut(CrossValidation):
         data = data_container.GetArray()
         label = data_container.GetLabel()
         case_name = data_container.GetCaseName()
+        # The columns of the multi-class prediction are the sorted classes of the training data.
+        classes = np.unique(label)
 
         train_cv_info = [['CaseName', 'Pred', 'Label']]
         val_cv_info = [['CaseName', 'Pred', 'Label']]
 
         for train_index, val_index in self.__cv.split(data, label):
+            self._CheckPoint()
             train_data = data[train_index, :]
             train_label = label[train_index]
             val_data = data[val_index, :]
             val_label = label[val_index]
 
-            self._classifier.SetData(train_data, train_label)
-            self._classifier.Fit()
+            with Timer('fit'):
+                self._classifier.SetData(train_data, train_label)
+                self._classifier.Fit()
 
-            train_prob = self._classifier.Predict(train_data)
-            val_prob = self._classifier.Predict(val_data)
+                train_prob = self._classifier.Predict(train_data)
+                val_prob = self._classifier.Predict(val_data)
 
             for index in range(len(train_index)):
                 train_cv_info.append(
@@ -108,17 +148,19 @@ class CrossValidationLeaveOneOut(CrossValidation):
             val_pred_list.extend(val_prob)
             val_label_list.extend(val_label)
 
-        total_train_label = np.asarray(train_label_list, dtype=np.uint8)
+        total_train_label = np.asarray(train_label_list)
         total_train_pred = np.asarray(train_pred_list, dtype=np.float32)
-        train_metric = EstimateMetirc(total_train_pred, total_train_label, 'train')
+        train_metric = EstimateMetirc(total_train_pred, total_train_label, 'train', classes)
 
-        total_label = np.asarray(val_label_list, dtype=np.uint8)
+        total_label = np.asarray(val_label_list)
         total_pred = np.asarray(val_pred_list, dtype=np.float32)
-        val_metric = EstimateMetirc(total_pred, total_label, 'val')
+        val_metric = EstimateMetirc(total_pred, total_label, 'val', classes)
 
-        self._classifier.SetDataContainer(data_container)
-        self._classifier.Fit()
+        with Timer('final fit'):
+            self._classifier.SetDataContainer(data_container)
+            self._classifier.Fit()
 
+        self._prediction = {'train': (total_train_pred, total_train_label), 'val': (total_pred, total_label)}
         test_metric = {}
         if test_data_container.GetArray().size > 0:
             test_data = test_data_container.GetArray()
@@ -126,42 +168,46 @@ class CrossValidationLeaveOneOut(CrossValidation):
             test_case_name = test_data_container.GetCaseName()
             test_pred = self._classifier.Predict(test_data)
 
-            test_metric = EstimateMetirc(test_pred, test_label, 'test')
+            test_metric = EstimateMetirc(test_pred, test_label, 'test', classes)
+            self._prediction['test'] = (test_pred, test_label)
 
         if store_folder:
-            if not os.path.exists(store_folder):
-                os.mkdir(store_folder)
-
-            info = {}
-            info.update(train_metric)
-            info.update(val_metric)
-
-            np.save(os.path.join(store_folder, 'train_predict.npy'), total_train_pred)
-            np.save(os.path.join(store_folder, 'val_predict.npy'), total_pred)
-            np.save(os.path.join(store_folder, 'train_label.npy'), total_train_label)
-            np.save(os.path.join(store_folder, 'val_label.npy'), total_label)
-
-            with open(os.path.join(store_folder, 'train_cvloo_info.csv'), 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerows(train_cv_info)
-            with open(os.path.join(store_folder, 'val_cvloo_info.csv'), 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerows(val_cv_info)
-
-            if test_data_container.GetArray().size > 0:
-                info.update(test_metric)
-                np.save(os.path.join(store_folder, 'test_predict.npy'), test_pred)
-                np.save(os.path.join(store_folder, 'test_label.npy'), test_label)
-
-                test_result_info = [['CaseName', 'Pred', 'Label']]
-                for index in range(len(test_label)):
-                    test_result_info.append([test_case_name[index], test_pred[index], test_label[index]])
-                with open(os.path.join(store_folder, 'test_info.csv'), 'w', newline='') as csvfile:
+            with Timer('save'):
+                if not os.path.exists(store_folder):
+                    os.mkdir(store_folder)
+
+                info = {}
+                info.update(train_metric)
+                info.update(val_metric)
+
+                if self.is_save_prediction:
+                    np.save(os.path.join(store_folder, 'train_predict.npy'), total_train_pred)
+                    np.save(os.path.join(store_folder, 'val_predict.npy'), total_pred)
+                    np.save(os.path.join(store_folder, 'train_label.npy'), total_train_label)
+                    np.save(os.path.join(store_folder, 'val_label.npy'), total_label)
+
+                with open(os.path.join(store_folder, 'train_cvloo_info.csv'), 'w', newline='') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerows(train_cv_info)
+                with open(os.path.join(store_folder, 'val_cvloo_info.csv'), 'w', newline='') as csvfile:
                     writer = csv.writer(csvfile)
-                    writer.writerows(test_result_info)
+                    writer.writerows(val_cv_info)
 
-            self._classifier.Save(store_folder)
-            self.SaveResult(info, store_folder)
+                if test_data_container.GetArray().size > 0:
+                    info.update(test_metric)
+                    if self.is_save_prediction:
+                        np.save(os.path.join(store_folder, 'test_predict.npy'), test_pred)
+                        np.save(os.path.join(store_folder, 'test_label.npy'), test_label)
+
+                    test_result_info = [['CaseName', 'Pred', 'Label']]
+                    for index in range(len(test_label)):
+                        test_result_info.append([test_case_name[index], test_pred[index], test_label[index]])
+                    with open(os.path.join(store_folder, 'test_info.csv'), 'w', newline='') as csvfile:
+                        writer = csv.writer(csvfile)
+                        writer.writerows(test_result_info)
+
+                self._classifier.Save(store_folder)
+                self.SaveResult(info, store_folder)
 
         return train_metric, val_metric, test_metric
 
@@ -169,6 +215,7 @@ class CrossValidationLeaveOneOut(CrossValidation):
 class CrossValidation5Folder(CrossValidation):
     def __init__(self):
         super(CrossValidation5Folder, self).__init__()
+        from sklearn.model_selection import StratifiedKFold
         self.__cv = StratifiedKFold(5)
 
     def GetCV(self):
@@ -193,12 +240,15 @@ class CrossValidation5Folder(CrossValidation):
         data = data_container.GetArray()
         label = data_container.GetLabel()
         case_name = data_container.GetCaseName()
+        # The columns of the multi-class prediction are the sorted classes of the training data.
+        classes = np.unique(label)
         group_index = 0
 
         train_cv_info = [['CaseName', 'Group', 'Pred', 'Label']]
         val_cv_info = [['CaseName', 'Group', 'Pred', 'Label']]
 
         for train_index, val_index in self.__cv.split(data, label):
+            self._CheckPoint()
             group_index += 1
 
             train_data = data[train_index, :]
@@ -206,11 +256,12 @@ class CrossValidation5Folder(CrossValidation):
             val_data = data[val_index, :]
             val_label = label[val_index]
 
-            self._classifier.SetData(train_data, train_label)
-            self._classifier.Fit()
+            with Timer('fit'):
+                self._classifier.SetData(train_data, train_label)
+                self._classifier.Fit()
 
-            train_prob = self._classifier.Predict(train_data)
-            val_prob = self._classifier.Predict(val_data)
+                train_prob = self._classifier.Predict(train_data)
+                val_prob = self._classifier.Predict(val_data)
 
             for index in range(len(train_index)):
                 train_cv_info.append([case_name[train_index[index]], str(group_index), train_prob[index], train_label[index]])
@@ -222,17 +273,19 @@ class CrossValidation5Folder(CrossValidation):
             val_pred_list.extend(val_prob)
             val_label_list.extend(val_label)
 
-        total_train_label = np.asarray(train_label_list, dtype=np.uint8)
+        total_train_label = np.asarray(train_label_list)
         total_train_pred = np.asarray(train_pred_list, dtype=np.float32)
-        train_metric = EstimateMetirc(total_train_pred, total_train_label, 'train')
+        train_metric = EstimateMetirc(total_train_pred, total_train_label, 'train', classes)
 
-        total_label = np.asarray(val_label_list, dtype=np.uint8)
+        total_label = np.asarray(val_label_list)
         total_pred = np.asarray(val_pred_list, dtype=np.float32)
-        val_metric = EstimateMetirc(total_pred, total_label, 'val')
+        val_metric = EstimateMetirc(total_pred, total_label, 'val', classes)
 
-        self._classifier.SetDataContainer(data_container)
-        self._classifier.Fit()
+        with Timer('final fit'):
+            self._classifier.SetDataContainer(data_container)
+            self._classifier.Fit()
 
+        self._prediction = {'train': (total_train_pred, total_train_label), 'val': (total_pred, total_label)}
         test_metric = {}
         if test_data_container.GetArray().size > 0:
             test_data = test_data_container.GetArray()
@@ -240,48 +293,53 @@ class CrossValidation5Folder(CrossValidation):
             test_case_name = test_data_container.GetCaseName()
             test_pred = self._classifier.Predict(test_data)
 
-            test_metric = EstimateMetirc(test_pred, test_label, 'test')
+            test_metric = EstimateMetirc(test_pred, test_label, 'test', classes)
+            self._prediction['test'] = (test_pred, test_label)
 
         if store_folder:
-            if not os.path.exists(store_folder):
-                os.mkdir(store_folder)
-
-            info = {}
-            info.update(train_metric)
-            info.update(val_metric)
-
-            np.save(os.path.join(store_folder, 'train_predict.npy'), total_train_pred)
-            np.save(os.path.join(store_folder, 'val_predict.npy'), total_pred)
-            np.save(os.path.join(store_folder, 'train_label.npy'), total_train_label)
-            np.save(os.path.join(store_folder, 'val_label.npy'), total_label)
-
-            with open(os.path.join(store_folder, 'train_cv5_info.csv'), 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerows(train_cv_info)
-            with open(os.path.join(store_folder, 'val_cv5_info.csv'), 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerows(val_cv_info)
-
-            if test_data_container.GetArray().size > 0:
-                info.update(test_metric)
-                np.save(os.path.join(store_folder, 'test_predict.npy'), test_pred)
-                np.save(os.path.join(store_folder, 'test_label.npy'), test_label)
-
-                test_result_info = [['CaseName', 'Pred', 'Label']]
-                for index in range(len(test_label)):
-                    test_result_info.append([test_case_name[index], test_pred[index], test_label[index]])
-                with open(os.path.join(store_folder, 'test_info.csv'), 'w', newline='') as csvfile:
+            with Timer('save'):
+                if not os.path.exists(store_folder):
+                    os.mkdir(store_folder)
+
+                info = {}
+                info.update(train_metric)
+                info.update(val_metric)
+
+                if self.is_save_prediction:
+                    np.save(os.path.join(store_folder, 'train_predict.npy'), total_train_pred)
+                    np.save(os.path.join(store_folder, 'val_predict.npy'), total_pred)
+                    np.save(os.path.join(store_folder, 'train_label.npy'), total_train_label)
+                    np.save(os.path.join(store_folder, 'val_label.npy'), total_label)
+
+                with open(os.path.join(store_folder, 'train_cv5_info.csv'), 'w', newline='') as csvfile:
                     writer = csv.writer(csvfile)
-                    writer.writerows(test_result_info)
+                    writer.writerows(train_cv_info)
+                with open(os.path.join(store_folder, 'val_cv5_info.csv'), 'w', newline='') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerows(val_cv_info)
+
+                if test_data_container.GetArray().size > 0:
+                    info.update(test_metric)
+                    if self.is_save_prediction:
+                        np.save(os.path.join(store_folder, 'test_predict.npy'), test_pred)
+                        np.save(os.path.join(store_folder, 'test_label.npy'), test_label)
+
+                    test_result_info = [['CaseName', 'Pred', 'Label']]
+                    for index in range(len(test_label)):
+                        test_result_info.append([test_case_name[index], test_pred[index], test_label[index]])
+                    with open(os.path.join(store_folder, 'test_info.csv'), 'w', newline='') as csvfile:
+                        writer = csv.writer(csvfile)
+                        writer.writerows(test_result_info)
 
-            self._classifier.Save(store_folder)
-            self.SaveResult(info, store_folder)
+                self._classifier.Save(store_folder)
+                self.SaveResult(info, store_folder)
 
         return train_metric, val_metric, test_metric
 
 class CrossValidation10Folder(CrossValidation):
     def __init__(self):
         super(CrossValidation10Folder, self).__init__()
+        from sklearn.model_selection import StratifiedKFold
         self.__cv = StratifiedKFold(10)
 
     def GetCV(self):
@@ -296,12 +354,15 @@ class CrossValidation10Folder(CrossValidation):
         data = data_container.GetArray()
         label = data_container.GetLabel()
         case_name = data_container.GetCaseName()
+        # The columns of the multi-class prediction are the sorted classes of the training data.
+        classes = np.unique(label)
         group_index = 0
 
         train_cv_info = [['CaseName', 'Group', 'Pred', 'Label']]
         val_cv_info = [['CaseName', 'Group', 'Pred', 'Label']]
 
         for train_index, val_index in self.__cv.split(data, label):
+            self._CheckPoint()
             group_index += 1
 
             train_data = data[train_index, :]
@@ -309,11 +370,12 @@ class CrossValidation10Folder(CrossValidation):
             val_data = data[val_index, :]
             val_label = label[val_index]
 
-            self._classifier.SetData(train_data, train_label)
-            self._classifier.Fit()
+            with Timer('fit'):
+                self._classifier.SetData(train_data, train_label)
+                self._classifier.Fit()
 
-            train_prob = self._classifier.Predict(train_data)
-            val_prob = self._classifier.Predict(val_data)
+                train_prob = self._classifier.Predict(train_data)
+                val_prob = self._classifier.Predict(val_data)
 
             for index in range(len(train_index)):
                 train_cv_info.append(
@@ -326,17 +388,19 @@ class CrossValidation10Folder(CrossValidation):
             val_pred_list.extend(val_prob)
             val_label_list.extend(val_label)
 
-        total_train_label = np.asarray(train_label_list, dtype=np.uint8)
+        total_train_label = np.asarray(train_label_list)
         total_train_pred = np.asarray(train_pred_list, dtype=np.float32)
-        train_metric = EstimateMetirc(total_train_pred, total_train_label, 'train')
+        train_metric = EstimateMetirc(total_train_pred, total_train_label, 'train', classes)
 
-        total_label = np.asarray(val_label_list, dtype=np.uint8)
+        total_label = np.asarray(val_label_list)
         total_pred = np.asarray(val_pred_list, dtype=np.float32)
-        val_metric = EstimateMetirc(total_pred, total_label, 'val')
+        val_metric = EstimateMetirc(total_pred, total_label, 'val', classes)
 
-        self._classifier.SetDataContainer(data_container)
-        self._classifier.Fit()
+        with Timer('final fit'):
+            self._classifier.SetDataContainer(data_container)
+            self._classifier.Fit()
 
+        self._prediction = {'train': (total_train_pred, total_train_label), 'val': (total_pred, total_label)}
         test_metric = {}
         if test_data_container.GetArray().size > 0:
             test_data = test_data_container.GetArray()
@@ -344,42 +408,46 @@ class CrossValidation10Folder(CrossValidation):
             test_case_name = test_data_container.GetCaseName()
             test_pred = self._classifier.Predict(test_data)
 
-            test_metric = EstimateMetirc(test_pred, test_label, 'test')
+            test_metric = EstimateMetirc(test_pred, test_label, 'test', classes)
+            self._prediction['test'] = (test_pred, test_label)
 
         if store_folder:
-            if not os.path.exists(store_folder):
-                os.mkdir(store_folder)
-
-            info = {}
-            info.update(train_metric)
-            info.update(val_metric)
-
-            np.save(os.path.join(store_folder, 'train_predict.npy'), total_train_pred)
-            np.save(os.path.join(store_folder, 'val_predict.npy'), total_pred)
-            np.save(os.path.join(store_folder, 'train_label.npy'), total_train_label)
-            np.save(os.path.join(store_folder, 'val_label.npy'), total_label)
-
-            with open(os.path.join(store_folder, 'train_cv10_info.csv'), 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerows(train_cv_info)
-            with open(os.path.join(store_folder, 'val_cv10_info.csv'), 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerows(val_cv_info)
-
-            if test_data_container.GetArray().size > 0:
-                info.update(test_metric)
-                np.save(os.path.join(store_folder, 'test_predict.npy'), test_pred)
-                np.save(os.path.join(store_folder, 'test_label.npy'), test_label)
-
-                test_result_info = [['CaseName', 'Pred', 'Label']]
-                for index in range(len(test_label)):
-                    test_result_info.append([test_case_name[index], test_pred[index], test_label[index]])
-                with open(os.path.join(store_folder, 'test_info.csv'), 'w', newline='') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerows(test_result_info)
+            with Timer('save'):
+                if not os.path.exists(store_folder):
+                    os.mkdir(store_folder)
+
+                info = {}
+                info.update(train_metric)
+                info.update(val_metric)
 
-            self._classifier.Save(store_folder)
-            self.SaveResult(info, store_folder)
+                if self.is_save_prediction:
+                    np.save(os.path.join(store_folder, 'train_predict.npy'), total_train_pred)
+                    np.save(os.path.join(store_folder, 'val_predict.npy'), total_pred)
+                    np.save(os.path.join(store_folder, 'train_label.npy'), total_train_label)
+                    np.save(os.path.join(store_folder, 'val_label.npy'), total_label)
+
+                with open(os.path.join(store_folder, 'train_cv10_info.csv'), 'w', newline='') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerows(train_cv_info)
+                with open(os.path.join(store_folder, 'val_cv10_info.csv'), 'w', newline='') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerows(val_cv_info)
+
+                if test_data_container.GetArray().size > 0:
+                    info.update(test_metric)
+                    if self.is_save_prediction:
+                        np.save(os.path.join(store_folder, 'test_predict.npy'), test_pred)
+                        np.save(os.path.join(store_folder, 'test_label.npy'), test_label)
+
+                    test_result_info = [['CaseName', 'Pred', 'Label']]
+                    for index in range(len(test_label)):
+                        test_result_info.append([test_case_name[index], test_pred[index], test_label[index]])
+                    with open(os.path.join(store_folder, 'test_info.csv'), 'w', newline='') as csvfile:
+                        writer = csv.writer(csvfile)
+                        writer.writerows(test_result_info)
+
+                self._classifier.Save(store_folder)
+                self.SaveResult(info, store_folder)
 
         return train_metric, val_metric, test_metric
 
@@ -5,7 +5,6 @@ from copy import deepcopy
 import pandas as pd
 
 from FAE.DataContainer.DataContainer import DataContainer
-from sklearn.decomposition import PCA
 
 class DimensionReduction:
     def __init__(self, model=None, number=0, is_transform=False):
@@ -39,6 +38,7 @@ class DimensionReduction:
 class DimensionReductionByPCA(DimensionReduction):
     def __init__(self, number=0):
         super(DimensionReductionByPCA, self).__init__(number=number, is_transform=True)
+        from sklearn.decomposition import PCA
         super(DimensionReductionByPCA, self).SetModel(PCA(n_components=super(DimensionReductionByPCA, self).GetRemainedNumber()))
 
     def GetName(self):
@@ -46,6 +46,7 @@ class DimensionReductionByPCA(DimensionReduction):
 
     def SetRemainedNumber(self, number):
         super(DimensionReductionByPCA, self).SetRemainedNumber(number)
+        from sklearn.decomposition import PCA
         super(DimensionReductionByPCA, self).SetModel(PCA(n_components=super(DimensionReductionByPCA, self).GetRemainedNumber()))
 
     def Transform(self, data_container):
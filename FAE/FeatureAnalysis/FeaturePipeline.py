@@ -8,8 +8,16 @@ from FAE.FeatureAnalysis.IndexDict import Index2Dict
 from FAE.FeatureAnalysis.Normalizer import NormalizerNone
 from FAE.FeatureAnalysis.DimensionReduction import DimensionReductionByCos
 from FAE.FeatureAnalysis.FeatureSelector import FeatureSelector
+from FAE.FeatureAnalysis.ResultIndex import ResultIndex
+from FAE.FeatureAnalysis.PredictionArchive import PredictionArchive
+from FAE.FeatureAnalysis.MetricAggregate import MetricAggregate
+from FAE.FeatureAnalysis.Progress import ProgressEstimator
+from FAE.FeatureAnalysis.RunControl import RunControl, RunCancelled
+from FAE.Func.Timer import Timer, timer_registry, SaveTiming
 
 import os
+import time
+import shutil
 import pickle
 import pandas as pd
 import csv
@@ -18,13 +26,19 @@ from copy import deepcopy
 
 class FeatureAnalysisPipelines:
     def __init__(self, normalizer_list=[], dimension_reduction_list=[], feature_selector_list=[],
-                 feature_selector_num_list=[], classifier_list=[], cross_validation=None):
+                 feature_selector_num_list=[], classifier_list=[], cross_validation=None, hyper_parameter_search=None,
+                 is_archive_prediction=False):
         self.__normalizer_list = normalizer_list
         self._dimension_reduction_list = dimension_reduction_list
         self.__feature_selector_list = feature_selector_list
         self.__feature_selector_num_list = feature_selector_num_list
         self.__classifier_list = classifier_list
         self.__cross_validation = cross_validation
+        self.__hyper_parameter_search = hyper_parameter_search
+        self.__is_archive_prediction = is_archive_prediction
+        self.__run_control = RunControl()
+        self.__finished_number = 0
+        self.__path_c_matrix = np.zeros(())
 
         self.GenerateMetircDict()
 
@@ -52,6 +66,31 @@ class FeatureAnalysisPipelines:
         self.__cross_validation = cv
     def GetCrossValidation(self):
         return self.__cross_validation
+    def SetHyperParameterSearch(self, hyper_parameter_search):
+        self.__hyper_parameter_search = hyper_parameter_search
+    def GetHyperParameterSearch(self):
+        return self.__hyper_parameter_search
+    def SetArchivePrediction(self, is_archive_prediction):
+        '''
+        If True, Run stores the predictions of all pipelines in one PredictionArchive in the store folder instead of the
+        npy files in each pipeline folder.
+        '''
+        self.__is_archive_prediction = is_archive_prediction
+    def GetArchivePrediction(self):
+        return self.__is_archive_prediction
+    def SetRunControl(self, run_control):
+        self.__run_control = run_control
+    def GetRunControl(self):
+        '''
+        :return: The RunControl to pause, resume or cancel Run from another thread.
+        '''
+        return self.__run_control
+    def GetFinishedNumber(self):
+        '''
+        :return: The number of the pipelines finished by the last Run. A cancel which arrives after the last pipeline
+        finished does not drop any pipeline, so the run is complete if it equals the total number.
+        '''
+        return self.__finished_number
 
     def SaveAll(self, store_folder):
         self.SaveMetricDict(store_folder)
@@ -71,6 +110,23 @@ class FeatureAnalysisPipelines:
 
         self.__auc_matrix_dict = {'train': deepcopy(matrix), 'val': deepcopy(matrix), 'test': deepcopy(matrix)}
         self.__accuracy_matrix_dict = {'train': deepcopy(matrix), 'val': deepcopy(matrix), 'test': deepcopy(matrix)}
+        self.__BuildMetricAggregate()
+
+    def __BuildMetricAggregate(self):
+        self.__auc_aggregate_dict, self.__accuracy_aggregate_dict = {}, {}
+        for key in self.__auc_matrix_dict.keys():
+            self.__auc_aggregate_dict[key] = MetricAggregate()
+            self.__auc_aggregate_dict[key].Build(self.__auc_matrix_dict[key])
+            self.__accuracy_aggregate_dict[key] = MetricAggregate()
+            self.__accuracy_aggregate_dict[key].Build(self.__accuracy_matrix_dict[key])
+
+    def __SetMetric(self, data_type, index, auc, accuracy):
+        # The metrics are stored as the formatted strings by EstimateMetirc.
+        auc, accuracy = float(auc), float(accuracy)
+        self.__auc_matrix_dict[data_type][index] = auc
+        self.__auc_aggregate_dict[data_type].Update(index, auc)
+        self.__accuracy_matrix_dict[data_type][index] = accuracy
+        self.__accuracy_aggregate_dict[data_type].Update(index, accuracy)
 
     def SavePipelineInfo(self, store_folder):
         with open(os.path.join(store_folder, 'pipeline_info.csv'), 'w', newline='') as csvfile:
@@ -144,6 +200,9 @@ class FeatureAnalysisPipelines:
             pickle.dump(self.__auc_matrix_dict, file, pickle.HIGHEST_PROTOCOL)
         with open(os.path.join(store_folder, 'accuracy_metric.pkl'), 'wb') as file:
             pickle.dump(self.__accuracy_matrix_dict, file, pickle.HIGHEST_PROTOCOL)
+        with open(os.path.join(store_folder, 'metric_aggregate.pkl'), 'wb') as file:
+            pickle.dump({'auc': self.__auc_aggregate_dict, 'accuracy': self.__accuracy_aggregate_dict}, file,
+                        pickle.HIGHEST_PROTOCOL)
 
     def LoadMetricDict(self, store_folder):
         with open(os.path.join(store_folder, 'auc_metric.pkl'), 'rb') as file:
@@ -151,13 +210,56 @@ class FeatureAnalysisPipelines:
         with open(os.path.join(store_folder, 'accuracy_metric.pkl'), 'rb') as file:
             self.__accuracy_matrix_dict = pickle.load(file)
 
+        # The results stored before the aggregates were added.
+        aggregate_path = os.path.join(store_folder, 'metric_aggregate.pkl')
+        if os.path.exists(aggregate_path):
+            with open(aggregate_path, 'rb') as file:
+                aggregate_dict = pickle.load(file)
+            self.__auc_aggregate_dict = aggregate_dict['auc']
+            self.__accuracy_aggregate_dict = aggregate_dict['accuracy']
+        else:
+            self.__BuildMetricAggregate()
+
     def GetAUCMetric(self):
         return self.__auc_matrix_dict
 
     def GetAccuracyMetric(self):
         return self.__accuracy_matrix_dict
 
+    def GetAUCAggregate(self):
+        '''
+        :return: The dict of the data type and the MetricAggregate of the AUC tensor.
+        '''
+        return self.__auc_aggregate_dict
+
+    def GetAccuracyAggregate(self):
+        return self.__accuracy_aggregate_dict
+
+    def GetPipelineName(self, metric_index):
+        '''
+        :param metric_index: The index of the pipeline in the metric tensor.
+        :return: The name of the pipeline, the same as OnePipeline.GetStoreName.
+        '''
+        return '_'.join([self.__normalizer_list[metric_index[0]].GetName(),
+                         self._dimension_reduction_list[metric_index[1]].GetName(),
+                         self.__feature_selector_list[metric_index[2]].GetName(),
+                         str(self.__feature_selector_num_list[metric_index[3]]),
+                         self.__classifier_list[metric_index[4]].GetName()])
+
     def Run(self, train_data_container, test_data_container=DataContainer(), store_folder=''):
+        '''
+        Run all pipelines. Before each pipeline runs, the progress is yielded as PipelineProgress, which could also be
+        unpacked as (normalizer name, dimension reduction name, feature selector name, feature number, classifier name,
+        current number, total number, timing), where timing is the dict of the stage name and the elapsed time (second)
+        of the last finished pipeline. PipelineProgress also carries the speed, the estimated time to finish, the best
+        validation AUC and the utilization (see ProgressEstimator). The timing of
+        all pipelines is stored in timing.csv, and the folder and the files of each pipeline are stored in
+        result_index.csv (see ResultIndex). If SetArchivePrediction(True), the predictions are stored in the
+        PredictionArchive of the store folder.
+        Run could be paused or cancelled by GetRunControl() between the pipelines and between the folds of the cross
+        validation. If cancelled, the pipeline which is running is dropped, and the results of the finished pipelines
+        are kept in the store folder, so they could be visualized.
+        '''
         column_list = ['sample_number', 'positive_number', 'negative_number',
                        'auc', 'auc 95% CIs', 'accuracy',
                        'Yorden Index', 'sensitivity', 'specificity',
@@ -176,90 +278,192 @@ class FeatureAnalysisPipelines:
         self.SavePipelineInfo(store_folder)
 
         num = 0
+        self.__finished_number = 0
+        timing = {}
+        result_index = ResultIndex()
+        archive = None
+        if store_folder and self.__is_archive_prediction:
+            archive = PredictionArchive(store_folder)
+            archive.Create()
+        elif store_folder:
+            # The archive of a former run in the same folder would be preferred to the new npy files by LoadPrediction.
+            PredictionArchive(store_folder).Remove()
+        if store_folder and os.path.isdir(store_folder):
+            # The headers of the timing and the result index, the rows of each pipeline are appended once it finishes.
+            SaveTiming([], os.path.join(store_folder, 'timing.csv'))
+            result_index.Save(store_folder)
         total_num = len(self.__normalizer_list) * \
                     len(self._dimension_reduction_list) * \
                     len(self.__feature_selector_list) * \
                     len(self.__classifier_list) * \
                     len(self.__feature_selector_num_list)
+        estimator = ProgressEstimator([classifier.GetName() for classifier in self.__classifier_list], total_num)
 
-        for normalizer, normalizer_index in zip(self.__normalizer_list, range(len(self.__normalizer_list))):
-            for dimension_reductor, dimension_reductor_index in zip(self._dimension_reduction_list, range(len(self._dimension_reduction_list))):
-                for feature_selector, feature_selector_index in zip(self.__feature_selector_list, range(len(self.__feature_selector_list))):
-                    for classifier, classifier_index in zip(self.__classifier_list, range(len(self.__classifier_list))):
-                        for feature_num, feature_num_index in zip(self.__feature_selector_num_list, range(len(self.__feature_selector_num_list))):
-                            num += 1
-                            yield normalizer.GetName(), dimension_reductor.GetName(), feature_selector.GetName(), feature_num, \
-                                  classifier.GetName(), num, total_num
-
-                            feature_selector.SetSelectedFeatureNumber(feature_num)
-                            one_pipeline = OnePipeline(normalizer=normalizer,
-                                                       dimension_reduction=dimension_reductor,
-                                                       feature_selector=feature_selector,
-                                                       classifier=classifier,
-                                                       cross_validation=self.__cross_validation)
-                            case_name = one_pipeline.GetStoreName()
-                            case_store_folder = os.path.join(store_folder, case_name)
-                            train_metric, val_metric, test_metric = one_pipeline.Run(train_data_container, test_data_container, case_store_folder)
+        is_save_prediction = self.__cross_validation.is_save_prediction
+        self.__cross_validation.is_save_prediction = archive is None
+        self.__cross_validation.run_control = self.__run_control
+        try:
+            for normalizer, normalizer_index in zip(self.__normalizer_list, range(len(self.__normalizer_list))):
+                for dimension_reductor, dimension_reductor_index in zip(self._dimension_reduction_list, range(len(self._dimension_reduction_list))):
+                    for feature_selector, feature_selector_index in zip(self.__feature_selector_list, range(len(self.__feature_selector_list))):
+                        for classifier, classifier_index in zip(self.__classifier_list, range(len(self.__classifier_list))):
+                            for feature_num, feature_num_index in zip(self.__feature_selector_num_list, range(len(self.__feature_selector_num_list))):
+                                num += 1
+                                yield estimator.GetProgress(normalizer.GetName(), dimension_reductor.GetName(),
+                                                            feature_selector.GetName(), feature_num, classifier.GetName(),
+                                                            num, timing)
+
+                                case_store_folder = ''
+                                self.__run_control.CheckPoint()
+                                feature_selector.SetSelectedFeatureNumber(feature_num)
+                                one_pipeline = OnePipeline(normalizer=normalizer,
+                                                           dimension_reduction=dimension_reductor,
+                                                           feature_selector=feature_selector,
+                                                           classifier=classifier,
+                                                           cross_validation=self.__cross_validation,
+                                                           hyper_parameter_search=self.__hyper_parameter_search)
+                                case_name = one_pipeline.GetStoreName()
+                                case_store_folder = os.path.join(store_folder, case_name)
+                                timer_registry.Reset()
+                                start_time = time.perf_counter()
+                                train_metric, val_metric, test_metric = one_pipeline.Run(train_data_container, test_data_container, case_store_folder)
                             
-                            self.__auc_matrix_dict['train'][normalizer_index,
-                                                     dimension_reductor_index, 
-                                                     feature_selector_index, 
-                                                     feature_num_index, 
-                                                     classifier_index] = train_metric['train_auc']
-                            self.__auc_matrix_dict['val'][normalizer_index,
-                                                     dimension_reductor_index,
-                                                     feature_selector_index,
-                                                     feature_num_index,
-                                                     classifier_index] = val_metric['val_auc']
-
-                            self.__accuracy_matrix_dict['train'][normalizer_index,
-                                                     dimension_reductor_index,
-                                                     feature_selector_index,
-                                                     feature_num_index,
-                                                     classifier_index] = train_metric['train_accuracy']
-                            self.__accuracy_matrix_dict['val'][normalizer_index,
-                                                   dimension_reductor_index,
-                                                   feature_selector_index,
-                                                   feature_num_index,
-                                                   classifier_index] = val_metric['val_accuracy']
-
-                            if store_folder and os.path.isdir(store_folder):
-                                store_path = os.path.join(store_folder, 'train_result.csv')
-                                save_info = [train_metric['train_' + index] for index in column_list]
-                                train_df.loc[case_name] = save_info
-                                train_df.to_csv(store_path)
-
-                                store_path = os.path.join(store_folder, 'val_result.csv')
-                                save_info = [val_metric['val_' + index] for index in column_list]
-                                val_df.loc[case_name] = save_info
-                                val_df.to_csv(store_path)
-
-                                if not test_data_container.IsEmpty():
-                                    self.__auc_matrix_dict['test'][normalizer_index,
-                                                                   dimension_reductor_index,
-                                                                   feature_selector_index,
-                                                                   feature_num_index,
-                                                                   classifier_index] = test_metric['test_auc']
-                                    self.__accuracy_matrix_dict['test'][normalizer_index,
-                                                                        dimension_reductor_index,
-                                                                        feature_selector_index,
-                                                                        feature_num_index,
-                                                                        classifier_index] = test_metric['test_accuracy']
-
-                                    store_path = os.path.join(store_folder, 'test_result.csv')
-                                    save_info = [test_metric['test_' + index] for index in column_list]
-                                    test_df.loc[case_name] = save_info
-                                    test_df.to_csv(store_path)
-
-                                self.SaveMetricDict(store_folder)
+                                metric_index = (normalizer_index, dimension_reductor_index, feature_selector_index,
+                                                feature_num_index, classifier_index)
+                                self.__SetMetric('train', metric_index, train_metric['train_auc'],
+                                                 train_metric['train_accuracy'])
+                                self.__SetMetric('val', metric_index, val_metric['val_auc'], val_metric['val_accuracy'])
+
+                                timer_registry.Add('total', time.perf_counter() - start_time)
+                                timing = timer_registry.GetSummary()
+                                estimator.Update(classifier.GetName(), timing['total'], case_name,
+                                                 float(val_metric['val_auc']))
+
+                                if store_folder and os.path.isdir(store_folder):
+                                    SaveTiming([(case_name, timer_registry.GetRecord())],
+                                               os.path.join(store_folder, 'timing.csv'), is_append=True)
+
+                                    key = ResultIndex.GetKey(normalizer.GetName(), dimension_reductor.GetName(),
+                                                             feature_selector.GetName(), feature_num,
+                                                             classifier.GetName())
+                                    result_index.AddFolder(key, case_name, store_folder)
+                                    result_index.Append(key, store_folder)
+
+                                    if archive is not None:
+                                        for data_type, (pred, label) in self.__cross_validation.GetPrediction().items():
+                                            archive.Add(case_name, data_type, pred, label)
+
+                                    store_path = os.path.join(store_folder, 'train_result.csv')
+                                    save_info = [train_metric['train_' + index] for index in column_list]
+                                    train_df.loc[case_name] = save_info
+                                    train_df.to_csv(store_path)
+
+                                    store_path = os.path.join(store_folder, 'val_result.csv')
+                                    save_info = [val_metric['val_' + index] for index in column_list]
+                                    val_df.loc[case_name] = save_info
+                                    val_df.to_csv(store_path)
+
+                                    if not test_data_container.IsEmpty():
+                                        self.__SetMetric('test', metric_index, test_metric['test_auc'],
+                                                         test_metric['test_accuracy'])
+
+                                        store_path = os.path.join(store_folder, 'test_result.csv')
+                                        save_info = [test_metric['test_' + index] for index in column_list]
+                                        test_df.loc[case_name] = save_info
+                                        test_df.to_csv(store_path)
+
+                                    self.SaveMetricDict(store_folder)
+                                self.__finished_number = num
+        except RunCancelled:
+            # Drop the unfinished pipeline, the finished ones were stored after each of them.
+            if store_folder and case_store_folder and os.path.isdir(case_store_folder):
+                shutil.rmtree(case_store_folder)
+            print('The run is cancelled, {:d} / {:d} pipelines are finished.'.format(num - 1, total_num))
+        finally:
+            self.__cross_validation.is_save_prediction = is_save_prediction
+            self.__cross_validation.run_control = None
+
+    def RunPath(self, train_data_container, c_list, store_folder=''):
+        '''
+        Fill the feature number axis of the validation AUC matrix by the regularization path. For the classifier with
+        the parameter C (e.g. LR, LRLasso, SVM), all feature numbers and all values of C are evaluated by one call of the
+        CrossValidation.RunPath with shared folds and warm starts. For each feature number, the C with the best AUC is
+        chosen and recorded (GetPathC), and its AUC is stored as the validation AUC. Since C is chosen on the same folds,
+        this AUC is optimistically biased and is higher than the AUC of Run with a fixed C. It is used to compare the
+        pipelines and to choose C, and the chosen C should be evaluated by Run or on the testing data.
+        :param train_data_container: The training data container.
+        :param c_list: The list of the values of C.
+        :param store_folder: If set, the AUC of the whole path of each pipeline and the chosen C would be stored.
+        :return: None
+        '''
+        if self.__normalizer_list == []:
+            self.__normalizer_list = [NormalizerNone()]
+
+        if self._dimension_reduction_list == []:
+            self._dimension_reduction_list = [DimensionReductionByCos()]
+
+        self.GenerateMetircDict()
+        self.__path_c_matrix = np.full(self.__auc_matrix_dict['val'].shape, np.nan)
+        feature_number_list = [int(feature_num) for feature_num in self.__feature_selector_num_list]
+        path_c_info = [['Pipeline', 'C', 'AUC']]
+
+        for normalizer_index, normalizer in enumerate(self.__normalizer_list):
+            normalized_data_container = normalizer.Run(deepcopy(train_data_container))
+            for dimension_reductor_index, dimension_reductor in enumerate(self._dimension_reduction_list):
+                reduced_data_container = dimension_reductor.Run(deepcopy(normalized_data_container))
+                feature_position = {name: index for index, name in enumerate(reduced_data_container.GetFeatureName())}
+
+                for feature_selector_index, feature_selector in enumerate(self.__feature_selector_list):
+                    feature_index_list = []
+                    for feature_num in feature_number_list:
+                        feature_selector.SetSelectedFeatureNumber(feature_num)
+                        selected_data_container = feature_selector.Run(deepcopy(reduced_data_container))
+                        feature_index_list.append([feature_position[name] for name in selected_data_container.GetFeatureName()])
+
+                    for classifier_index, classifier in enumerate(self.__classifier_list):
+                        if not 'C' in classifier.GetModel().get_params():
+                            print('{} does not support the regularization path'.format(classifier.GetName()))
+                            continue
+
+                        cv = deepcopy(self.__cross_validation)
+                        cv.SetClassifier(classifier)
+                        auc, _ = cv.RunPath(reduced_data_container, c_list, feature_index_list)
+                        for feature_num_index, c_index in enumerate(np.argmax(auc, axis=1)):
+                            metric_index = (normalizer_index, dimension_reductor_index, feature_selector_index,
+                                            feature_num_index, classifier_index)
+                            path_auc = float(auc[feature_num_index, c_index])
+                            self.__path_c_matrix[metric_index] = c_list[c_index]
+                            self.__auc_matrix_dict['val'][metric_index] = path_auc
+                            self.__auc_aggregate_dict['val'].Update(metric_index, path_auc)
+                            path_c_info.append([self.GetPipelineName(metric_index), c_list[c_index], path_auc])
+
+                        if store_folder and os.path.isdir(store_folder):
+                            path_name = normalizer.GetName() + '_' + dimension_reductor.GetName() + '_' + \
+                                        feature_selector.GetName() + '_' + classifier.GetName() + '_path_auc.csv'
+                            df = pd.DataFrame(data=auc, index=feature_number_list, columns=c_list)
+                            df.to_csv(os.path.join(store_folder, path_name))
+
+        if store_folder and os.path.isdir(store_folder):
+            pd.DataFrame(data=path_c_info[1:], columns=path_c_info[0]).to_csv(
+                os.path.join(store_folder, 'path_c.csv'), index=False)
+            self.SaveMetricDict(store_folder)
+
+    def GetPathC(self):
+        '''
+        :return: The C chosen by RunPath for each pipeline, which has the same shape as the AUC matrix. The pipelines
+        which are not on the path are NaN.
+        '''
+        return self.__path_c_matrix
 
 class OnePipeline:
-    def __init__(self, normalizer=None, dimension_reduction=None, feature_selector=None, classifier=None, cross_validation=None):
+    def __init__(self, normalizer=None, dimension_reduction=None, feature_selector=None, classifier=None, cross_validation=None,
+                 hyper_parameter_search=None):
         self.__normalizer = normalizer
         self.__dimension_reduction = dimension_reduction
         self.__feature_selector = feature_selector
         self.__classifier = classifier
         self.__cv = cross_validation
+        self.__hyper_parameter_search = hyper_parameter_search
 
     def SetNormalizer(self, normalizer):
         self.__normalizer = normalizer
@@ -286,6 +490,11 @@ class OnePipeline:
     def GetCrossValidatiaon(self):
         return self.__cv
 
+    def SetHyperParameterSearch(self, hyper_parameter_search):
+        self.__hyper_parameter_search = hyper_parameter_search
+    def GetHyperParameterSearch(self):
+        return self.__hyper_parameter_search
+
     def SavePipeline(self, feature_number, store_path):
         with open(store_path, 'w', newline='') as csvfile:
             writer = csv.writer(csvfile)
@@ -342,27 +551,36 @@ class OnePipeline:
             print('Give CV method and classifier')
 
         if self.__normalizer:
-            raw_train_data_container = self.__normalizer.Run(raw_train_data_container, store_folder)
-            if not test_data_container.IsEmpty():
-                raw_test_data_conainer = self.__normalizer.Run(raw_test_data_conainer, store_folder, is_test=True)
+            with Timer('normalization'):
+                raw_train_data_container = self.__normalizer.Run(raw_train_data_container, store_folder)
+                if not test_data_container.IsEmpty():
+                    raw_test_data_conainer = self.__normalizer.Run(raw_test_data_conainer, store_folder, is_test=True)
 
         if self.__dimension_reduction:
-            raw_train_data_container = self.__dimension_reduction.Run(raw_train_data_container, store_folder)
-            if not test_data_container.IsEmpty():
-                raw_test_data_conainer = self.__dimension_reduction.Transform(raw_test_data_conainer)
+            with Timer('dimension reduction'):
+                raw_train_data_container = self.__dimension_reduction.Run(raw_train_data_container, store_folder)
+                if not test_data_container.IsEmpty():
+                    raw_test_data_conainer = self.__dimension_reduction.Transform(raw_test_data_conainer)
 
         if self.__feature_selector:
-            raw_train_data_container = self.__feature_selector.Run(raw_train_data_container, store_folder)
-            if not test_data_container.IsEmpty():
-                selected_feature_name = raw_train_data_container.GetFeatureName()
-                fs = FeatureSelector()
-                raw_test_data_conainer = fs.SelectFeatureByName(raw_test_data_conainer, selected_feature_name)
+            with Timer('feature selection'):
+                raw_train_data_container = self.__feature_selector.Run(raw_train_data_container, store_folder)
+                if not test_data_container.IsEmpty():
+                    selected_feature_name = raw_train_data_container.GetFeatureName()
+                    fs = FeatureSelector()
+                    raw_test_data_conainer = fs.SelectFeatureByName(raw_test_data_conainer, selected_feature_name)
+
+        if self.__hyper_parameter_search:
+            with Timer('hyper-parameter search'):
+                self.__hyper_parameter_search.Run(self.__classifier, self.__cv, raw_train_data_container, store_folder)
 
         self.__cv.SetClassifier(self.__classifier)
-        train_metric, val_metric, test_metric = self.__cv.Run(raw_train_data_container, raw_test_data_conainer, store_folder)
+        with Timer('cross validation'):
+            train_metric, val_metric, test_metric = self.__cv.Run(raw_train_data_container, raw_test_data_conainer, store_folder)
 
         if store_folder:
-            self.SavePipeline(len(raw_train_data_container.GetFeatureName()), os.path.join(store_folder, 'pipeline_info.csv'))
+            with Timer('save'):
+                self.SavePipeline(len(raw_train_data_container.GetFeatureName()), os.path.join(store_folder, 'pipeline_info.csv'))
 
         return train_metric, val_metric, test_metric
 
@@ -6,12 +6,8 @@ from random import randrange
 import os
 import numbers
 import csv
+import hashlib
 
-from sklearn.feature_selection import SelectKBest, f_classif, RFE
-from sklearn.decomposition import PCA
-from sklearn.svm import SVC
-
-from FAE.FeatureAnalysis.ReliefF import ReliefF
 from FAE.DataContainer.DataContainer import DataContainer
 
 
@@ -183,24 +179,95 @@ class FeatureSelectByAnalysis(FeatureSelector):
         pass
 
 
+class ANOVAStatistic:
+    '''
+    The class-wise sufficient statistics of the one-way ANOVA, i.e. the case number, the sum and the sum of squares of
+    each feature in each class. The F-value and the P-value of all features are derived from them. The statistics of a
+    subset (e.g. the training part of a fold) are got by subtracting the contribution of the removed cases.
+    '''
+    def __init__(self, data=np.array([]), label=np.array([]), class_list=None):
+        if class_list is None:
+            class_list = np.unique(label)
+        self.__class_list = np.asarray(class_list)
+
+        one_hot = self.__OneHot(label)
+        data = np.asarray(data, dtype=np.float64).reshape((one_hot.shape[0], -1))
+        self.__count = np.sum(one_hot, axis=0)
+        self.__sum = np.dot(one_hot.T, data)
+        self.__square_sum = np.dot(one_hot.T, np.square(data))
+
+    def __OneHot(self, label):
+        label = np.asarray(label)
+        return np.asarray(label[:, np.newaxis] == self.__class_list[np.newaxis, :], dtype=np.float64)
+
+    def GetClassList(self):
+        return self.__class_list
+
+    def Subtract(self, data, label):
+        one_hot = self.__OneHot(label)
+        data = np.asarray(data, dtype=np.float64).reshape((one_hot.shape[0], -1))
+
+        statistic = deepcopy(self)
+        statistic.__count = self.__count - np.sum(one_hot, axis=0)
+        statistic.__sum = self.__sum - np.dot(one_hot.T, data)
+        statistic.__square_sum = self.__square_sum - np.dot(one_hot.T, np.square(data))
+        return statistic
+
+    def GetFPValue(self):
+        valid = self.__count > 0
+        count = self.__count[valid]
+        class_sum = self.__sum[valid]
+        case_number = np.sum(count)
+        class_number = count.size
+
+        total_sum = np.sum(class_sum, axis=0)
+        correction = np.square(total_sum) / case_number
+        ss_total = np.sum(self.__square_sum[valid], axis=0) - correction
+        ss_between = np.sum(np.square(class_sum) / count[:, np.newaxis], axis=0) - correction
+        ss_within = ss_total - ss_between
+
+        df_between = class_number - 1
+        df_within = case_number - class_number
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f_value = (ss_between / df_between) / (ss_within / df_within)
+        from scipy import special
+        p_value = special.fdtrc(df_between, df_within, f_value)
+        return f_value, p_value
+
 class FeatureSelectByANOVA(FeatureSelectByAnalysis):
     def __init__(self, selected_feature_number=1):
         super(FeatureSelectByANOVA, self).__init__(selected_feature_number)
 
+    def GetFoldStatistic(self, data, label, split_list):
+        '''
+        Get the statistics of the training part of each fold. The statistics of all cases are computed once, and the
+        validation part of each fold is subtracted from them, so the training part is not scanned again.
+        :param data: The feature array of all cases.
+        :param label: The label of all cases.
+        :param split_list: The list of (train_index, val_index) of the cross validation.
+        :return: The list of ANOVAStatistic of each fold, which could be passed to SelectByStatistic.
+        '''
+        statistic = ANOVAStatistic(data, label)
+        return [statistic.Subtract(data[val_index], label[val_index]) for _, val_index in split_list]
+
+    def SelectByStatistic(self, statistic):
+        f_value, p_value = statistic.GetFPValue()
+        scores = np.asarray(f_value, dtype=np.float64).copy()
+        scores[np.isnan(scores)] = np.finfo(scores.dtype).min
+
+        feature_index = np.sort(np.argsort(scores, kind='mergesort')[scores.size - self.GetSelectedFeatureNumber():])
+        return feature_index.tolist(), f_value, p_value
+
     def GetSelectedFeatureIndex(self, data_container):
+        # The F-value is invariant to the scale of each feature, so the data is not normalized.
         data = data_container.GetArray()
-        data /= np.linalg.norm(data, ord=2, axis=0)
         label = data_container.GetLabel()
 
         if data.shape[1] < self.GetSelectedFeatureNumber():
             print('The number of features in data container is smaller than the required number')
             self.SetSelectedFeatureNumber(data.shape[1])
 
-        fs = SelectKBest(f_classif, k=self.GetSelectedFeatureNumber())
-        fs.fit(data, label)
-        feature_index = fs.get_support(True)
-        f_value, p_value = f_classif(data, label)
-        return feature_index.tolist(), f_value, p_value
+        return self.SelectByStatistic(ANOVAStatistic(data, label))
 
     def GetName(self):
         return 'ANOVA'
@@ -291,8 +358,8 @@ class FeatureSelectByRelief(FeatureSelectByAnalysis):
         for iter_num in range(int(self.__iter_radio * n_samples)):
             # print iter_num;
             # initialization
-            nearHit = list()
-            nearMiss = list()
+            nearHit = None
+            nearMiss = None
             distance_sort = list()
 
             # random extract a sample
@@ -315,13 +382,13 @@ class FeatureSelectByRelief(FeatureSelectByAnalysis):
                     distance_sort.append([distance[index], index, label[index]])
             distance_sort.sort(key=lambda x: x[0])
             for index in range(n_samples):
-                if nearHit == [] and distance_sort[index][2] == label[index_i]:
+                if nearHit is None and distance_sort[index][2] == label[index_i]:
                     # nearHit = distance_sort[index][1];
                     nearHit = data[distance_sort[index][1]]
-                elif nearMiss == [] and distance_sort[index][2] != label[index_i]:
+                elif nearMiss is None and distance_sort[index][2] != label[index_i]:
                     # nearMiss = distance_sort[index][1]
                     nearMiss = data[distance_sort[index][1]]
-                elif nearHit != [] and nearMiss != []:
+                elif nearHit is not None and nearMiss is not None:
                     break
                 else:
                     continue
@@ -363,15 +430,75 @@ class FeatureSelectByRelief(FeatureSelectByAnalysis):
         return new_data_container
 
 class FeatureSelectByRFE(FeatureSelectByAnalysis):
-    def __init__(self, selected_feature_number=1, classifier=SVC(kernel='linear')):
+    def __init__(self, selected_feature_number=1, classifier=None, step=0.05):
+        '''
+        :param classifier: The estimator to rank the features, the linear SVC by default.
+        '''
         super(FeatureSelectByRFE, self).__init__(selected_feature_number)
+        if classifier is None:
+            from sklearn.svm import SVC
+            classifier = SVC(kernel='linear')
         self.__classifier = classifier
+        self.__step = step
+        self.__trajectory_key = None
+        self.__trajectory = []
 
     def GetDescription(self):
         text = "Before build the model, we used recursive feature elimination (RFE) to select features. The goal of RFE " \
                "is to select features based on a classifier by recursively considering smaller set of the features. "
         return text
 
+    def __GetEliminationStep(self, feature_number):
+        if 0.0 < self.__step < 1.0:
+            return int(max(1, self.__step * feature_number))
+        else:
+            return int(self.__step)
+
+    def GetEliminationTrajectory(self, data, label):
+        '''
+        Eliminate the features recursively down to 1 feature, which is the same as RFE with the same step. The removed
+        features of each step are recorded from the least important one, so the selected features of RFE with any
+        target number could be got from the trajectory. The trajectory is cached for the same data.
+        :param data: The feature array.
+        :param label: The label.
+        :return: The list of the removed feature indexes of each step.
+        '''
+        md5 = hashlib.md5()
+        md5.update(np.ascontiguousarray(data).tobytes())
+        md5.update(np.ascontiguousarray(label).tobytes())
+        key = md5.hexdigest()
+        if key == self.__trajectory_key:
+            return self.__trajectory
+
+        from sklearn.base import clone
+        from sklearn.utils import safe_sqr
+        step = self.__GetEliminationStep(data.shape[1])
+        remained_index = np.arange(data.shape[1])
+        trajectory = []
+        while remained_index.size > 1:
+            estimator = clone(self.__classifier)
+            estimator.fit(data[:, remained_index], label)
+            if hasattr(estimator, 'coef_'):
+                coefs = estimator.coef_
+            else:
+                coefs = getattr(estimator, 'feature_importances_', None)
+            if coefs is None:
+                raise RuntimeError('The classifier does not expose "coef_" or "feature_importances_" attributes')
+
+            if coefs.ndim > 1:
+                ranks = np.argsort(safe_sqr(coefs).sum(axis=0))
+            else:
+                ranks = np.argsort(safe_sqr(coefs))
+            ranks = np.ravel(ranks)
+
+            threshold = min(step, remained_index.size - 1)
+            trajectory.append(remained_index[ranks[:threshold]].tolist())
+            remained_index = remained_index[np.sort(ranks[threshold:])]
+
+        self.__trajectory_key = key
+        self.__trajectory = trajectory
+        return trajectory
+
     def GetSelectedFeatureIndex(self, data_container):
         data = data_container.GetArray()
         data /= np.linalg.norm(data, ord=2, axis=0)
@@ -381,11 +508,18 @@ class FeatureSelectByRFE(FeatureSelectByAnalysis):
             print('The number of features in data container is smaller than the required number')
             self.SetSelectedFeatureNumber(data.shape[1])
 
-        fs = RFE(self.__classifier, self.GetSelectedFeatureNumber(), step=0.05)
-        fs.fit(data, label)
-        feature_index = fs.get_support(True)
-        ranks = fs.ranking_
-
+        support = np.ones((data.shape[1],), dtype=bool)
+        ranks = np.ones((data.shape[1],), dtype=int)
+        remained_number = data.shape[1]
+        for removed_index in self.GetEliminationTrajectory(data, label):
+            if remained_number <= self.GetSelectedFeatureNumber():
+                break
+            removed_number = min(len(removed_index), remained_number - self.GetSelectedFeatureNumber())
+            support[removed_index[:removed_number]] = False
+            ranks[np.logical_not(support)] += 1
+            remained_number -= removed_number
+
+        feature_index = np.where(support)[0]
         return feature_index.tolist(), ranks
 
     def GetName(self):
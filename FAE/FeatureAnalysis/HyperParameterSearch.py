@@ -0,0 +1,254 @@
+import numpy as np
+import os
+import csv
+import pickle
+import hashlib
+from copy import deepcopy
+
+
+class HyperParameterSearch:
+    '''
+    HyperParameterSearch explores the hyper-parameters of a classifier with the tree-structured Parzen estimator (TPE).
+    The first several trials are sampled randomly from the search space of the classifier. After that, the evaluated
+    trials are split into a good group and a bad group according to the validation AUC, and the next trial is the
+    candidate which maximize the ratio of the densities l(x) / g(x) estimated on the two groups. Each trial is evaluated
+    by the cross validation engine and the scores are cached, so the same parameters are never evaluated twice on the
+    same data.
+    '''
+    def __init__(self, max_evaluation=30, startup_number=10, candidate_number=24, gamma=0.25, random_seed=42):
+        self.__max_evaluation = max_evaluation
+        self.__startup_number = startup_number
+        self.__candidate_number = candidate_number
+        self.__gamma = gamma
+        self.__random_seed = random_seed
+
+        self.__cache = {}
+        self.__history = []
+        self.__best_parameter = {}
+        self.__best_score = np.nan
+
+    def SetMaxEvaluation(self, max_evaluation):
+        self.__max_evaluation = max_evaluation
+    def GetMaxEvaluation(self):
+        return self.__max_evaluation
+
+    def GetHistory(self):
+        return self.__history
+
+    def GetBestParameter(self):
+        return self.__best_parameter
+
+    def GetBestScore(self):
+        return self.__best_score
+
+    def GetName(self):
+        return 'TPE'
+
+    def GetDescription(self):
+        text = "The hyper-parameters of the classifier were searched by the tree-structured Parzen estimator (TPE) " \
+               "with {:d} evaluations. Each candidate was evaluated by the cross validation on the training data set " \
+               "and the one with the highest validation AUC was used. ".format(self.__max_evaluation)
+        return text
+
+    def __GetDataKey(self, data_container):
+        md5 = hashlib.md5()
+        md5.update(np.ascontiguousarray(data_container.GetArray()).tobytes())
+        md5.update(np.ascontiguousarray(data_container.GetLabel()).tobytes())
+        return md5.hexdigest()
+
+    def __GetParameterKey(self, parameter):
+        key = []
+        for name in sorted(parameter.keys()):
+            value = parameter[name]
+            if isinstance(value, float):
+                value = float('{:.6g}'.format(value))
+            key.append((name, value))
+        return tuple(key)
+
+    def __ToInternal(self, space, name, value):
+        space_type = space[name][0]
+        if space_type == 'log':
+            return np.log(value)
+        elif space_type == 'choice':
+            return space[name][1].index(value)
+        else:
+            return float(value)
+
+    def __ToParameter(self, space, name, internal_value):
+        space_type = space[name][0]
+        if space_type == 'log':
+            return float(np.exp(internal_value))
+        elif space_type == 'int':
+            # The bound is widened by 0.5 to give the end values the same chance, so the rounded value is clipped.
+            return int(np.clip(np.round(internal_value), space[name][1], space[name][2]))
+        elif space_type == 'choice':
+            return space[name][1][int(internal_value)]
+        else:
+            return float(internal_value)
+
+    def __GetBound(self, space, name):
+        space_type = space[name][0]
+        if space_type == 'log':
+            return np.log(space[name][1]), np.log(space[name][2])
+        elif space_type == 'int':
+            return space[name][1] - 0.5, space[name][2] + 0.5
+        else:
+            return float(space[name][1]), float(space[name][2])
+
+    def __RandomSample(self, space, rng):
+        parameter = {}
+        for name in space.keys():
+            if space[name][0] == 'choice':
+                internal_value = rng.randint(len(space[name][1]))
+            else:
+                low, high = self.__GetBound(space, name)
+                internal_value = rng.uniform(low, high)
+            parameter[name] = self.__ToParameter(space, name, internal_value)
+        return parameter
+
+    def __ParzenSample(self, space, name, observation, rng):
+        if space[name][0] == 'choice':
+            probability = self.__ChoiceProbability(space, name, observation)
+            return rng.choice(len(probability), p=probability)
+
+        low, high = self.__GetBound(space, name)
+        bandwidth = self.__Bandwidth(low, high, len(observation))
+        # The prior (uniform over the whole range) is one component of the mixture
+        component = rng.randint(len(observation) + 1)
+        if component == len(observation):
+            return rng.uniform(low, high)
+        return np.clip(rng.normal(observation[component], bandwidth), low, high)
+
+    def __Bandwidth(self, low, high, observation_number):
+        return (high - low) * max(observation_number, 1) ** (-1. / 5) / 2.
+
+    def __ChoiceProbability(self, space, name, observation):
+        count = np.ones((len(space[name][1]),))
+        for value in observation:
+            count[int(value)] += 1
+        return count / np.sum(count)
+
+    def __LogDensity(self, space, name, value, observation):
+        if space[name][0] == 'choice':
+            return np.log(self.__ChoiceProbability(space, name, observation)[int(value)])
+
+        low, high = self.__GetBound(space, name)
+        bandwidth = self.__Bandwidth(low, high, len(observation))
+        observation = np.asarray(observation, dtype=np.float64)
+        kernel = np.exp(-0.5 * np.square((value - observation) / bandwidth)) / (np.sqrt(2 * np.pi) * bandwidth)
+        density = (np.sum(kernel) + 1. / (high - low)) / (len(observation) + 1)
+        return np.log(density + 1e-12)
+
+    def __Propose(self, space, trial_list, rng):
+        if len(trial_list) < self.__startup_number:
+            return self.__RandomSample(space, rng)
+
+        sorted_trial = sorted(trial_list, key=lambda trial: trial[1], reverse=True)
+        good_number = max(1, int(np.ceil(self.__gamma * len(sorted_trial))))
+        good_trial = [trial[0] for trial in sorted_trial[:good_number]]
+        bad_trial = [trial[0] for trial in sorted_trial[good_number:]]
+
+        best_candidate, best_ratio = None, -np.inf
+        for candidate_index in range(self.__candidate_number):
+            candidate, ratio = {}, 0.
+            for name in space.keys():
+                good_observation = [self.__ToInternal(space, name, trial[name]) for trial in good_trial]
+                bad_observation = [self.__ToInternal(space, name, trial[name]) for trial in bad_trial]
+                internal_value = self.__ParzenSample(space, name, good_observation, rng)
+                ratio += self.__LogDensity(space, name, internal_value, good_observation) - \
+                         self.__LogDensity(space, name, internal_value, bad_observation)
+                candidate[name] = internal_value
+            if ratio > best_ratio:
+                best_ratio = ratio
+                best_candidate = candidate
+
+        return {name: self.__ToParameter(space, name, best_candidate[name]) for name in space.keys()}
+
+    def __Evaluate(self, classifier, cross_validation, data_container, parameter):
+        classifier.SetParameter(**parameter)
+        cross_validation.SetClassifier(classifier)
+        try:
+            _, val_metric, _ = cross_validation.Run(data_container)
+            return float(val_metric['val_auc'])
+        except (ValueError, np.linalg.LinAlgError) as e:
+            # The model could not be fitted with these hyper-parameters (e.g. the invalid parameter of sklearn), so the
+            # trial is scored as the worst one. Other errors (e.g. RunCancelled) are raised.
+            print('Check the hyper-parameters {}: {}'.format(parameter, e))
+            return 0.
+
+    def SaveCache(self, store_folder):
+        with open(os.path.join(store_folder, 'hyper_parameter_cache.pkl'), 'wb') as file:
+            pickle.dump(self.__cache, file, pickle.HIGHEST_PROTOCOL)
+
+    def LoadCache(self, store_folder):
+        cache_path = os.path.join(store_folder, 'hyper_parameter_cache.pkl')
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as file:
+                self.__cache.update(pickle.load(file))
+
+    def SaveHistory(self, store_path):
+        if os.path.isdir(store_path):
+            store_path = os.path.join(store_path, 'hyper_parameter_search.csv')
+
+        parameter_name = sorted(self.__history[0][0].keys()) if self.__history else []
+        with open(store_path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Trial'] + parameter_name + ['val_auc'])
+            for index, (parameter, score) in enumerate(self.__history):
+                writer.writerow([index + 1] + [parameter[name] for name in parameter_name] + [score])
+
+    def Run(self, classifier, cross_validation, data_container, store_folder=''):
+        '''
+        Search the hyper-parameters of the classifier and set the best one to it.
+        :param classifier: The classifier to tune. The search space is got by classifier.GetSearchSpace().
+        :param cross_validation: The CrossValidation instance to evaluate each trial.
+        :param data_container: The training data container.
+        :param store_folder: If set, the trials and the cache would be stored in this folder.
+        :return: The best hyper-parameters and the corresponding validation AUC.
+        '''
+        self.__history = []
+        self.__best_parameter = {}
+        self.__best_score = np.nan
+
+        space = classifier.GetSearchSpace()
+        if space == {}:
+            return self.__best_parameter, self.__best_score
+
+        if store_folder and os.path.isdir(store_folder):
+            self.LoadCache(store_folder)
+
+        rng = np.random.RandomState(self.__random_seed)
+        data_key = self.__GetDataKey(data_container)
+        search_classifier = deepcopy(classifier)
+        search_cv = deepcopy(cross_validation)
+
+        for evaluation_index in range(self.__max_evaluation):
+            parameter = self.__Propose(space, self.__history, rng)
+            cache_key = (data_key, classifier.GetName(), self.__GetParameterKey(parameter))
+            if cache_key not in self.__cache:
+                self.__cache[cache_key] = self.__Evaluate(search_classifier, search_cv, data_container, parameter)
+            score = self.__cache[cache_key]
+            self.__history.append((parameter, score))
+
+            if np.isnan(self.__best_score) or score > self.__best_score:
+                self.__best_score = score
+                self.__best_parameter = parameter
+
+        classifier.SetParameter(**self.__best_parameter)
+
+        if store_folder and os.path.isdir(store_folder):
+            self.SaveCache(store_folder)
+            self.SaveHistory(store_folder)
+
+        return self.__best_parameter, self.__best_score
+
+if __name__ == '__main__':
+    from FAE.DataContainer.DataContainer import DataContainer
+    from FAE.FeatureAnalysis.Classifier import SVM
+    from FAE.FeatureAnalysis.CrossValidation import CrossValidation5Folder
+
+    data_container = DataContainer()
+    data_container.Load(r'..\..\Example\numeric_feature.csv')
+
+    search = HyperParameterSearch(max_evaluation=20)
+    print(search.Run(SVM(), CrossValidation5Folder(), data_container))
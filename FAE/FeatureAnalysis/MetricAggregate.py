@@ -0,0 +1,151 @@
+import bisect
+import numpy as np
+
+
+class MetricAggregate:
+    '''
+    The aggregates of one metric tensor with shape (normalizer, dimension reduction, feature selector, feature number,
+    classifier), which are used to show the results without going over the whole tensor:
+    1. The maximum along each axis (the maximum over all the other axes) and the flat index of that pipeline.
+    2. The maximum over the feature number axis for each configuration, and the index of that feature number.
+    3. The top N pipelines.
+    The aggregates are built from a tensor once by Build, and then updated by Update when a cell of the tensor is set.
+    Only the finished cells are aggregated, so the pipelines which never ran (e.g. after the run is cancelled) and the
+    NaN values are skipped. The maximum of the positions without any finished cell is NaN. Update assumes that each
+    cell is set once, like FeatureAnalysisPipelines.Run does. The ties are broken by the first pipeline in the order of
+    the tensor, the same as np.argmax.
+    '''
+    def __init__(self, shape=(), feature_number_axis=3, top_number=10):
+        self.shape = tuple(shape)
+        self.feature_number_axis = feature_number_axis
+        self.top_number = top_number
+        self.Build(np.zeros(self.shape))
+
+    @staticmethod
+    def __IsBetter(value, index, current_value, current_index):
+        return value > current_value or (value == current_value and index < current_index)
+
+    def Build(self, tensor, finished=None):
+        '''
+        :param tensor: The metric tensor.
+        :param finished: The bool tensor of the cells which are set. If None, the cells which are 0 (the initial value
+        of the tensor in FeatureAnalysisPipelines) are regarded as not set. The NaN cells are never regarded as set.
+        '''
+        tensor = np.asarray(tensor, dtype=np.float64)
+        self.shape = tensor.shape
+        if finished is None:
+            finished = tensor != 0
+        self.__finished = np.logical_and(finished, ~np.isnan(tensor))
+        # The cells which are not set never win.
+        tensor = np.where(self.__finished, tensor, -np.inf)
+        self.__axis_max, self.__axis_arg_max = [], []
+        if tensor.size == 0:
+            self.__best_value, self.__best_index = np.zeros(()), np.zeros((), dtype=int)
+            self.__top_list = []
+            return
+
+        for axis in range(tensor.ndim):
+            moved = np.moveaxis(tensor, axis, 0).reshape(tensor.shape[axis], -1)
+            local_index = np.argmax(moved, axis=1)
+            other_shape = tensor.shape[:axis] + tensor.shape[axis + 1:]
+            multi_index = list(np.unravel_index(local_index, other_shape))
+            multi_index.insert(axis, np.arange(tensor.shape[axis]))
+            self.__axis_max.append(np.max(moved, axis=1))
+            self.__axis_arg_max.append(np.ravel_multi_index(multi_index, tensor.shape))
+
+        if tensor.ndim > self.feature_number_axis:
+            self.__best_value = np.max(tensor, axis=self.feature_number_axis)
+            self.__best_index = np.argmax(tensor, axis=self.feature_number_axis)
+        else:
+            self.__best_value, self.__best_index = np.zeros(()), np.zeros((), dtype=int)
+
+        finished_index = np.flatnonzero(self.__finished)
+        top_index = finished_index[np.argsort(-tensor.ravel()[finished_index], kind='mergesort')][:self.top_number]
+        self.__top_list = [(-tensor.ravel()[index], int(index)) for index in top_index]
+
+    def Update(self, index, value):
+        '''
+        Update the aggregates after the cell of the tensor is set.
+        :param index: The index tuple of the cell.
+        :param value: The value of the cell. The NaN value is skipped.
+        '''
+        index = tuple(int(temp) for temp in index)
+        flat_index = int(np.ravel_multi_index(index, self.shape))
+        value = float(value)
+        if np.isnan(value):
+            return
+        self.__finished[index] = True
+        for axis in range(len(self.shape)):
+            position = index[axis]
+            if self.__IsBetter(value, flat_index, self.__axis_max[axis][position], self.__axis_arg_max[axis][position]):
+                self.__axis_max[axis][position] = value
+                self.__axis_arg_max[axis][position] = flat_index
+
+        if len(self.shape) > self.feature_number_axis:
+            configuration = index[:self.feature_number_axis] + index[self.feature_number_axis + 1:]
+            feature_number_index = index[self.feature_number_axis]
+            if self.__IsBetter(value, feature_number_index, self.__best_value[configuration],
+                               self.__best_index[configuration]):
+                self.__best_value[configuration] = value
+                self.__best_index[configuration] = feature_number_index
+
+        self.__top_list = [item for item in self.__top_list if item[1] != flat_index]
+        bisect.insort(self.__top_list, (-value, flat_index))
+        del self.__top_list[self.top_number:]
+
+    @staticmethod
+    def __ToValue(value):
+        return np.where(np.isneginf(value), np.nan, value)
+
+    def GetFinished(self):
+        '''
+        :return: The bool tensor of the cells which are set.
+        '''
+        return self.__finished
+
+    def GetAxisMax(self, axis):
+        '''
+        :return: The maximum over the other axes for each position of the axis.
+        '''
+        return self.__ToValue(self.__axis_max[axis])
+
+    def GetAxisArgMax(self, axis):
+        '''
+        :return: The index tuple of the best pipeline for each position of the axis.
+        '''
+        return [np.unravel_index(index, self.shape) for index in self.__axis_arg_max[axis]]
+
+    def GetBestFeatureNumberValue(self):
+        '''
+        :return: The maximum over the feature number axis, with the shape of the tensor without that axis.
+        '''
+        return self.__ToValue(self.__best_value)
+
+    def GetBestFeatureNumberIndex(self):
+        '''
+        :return: The index of the best feature number, with the shape of the tensor without the feature number axis.
+        '''
+        return self.__best_index
+
+    def GetTop(self, number=None):
+        '''
+        :return: The list of (value, index tuple) of the best pipelines, sorted from the best one.
+        '''
+        if number is None:
+            number = self.top_number
+        return [(-value, np.unravel_index(index, self.shape)) for value, index in self.__top_list[:number]]
+
+if __name__ == '__main__':
+    tensor = np.random.rand(2, 3, 2, 5, 4)
+    aggregate = MetricAggregate(tensor.shape)
+    for index in np.ndindex(tensor.shape):
+        aggregate.Update(index, tensor[index])
+    print(np.allclose(aggregate.GetAxisMax(3), np.max(tensor, axis=(0, 1, 2, 4))))
+    print(np.all(aggregate.GetBestFeatureNumberIndex() == np.argmax(tensor, axis=3)))
+    print(aggregate.GetTop(3))
+
+    # Only the first pipeline is finished, e.g. the run is cancelled.
+    aggregate = MetricAggregate(tensor.shape)
+    aggregate.Update((0, 0, 0, 0, 0), tensor[0, 0, 0, 0, 0])
+    aggregate.Update((0, 0, 0, 1, 0), np.nan)
+    print(aggregate.GetTop(3))
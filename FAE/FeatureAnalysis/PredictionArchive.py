@@ -0,0 +1,133 @@
+import os
+import csv
+import numpy as np
+
+DATA_TYPE_LIST = ['train', 'val', 'test']
+
+
+class PredictionArchive:
+    '''
+    PredictionArchive stores the predictions and the labels of all pipelines of one run in the result folder, instead of
+    the npy files in each pipeline folder. The predictions of each data type are appended into one flat binary file
+    (prediction_<data type>.dat, float32) and the labels into another one (label_<data type>.dat, int32), so they could
+    be read by np.memmap. prediction_index.csv maps the pipeline and the data type to its slice in the files.
+    '''
+    def __init__(self, store_folder):
+        self.__store_folder = store_folder
+        self.__index = {}
+        self.__value_number = {data_type: 0 for data_type in DATA_TYPE_LIST}
+        self.__memmap_dict = {}
+
+    @staticmethod
+    def IsAvailable(store_folder):
+        return os.path.exists(os.path.join(store_folder, 'prediction_index.csv'))
+
+    def __GetPath(self, name, data_type):
+        return os.path.join(self.__store_folder, '{}_{}.dat'.format(name, data_type))
+
+    def __GetMemmap(self, name, data_type, dtype):
+        key = (name, data_type)
+        if key not in self.__memmap_dict:
+            self.__memmap_dict[key] = np.memmap(self.__GetPath(name, data_type), dtype=dtype, mode='r')
+        return self.__memmap_dict[key]
+
+    def Remove(self):
+        '''
+        Remove the archive in the folder, so the predictions are not loaded from it any more.
+        '''
+        self.__index = {}
+        self.__value_number = {data_type: 0 for data_type in DATA_TYPE_LIST}
+        self.__memmap_dict = {}
+        for data_type in DATA_TYPE_LIST:
+            for name in ['prediction', 'label']:
+                if os.path.exists(self.__GetPath(name, data_type)):
+                    os.remove(self.__GetPath(name, data_type))
+        if PredictionArchive.IsAvailable(self.__store_folder):
+            os.remove(os.path.join(self.__store_folder, 'prediction_index.csv'))
+
+    def Create(self):
+        '''
+        Start a new archive, the former archive in the folder is removed.
+        '''
+        self.Remove()
+        with open(os.path.join(self.__store_folder, 'prediction_index.csv'), 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['CaseName', 'DataType', 'RowOffset', 'RowNumber', 'ColumnNumber'])
+
+    def Add(self, case_name, data_type, pred, label):
+        '''
+        Append the prediction and the label of one pipeline.
+        :param case_name: The name of the pipeline (OnePipeline.GetStoreName).
+        :param data_type: 'train', 'val' or 'test'.
+        :param pred: The prediction with shape (cases,), or (cases, classes) for the multi-class prediction.
+        :param label: The label with shape (cases,).
+        '''
+        pred = np.asarray(pred, dtype=np.float32)
+        label = np.asarray(label, dtype=np.int32)
+        column_number = pred.shape[1] if pred.ndim == 2 else 0
+
+        label_path = self.__GetPath('label', data_type)
+        row_offset = os.path.getsize(label_path) // label.itemsize if os.path.exists(label_path) else 0
+        with open(label_path, 'ab') as file:
+            file.write(label.tobytes())
+        with open(self.__GetPath('prediction', data_type), 'ab') as file:
+            file.write(pred.tobytes())
+
+        self.__index[(case_name, data_type)] = (row_offset, len(label), column_number, self.__value_number[data_type])
+        self.__value_number[data_type] += pred.size
+        with open(os.path.join(self.__store_folder, 'prediction_index.csv'), 'a', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow([case_name, data_type, row_offset, len(label), column_number])
+        self.__memmap_dict.pop(('prediction', data_type), None)
+        self.__memmap_dict.pop(('label', data_type), None)
+
+    def Load(self):
+        self.__index = {}
+        self.__value_number = {data_type: 0 for data_type in DATA_TYPE_LIST}
+        self.__memmap_dict = {}
+        with open(os.path.join(self.__store_folder, 'prediction_index.csv'), 'r', newline='') as csvfile:
+            reader = csv.reader(csvfile)
+            next(reader)
+            for row in reader:
+                data_type = row[1]
+                row_offset, row_number, column_number = int(row[2]), int(row[3]), int(row[4])
+                self.__index[(row[0], data_type)] = (row_offset, row_number, column_number,
+                                                     self.__value_number[data_type])
+                self.__value_number[data_type] += row_number * max(column_number, 1)
+
+    def Has(self, case_name, data_type):
+        return (case_name, data_type) in self.__index
+
+    def GetCaseNameList(self):
+        return sorted(set(case_name for case_name, _ in self.__index.keys()))
+
+    def Get(self, case_name, data_type):
+        '''
+        :return: (prediction, label) of the pipeline, which are read from the memory-mapped files.
+        '''
+        row_offset, row_number, column_number, value_offset = self.__index[(case_name, data_type)]
+        label = np.array(self.__GetMemmap('label', data_type, np.int32)[row_offset:row_offset + row_number])
+        pred = np.array(self.__GetMemmap('prediction', data_type, np.float32)[
+                            value_offset:value_offset + row_number * max(column_number, 1)])
+        if column_number > 0:
+            pred = pred.reshape((row_number, column_number))
+        return pred, label
+
+
+def LoadPrediction(result_folder, case_name, data_type, archive=None):
+    '''
+    Load the prediction and the label of one pipeline, from the archive of the result folder if it exists, or from the
+    npy files in the pipeline folder.
+    :return: (prediction, label), or None if the prediction does not exist.
+    '''
+    if archive is None and PredictionArchive.IsAvailable(result_folder):
+        archive = PredictionArchive(result_folder)
+        archive.Load()
+    if archive is not None and archive.Has(case_name, data_type):
+        return archive.Get(case_name, data_type)
+
+    pred_path = os.path.join(result_folder, case_name, '{}_predict.npy'.format(data_type))
+    label_path = os.path.join(result_folder, case_name, '{}_label.npy'.format(data_type))
+    if not (os.path.exists(pred_path) and os.path.exists(label_path)):
+        return None
+    return np.load(pred_path), np.load(label_path)
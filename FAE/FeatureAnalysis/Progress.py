@@ -0,0 +1,122 @@
+import time
+
+
+class PipelineProgress:
+    '''
+    The progress event which is yielded by FeatureAnalysisPipelines.Run before each pipeline runs. Besides the current
+    pipeline and the counter, it carries the stage timing of the last finished pipeline, the speed, the estimated time
+    to finish, the best validation AUC so far and the utilization of the worker. It could also be unpacked as the
+    former tuple (normalizer name, dimension reduction name, feature selector name, feature number, classifier name,
+    current number, total number, timing).
+    '''
+    def __init__(self, normalizer_name, dimension_reduction_name, feature_selector_name, feature_number,
+                 classifier_name, current_number, total_number, timing=None, elapsed=0., pipeline_per_minute=0.,
+                 eta=None, best_val_auc=None, best_pipeline_name='', utilization=None):
+        self.normalizer_name = normalizer_name
+        self.dimension_reduction_name = dimension_reduction_name
+        self.feature_selector_name = feature_selector_name
+        self.feature_number = feature_number
+        self.classifier_name = classifier_name
+        self.current_number = current_number
+        self.total_number = total_number
+        self.timing = timing if timing is not None else {}
+        self.elapsed = elapsed
+        self.pipeline_per_minute = pipeline_per_minute
+        self.eta = eta
+        self.best_val_auc = best_val_auc
+        self.best_pipeline_name = best_pipeline_name
+        self.utilization = utilization
+
+    def __iter__(self):
+        return iter((self.normalizer_name, self.dimension_reduction_name, self.feature_selector_name,
+                     self.feature_number, self.classifier_name, self.current_number, self.total_number, self.timing))
+
+    def GetStatusText(self):
+        line_list = ['Elapsed: {:s}'.format(FormatDuration(self.elapsed)),
+                     'Speed: {:.2f} pipelines / min'.format(self.pipeline_per_minute)]
+        if self.eta is not None:
+            line_list.append('ETA: {:s}'.format(FormatDuration(self.eta)))
+        if self.best_val_auc is not None:
+            line_list.append('Best validation AUC: {:.3f} ({:s})'.format(self.best_val_auc, self.best_pipeline_name))
+        if self.utilization is not None:
+            line_list.append('Worker utilization: {:.0%}'.format(self.utilization))
+        return '\n'.join(line_list)
+
+
+class ProgressEstimator:
+    '''
+    Estimate the progress of the pipelines online. The time of each finished pipeline is averaged for its classifier,
+    since the classifiers differ most in the time, and the estimated time to finish is the sum of the mean time of the
+    classifiers of the remaining pipelines. The utilization is the ratio of the time spent in the pipelines to the wall
+    time, the rest is spent in saving the results and reporting the progress.
+    '''
+    def __init__(self, classifier_name_list, total_number):
+        self.__start_time = time.perf_counter()
+        self.__total_number = total_number
+        self.__finished_number = 0
+        self.__busy_time = 0.
+        self.__duration_dict = {name: [0, 0.] for name in classifier_name_list}
+        pipeline_per_classifier = total_number // max(len(classifier_name_list), 1)
+        self.__remaining_dict = {name: pipeline_per_classifier for name in classifier_name_list}
+        self.best_val_auc = None
+        self.best_pipeline_name = ''
+
+    def Update(self, classifier_name, duration, pipeline_name='', val_auc=None):
+        '''
+        Record one finished pipeline.
+        :param classifier_name: The name of the classifier of the pipeline.
+        :param duration: The time of the pipeline (second).
+        :param pipeline_name: The name of the pipeline.
+        :param val_auc: The validation AUC of the pipeline.
+        '''
+        self.__finished_number += 1
+        self.__busy_time += duration
+        record = self.__duration_dict.setdefault(classifier_name, [0, 0.])
+        record[0] += 1
+        record[1] += duration
+        if self.__remaining_dict.get(classifier_name, 0) > 0:
+            self.__remaining_dict[classifier_name] -= 1
+        if val_auc is not None and (self.best_val_auc is None or val_auc > self.best_val_auc):
+            self.best_val_auc = val_auc
+            self.best_pipeline_name = pipeline_name
+
+    def GetElapsed(self):
+        return time.perf_counter() - self.__start_time
+
+    def GetPipelinePerMinute(self):
+        elapsed = self.GetElapsed()
+        if elapsed <= 0:
+            return 0.
+        return self.__finished_number / elapsed * 60
+
+    def GetETA(self):
+        '''
+        :return: The estimated time to finish (second), or None before the first pipeline finishes.
+        '''
+        if self.__finished_number == 0:
+            return None
+        global_mean = self.__busy_time / self.__finished_number
+        eta = 0.
+        for name, remaining_number in self.__remaining_dict.items():
+            count, total = self.__duration_dict.get(name, [0, 0.])
+            eta += remaining_number * (total / count if count > 0 else global_mean)
+        return eta
+
+    def GetUtilization(self):
+        elapsed = self.GetElapsed()
+        if self.__finished_number == 0 or elapsed <= 0:
+            return None
+        return min(self.__busy_time / elapsed, 1.)
+
+    def GetProgress(self, normalizer_name, dimension_reduction_name, feature_selector_name, feature_number,
+                    classifier_name, current_number, timing=None):
+        return PipelineProgress(normalizer_name, dimension_reduction_name, feature_selector_name, feature_number,
+                                classifier_name, current_number, self.__total_number, timing,
+                                elapsed=self.GetElapsed(), pipeline_per_minute=self.GetPipelinePerMinute(),
+                                eta=self.GetETA(), best_val_auc=self.best_val_auc,
+                                best_pipeline_name=self.best_pipeline_name, utilization=self.GetUtilization())
+
+
+def FormatDuration(second):
+    second = int(round(second))
+    return '{:d}:{:02d}:{:02d}'.format(second // 3600, second % 3600 // 60, second % 60)
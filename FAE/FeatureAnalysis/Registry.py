@@ -0,0 +1,63 @@
+'''
+The registry of the components of the pipelines. Each component is registered by its name (GetName) with the module and
+the class, and the module is imported only when the component is created, so looking up a name does not import the
+modules (and their sklearn dependencies) of the other components.
+'''
+import importlib
+
+# The name of the component: (the module, the class).
+COMPONENT_DICT = {
+    'NormNone': ('FAE.FeatureAnalysis.Normalizer', 'NormalizerNone'),
+    'NormUnit': ('FAE.FeatureAnalysis.Normalizer', 'NormalizerUnit'),
+    'Norm0Center': ('FAE.FeatureAnalysis.Normalizer', 'NormalizerZeroCenter'),
+    'Norm0CenterUnit': ('FAE.FeatureAnalysis.Normalizer', 'NormalizerZeroCenterAndUnit'),
+    'PCA': ('FAE.FeatureAnalysis.DimensionReduction', 'DimensionReductionByPCA'),
+    'Cos': ('FAE.FeatureAnalysis.DimensionReduction', 'DimensionReductionByCos'),
+    'Relief': ('FAE.FeatureAnalysis.FeatureSelector', 'FeatureSelectByRelief'),
+    'ANOVA': ('FAE.FeatureAnalysis.FeatureSelector', 'FeatureSelectByANOVA'),
+    'RFE': ('FAE.FeatureAnalysis.FeatureSelector', 'FeatureSelectByRFE'),
+    'SVM': ('FAE.FeatureAnalysis.Classifier', 'SVM'),
+    'LDA': ('FAE.FeatureAnalysis.Classifier', 'LDA'),
+    'AE': ('FAE.FeatureAnalysis.Classifier', 'AE'),
+    'RF': ('FAE.FeatureAnalysis.Classifier', 'RandomForest'),
+    'DT': ('FAE.FeatureAnalysis.Classifier', 'DecisionTree'),
+    'AB': ('FAE.FeatureAnalysis.Classifier', 'AdaBoost'),
+    'NB': ('FAE.FeatureAnalysis.Classifier', 'NaiveBayes'),
+    'GP': ('FAE.FeatureAnalysis.Classifier', 'GaussianProcess'),
+    'LR': ('FAE.FeatureAnalysis.Classifier', 'LR'),
+    'LRLasso': ('FAE.FeatureAnalysis.Classifier', 'LRLasso'),
+    'LeaveOneOut': ('FAE.FeatureAnalysis.CrossValidation', 'CrossValidationLeaveOneOut'),
+    '5-Folder': ('FAE.FeatureAnalysis.CrossValidation', 'CrossValidation5Folder'),
+    '10-Folder': ('FAE.FeatureAnalysis.CrossValidation', 'CrossValidation10Folder'),
+}
+
+
+def Register(name, module_name, class_name):
+    COMPONENT_DICT[name] = (module_name, class_name)
+
+def GetComponentNameList():
+    return list(COMPONENT_DICT.keys())
+
+def GetComponentClass(name):
+    '''
+    :return: The class of the component, or None if the name is not registered.
+    '''
+    if name not in COMPONENT_DICT:
+        return None
+    module_name, class_name = COMPONENT_DICT[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+def CreateComponent(name, **kwargs):
+    '''
+    :return: The new instance of the component, or None if the name is not registered.
+    '''
+    component_class = GetComponentClass(name)
+    if component_class is None:
+        print('The component {} is not registered.'.format(name))
+        return None
+    return component_class(**kwargs)
+
+if __name__ == '__main__':
+    import sys
+    print(CreateComponent('SVM').GetName())
+    print([name for name in sys.modules if name.startswith('sklearn.')][:5])
@@ -0,0 +1,138 @@
+import os
+import csv
+
+
+class ResultIndex:
+    '''
+    The index of the result folders of the pipelines. Each pipeline is keyed by (normalizer name, dimension reduction
+    name, feature selector name, feature number, classifier name) and maps to its folder (relative to the root folder)
+    and the names of the files in that folder, so the result files could be found without walking the result tree.
+    The index is written as result_index.csv by FeatureAnalysisPipelines.Run. For the results without the index file, it
+    is built from the pipeline grid, and the files of each folder are listed when the folder is used the first time.
+    '''
+    def __init__(self):
+        self.__root_folder = ''
+        self.__folder_dict = {}
+        self.__file_dict = {}
+
+    @staticmethod
+    def GetKey(normalizer_name, dimension_reduction_name, feature_selector_name, feature_number, classifier_name):
+        return (normalizer_name, dimension_reduction_name, feature_selector_name, int(feature_number), classifier_name)
+
+    def Clear(self):
+        self.__root_folder = ''
+        self.__folder_dict = {}
+        self.__file_dict = {}
+
+    def Add(self, key, folder_name, file_name_list=None):
+        '''
+        :param key: The key got by GetKey.
+        :param folder_name: The name of the pipeline folder, relative to the root folder.
+        :param file_name_list: The files in the folder. If None, they would be listed when they are needed.
+        '''
+        self.__folder_dict[key] = folder_name
+        if file_name_list is None:
+            self.__file_dict.pop(key, None)
+        else:
+            self.__file_dict[key] = {file_name.lower(): file_name for file_name in file_name_list}
+
+    def AddFolder(self, key, folder_name, root_folder):
+        with os.scandir(os.path.join(root_folder, folder_name)) as iterator:
+            file_name_list = [entry.name for entry in iterator if entry.is_file()]
+        self.Add(key, folder_name, file_name_list)
+
+    def GetKeyList(self):
+        return list(self.__folder_dict.keys())
+
+    def GetFolder(self, key):
+        '''
+        :return: The path of the pipeline folder, or '' if the pipeline is not in the index.
+        '''
+        if key not in self.__folder_dict:
+            return ''
+        return os.path.join(self.__root_folder, self.__folder_dict[key])
+
+    def GetFilePath(self, key, file_name):
+        '''
+        :param key: The key got by GetKey.
+        :param file_name: The name of the file, case insensitive.
+        :return: The path of the file in the pipeline folder, or '' if it does not exist.
+        '''
+        folder = self.GetFolder(key)
+        if not folder:
+            return ''
+
+        if key not in self.__file_dict:
+            if not os.path.isdir(folder):
+                self.__file_dict[key] = {}
+            else:
+                self.AddFolder(key, self.__folder_dict[key], self.__root_folder)
+        name = self.__file_dict[key].get(file_name.lower(), '')
+        if not name:
+            return ''
+        return os.path.join(folder, name)
+
+    def __GetRow(self, key):
+        file_name_list = sorted(self.__file_dict.get(key, {}).values())
+        return list(key) + [self.__folder_dict[key], ';'.join(file_name_list)]
+
+    def Save(self, root_folder):
+        with open(os.path.join(root_folder, 'result_index.csv'), 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Normalizer', 'DimensionReduction', 'FeatureSelector', 'FeatureNumber', 'Classifier',
+                             'Folder', 'Files'])
+            for key in self.__folder_dict.keys():
+                writer.writerow(self.__GetRow(key))
+
+    def Append(self, key, root_folder):
+        '''
+        Append the row of one pipeline to result_index.csv, which is written by Save before. So the index is updated
+        once each pipeline finishes without rewriting the rows of the former pipelines.
+        :param key: The key got by GetKey, which was added to the index.
+        '''
+        with open(os.path.join(root_folder, 'result_index.csv'), 'a', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(self.__GetRow(key))
+
+    def Load(self, root_folder):
+        self.Clear()
+        self.__root_folder = root_folder
+        with open(os.path.join(root_folder, 'result_index.csv'), 'r', newline='') as csvfile:
+            reader = csv.reader(csvfile)
+            next(reader)
+            for row in reader:
+                file_name_list = row[6].split(';') if row[6] else []
+                self.Add(self.GetKey(*row[:5]), row[5], file_name_list)
+
+    def Build(self, root_folder, pipelines):
+        '''
+        Build the index from the pipeline grid of the FeatureAnalysisPipelines, for the results without the index file.
+        '''
+        self.Clear()
+        self.__root_folder = root_folder
+        for normalizer in pipelines.GetNormalizerList():
+            for dimension_reduction in pipelines.GetDimensionReductionList():
+                for feature_selector in pipelines.GetFeatureSelectorList():
+                    for feature_number in pipelines.GetFeatureNumberList():
+                        for classifier in pipelines.GetClassifierList():
+                            key = self.GetKey(normalizer.GetName(), dimension_reduction.GetName(),
+                                              feature_selector.GetName(), feature_number, classifier.GetName())
+                            folder_name = '_'.join([key[0], key[1], key[2], str(key[3]), key[4]])
+                            if os.path.isdir(os.path.join(root_folder, folder_name)):
+                                self.Add(key, folder_name)
+
+    def LoadOrBuild(self, root_folder, pipelines):
+        if os.path.exists(os.path.join(root_folder, 'result_index.csv')):
+            self.Load(root_folder)
+        else:
+            self.Build(root_folder, pipelines)
+
+if __name__ == '__main__':
+    from FAE.FeatureAnalysis.FeaturePipeline import FeatureAnalysisPipelines
+    root_folder = r'..\..\Example\report_temp'
+    fae = FeatureAnalysisPipelines()
+    fae.LoadAll(root_folder)
+    result_index = ResultIndex()
+    result_index.LoadOrBuild(root_folder, fae)
+    for key in result_index.GetKeyList():
+        print(key, result_index.GetFolder(key))
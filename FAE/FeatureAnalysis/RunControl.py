@@ -0,0 +1,53 @@
+import threading
+
+
+class RunCancelled(Exception):
+    pass
+
+
+class RunControl:
+    '''
+    RunControl is shared by the thread which runs the pipelines and the thread which controls it (e.g. the GUI). The
+    running code calls CheckPoint at the safe points (between the pipelines and between the folds of the cross
+    validation), which blocks while the run is paused and raises RunCancelled if the run is cancelled. The run is
+    stopped cooperatively, so the pipeline or the fold which is running is finished first.
+    '''
+    def __init__(self):
+        self.__cancel_event = threading.Event()
+        self.__resume_event = threading.Event()
+        self.__resume_event.set()
+
+    def __deepcopy__(self, memo):
+        # The copies of the cross validation (e.g. in HyperParameterSearch) are controlled by the same run.
+        return self
+
+    def Reset(self):
+        self.__cancel_event.clear()
+        self.__resume_event.set()
+
+    def Cancel(self):
+        self.__cancel_event.set()
+        # Wake up the paused run, so it could be stopped.
+        self.__resume_event.set()
+
+    def Pause(self):
+        if not self.__cancel_event.is_set():
+            self.__resume_event.clear()
+
+    def Resume(self):
+        self.__resume_event.set()
+
+    def IsCancelled(self):
+        return self.__cancel_event.is_set()
+
+    def IsPaused(self):
+        return not self.__resume_event.is_set()
+
+    def CheckPoint(self):
+        '''
+        Wait while the run is paused.
+        :raise RunCancelled: If the run is cancelled.
+        '''
+        self.__resume_event.wait()
+        if self.__cancel_event.is_set():
+            raise RunCancelled()
@@ -1,6 +1,6 @@
 import numpy as np
-from scipy.stats import sem
-from sklearn.metrics import roc_auc_score, roc_curve, confusion_matrix
+
+from FAE.Func.Timer import Timed
 
 def AUC_Confidence_Interval(y_true, y_pred, CI_index=0.95):
     '''
@@ -12,6 +12,7 @@ def AUC_Confidence_Interval(y_true, y_pred, CI_index=0.95):
     :param CI_index: The range of confidence interval. Default is 95%
     :return: The AUC value, a list of the confidence interval, the boot strap result.
     '''
+    from sklearn.metrics import roc_auc_score
 
     AUC = roc_auc_score(y_true, y_pred)
 
@@ -45,15 +46,167 @@ def AUC_Confidence_Interval(y_true, y_pred, CI_index=0.95):
     # print('AUC is {:.3f}, Confidence interval : [{:0.3f} - {:0.3}]'.format(AUC, confidence_lower, confidence_upper))
     return AUC, CI, sorted_scores
 
-def EstimateMetirc(prediction, label, key_word=''):
+def RankAUC(one_hot, score):
+    '''
+    Calculate the AUC of each column by the rank sum of the positive cases (Mann-Whitney U statistic). Each column is
+    sorted only once and the ties are averaged, which is the same as the roc_auc_score.
+    :param one_hot: The binary label, shape is (number of cases, number of columns).
+    :param score: The prediction, shape is (number of cases, number of columns).
+    :return: The AUC of each column. It is nan if the column has only one kind of label.
+    '''
+    from scipy.stats import rankdata
+    rank = np.apply_along_axis(rankdata, 0, score)
+    positive_number = np.sum(one_hot, axis=0)
+    negative_number = one_hot.shape[0] - positive_number
+    with np.errstate(divide='ignore', invalid='ignore'):
+        auc = (np.sum(rank * one_hot, axis=0) - positive_number * (positive_number + 1) / 2.) / \
+              (positive_number * negative_number)
+    return auc
+
+def LabelToColumn(label, class_number, classes=None):
+    '''
+    Map the label to the column of the multi-class prediction. The columns are in the order of the sorted classes of
+    the training data (the classes_ of the sklearn classifier), e.g. the labels 1, 2, 3 are mapped to 0, 1, 2.
+    :param label: The label, dim should be 1.
+    :param class_number: The number of the columns of the prediction.
+    :param classes: The sorted classes of the training data. If it is None, the classes in the label are used.
+    :return: The column index of each label.
+    '''
+    label = np.asarray(label)
+    if classes is None:
+        classes = np.unique(label)
+        if classes.size < class_number and np.all(np.isin(classes, np.arange(class_number))):
+            # Some classes are missing, the label is regarded as the column index already.
+            return label.astype(int)
+    classes = np.asarray(classes)
+    if classes.size != class_number:
+        print('The number of the classes {} does not match the number of the prediction columns {}.'.format(
+            classes.size, class_number))
+    column = np.clip(np.searchsorted(classes, label), 0, classes.size - 1)
+    if np.any(classes[column] != label):
+        print('Some labels are not in the classes {}.'.format(classes.tolist()))
+    return column
+
+def MultiClassAUC(y_true, y_pred, classes=None):
+    '''
+    Calculate the one-vs-rest AUC of each class, the macro AUC and the micro AUC. The label is mapped to the column of
+    the prediction by LabelToColumn.
+    :param y_true: The label, dim should be 1.
+    :param y_pred: The prediction, shape is (number of cases, number of classes).
+    :param classes: The sorted classes of the training data. If it is None, the classes in the label are used.
+    :return: The AUC of each class, the macro AUC, and the micro AUC.
+    '''
+    column = LabelToColumn(y_true, y_pred.shape[1], classes)
+    one_hot = np.asarray(column[:, np.newaxis] == np.arange(y_pred.shape[1])[np.newaxis, :], dtype=np.float64)
+    class_auc = RankAUC(one_hot, y_pred)
+    macro_auc = np.nanmean(class_auc)
+    micro_auc = RankAUC(one_hot.reshape((-1, 1)), y_pred.reshape((-1, 1)))[0]
+    return class_auc, macro_auc, micro_auc
+
+def MultiClassAUC_Confidence_Interval(y_true, y_pred, CI_index=0.95, classes=None):
+    '''
+    The same as AUC_Confidence_Interval but for the macro AUC of the multi-class prediction. The bootstrap samples
+    missing any class are rejected.
+    :param y_true: The label, dim should be 1.
+    :param y_pred: The prediction, shape is (number of cases, number of classes).
+    :param CI_index: The range of confidence interval. Default is 95%
+    :param classes: The sorted classes of the training data. If it is None, the classes in the label are used.
+    :return: The macro AUC value, a list of the confidence interval, the boot strap result.
+    '''
+    y_true = LabelToColumn(y_true, y_pred.shape[1], classes)
+    _, AUC, _ = MultiClassAUC(y_true, y_pred, np.arange(y_pred.shape[1]))
+
+    n_bootstraps = 1000
+    rng = np.random.RandomState(42)
+    bootstrapped_scores = []
+    for i in range(n_bootstraps):
+        indices = rng.randint(0, len(y_true), len(y_true))
+        if len(np.unique(y_true[indices])) < y_pred.shape[1]:
+            continue
+        _, score, _ = MultiClassAUC(y_true[indices], y_pred[indices], np.arange(y_pred.shape[1]))
+        bootstrapped_scores.append(score)
+
+    sorted_scores = np.array(bootstrapped_scores)
+    sorted_scores.sort()
+    if sorted_scores.size == 0:
+        return AUC, [np.nan, np.nan], sorted_scores
+
+    confidence_lower = sorted_scores[int((1.0 - CI_index) / 2 * len(sorted_scores))]
+    confidence_upper = sorted_scores[min(int(1.0 - (1.0 - CI_index) / 2 * len(sorted_scores)), len(sorted_scores) - 1)]
+    return AUC, [confidence_lower, confidence_upper], sorted_scores
+
+def EstimateMultiClassMetric(prediction, label, key_word='', classes=None):
+    '''
+    Calculate the metric of the multi-class prediction. The class is predicted by the maximum probability. The
+    sensitivity, specificity, PPV and NPV are the macro average of the one-vs-rest results. The keys are the same as
+    EstimateMetirc, and the micro AUC and the AUC of each class are also added.
+    :param prediction: The prediction, shape is (number of cases, number of classes).
+    :param label: The label, dim is 1. It is mapped to the column of the prediction by LabelToColumn.
+    :param key_word: The word to add in front of the metric key.
+    :param classes: The sorted classes of the training data. If it is None, the classes in the label are used.
+    :return: A dictionary of the calculated metrics
+    '''
+    from sklearn.metrics import confusion_matrix
+    if key_word != '':
+        key_word += '_'
+
+    class_number = prediction.shape[1]
+    label = LabelToColumn(label, class_number, classes)
+    classes = np.arange(class_number)
+    class_count = np.bincount(label, minlength=class_number)
+
+    metric = {}
+    metric[key_word + 'sample_number'] = len(label)
+    metric[key_word + 'positive_number'] = class_count[-1]
+    metric[key_word + 'negative_number'] = len(label) - class_count[-1]
+    metric[key_word + 'class_sample_number'] = class_count.tolist()
+    metric[key_word + 'Yorden Index'] = 'argmax'
+
+    pred = np.argmax(prediction, axis=1)
+    C = confusion_matrix(label, pred, labels=list(range(class_number)))
+    true_positive = np.diag(C).astype(np.float64)
+    false_negative = np.sum(C, axis=1) - true_positive
+    false_positive = np.sum(C, axis=0) - true_positive
+    true_negative = np.sum(C) - true_positive - false_negative - false_positive
+
+    def MacroRatio(numerator, denominator):
+        valid = denominator > 1e-6
+        if not np.any(valid):
+            return 0
+        return '{:.4f}'.format(np.mean(numerator[valid] / denominator[valid]))
+
+    metric[key_word + 'accuracy'] = '{:.4f}'.format(np.sum(true_positive) / label.size)
+    metric[key_word + 'sensitivity'] = MacroRatio(true_positive, true_positive + false_negative)
+    metric[key_word + 'specificity'] = MacroRatio(true_negative, true_negative + false_positive)
+    metric[key_word + 'positive predictive value'] = MacroRatio(true_positive, true_positive + false_positive)
+    metric[key_word + 'negative predictive value'] = MacroRatio(true_negative, true_negative + false_negative)
+
+    class_auc, _, micro_auc = MultiClassAUC(label, prediction, classes)
+    auc, ci, score = MultiClassAUC_Confidence_Interval(label, prediction, classes=classes)
+    metric[key_word + 'auc'] = '{:.4f}'.format(auc)
+    metric[key_word + 'auc 95% CIs'] = '[{:.4f}-{:.4f}]'.format(ci[0], ci[1])
+    metric[key_word + 'micro auc'] = '{:.4f}'.format(micro_auc)
+    metric[key_word + 'class auc'] = ['{:.4f}'.format(temp) for temp in class_auc]
+
+    return metric
+
+@Timed('metric')
+def EstimateMetirc(prediction, label, key_word='', classes=None):
     '''
     Calculate the medical metric according to prediction and the label.
-    :param prediction: The prediction. Dim is 1.
+    :param prediction: The prediction. Dim is 1. For the multi-class prediction, the dim is 2 and the
+    EstimateMultiClassMetric is used.
     :param label: The label. Dim is 1
     :param key_word: The word to add in front of the metric key. Usually to separate the training data set, validation
     data set, and the testing data set.
+    :param classes: The sorted classes of the training data, which are the columns of the multi-class prediction. It
+    is not used for the binary prediction.
     :return: A dictionary of the calculated metrics
     '''
+    from sklearn.metrics import roc_curve, confusion_matrix
+    if np.ndim(prediction) == 2:
+        return EstimateMultiClassMetric(prediction, label, key_word, classes)
+
     if key_word != '':
         key_word += '_'
 
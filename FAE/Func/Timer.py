@@ -0,0 +1,111 @@
+import os
+import csv
+import time
+import threading
+import collections
+from functools import wraps
+from contextlib import contextmanager
+
+
+class TimerRegistry:
+    '''
+    TimerRegistry collects the elapsed time of the named stages. The stages could be nested, and the name of a nested
+    stage is joined to the enclosing stage with '/', e.g. 'cross validation/fit'. For each stage, the number of calls,
+    the total and the maximum elapsed time (second) are recorded.
+    '''
+    def __init__(self):
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__record = collections.OrderedDict()
+        self.is_enable = True
+
+    def __GetStack(self):
+        if not hasattr(self.__local, 'stack'):
+            self.__local.stack = []
+        return self.__local.stack
+
+    def Reset(self):
+        with self.__lock:
+            self.__record = collections.OrderedDict()
+
+    def Add(self, name, elapsed):
+        with self.__lock:
+            record = self.__record.setdefault(name, [0, 0., 0.])
+            record[0] += 1
+            record[1] += elapsed
+            record[2] = max(record[2], elapsed)
+
+    @contextmanager
+    def Timer(self, name):
+        if not self.is_enable:
+            yield
+            return
+
+        stack = self.__GetStack()
+        stack.append(name)
+        key = '/'.join(stack)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.Add(key, time.perf_counter() - start_time)
+            stack.pop()
+
+    def GetRecord(self):
+        '''
+        :return: The dict of the stage name and (the number of calls, the total time, the maximum time).
+        '''
+        with self.__lock:
+            return collections.OrderedDict((name, tuple(record)) for name, record in self.__record.items())
+
+    def GetSummary(self):
+        '''
+        :return: The dict of the stage name and the total time.
+        '''
+        return collections.OrderedDict((name, record[1]) for name, record in self.GetRecord().items())
+
+
+# The registry which the FAE modules report into.
+timer_registry = TimerRegistry()
+
+def Timer(name):
+    return timer_registry.Timer(name)
+
+def Timed(name):
+    '''
+    The decorator to record the elapsed time of each call of the function as the stage name.
+    '''
+    def Decorator(function):
+        @wraps(function)
+        def Wrapper(*args, **kwargs):
+            with timer_registry.Timer(name):
+                return function(*args, **kwargs)
+        return Wrapper
+    return Decorator
+
+def SaveTiming(timing_list, store_path, is_append=False):
+    '''
+    Save the timing records into a csv file.
+    :param timing_list: The list of (the pipeline name, the record got by TimerRegistry.GetRecord()).
+    :param store_path: The path of the csv file.
+    :param is_append: If True, the records are appended to the existing file without the header, so the records of
+    each pipeline could be saved once it finishes.
+    '''
+    is_append = is_append and os.path.exists(store_path)
+    with open(store_path, 'a' if is_append else 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        if not is_append:
+            writer.writerow(['Pipeline', 'Stage', 'Count', 'Total(s)', 'Mean(s)', 'Max(s)'])
+        for pipeline_name, record in timing_list:
+            for stage_name, (count, total, maximum) in record.items():
+                writer.writerow([pipeline_name, stage_name, count, '{:.6f}'.format(total),
+                                 '{:.6f}'.format(total / max(count, 1)), '{:.6f}'.format(maximum)])
+
+if __name__ == '__main__':
+    with Timer('load'):
+        time.sleep(0.1)
+    for index in range(3):
+        with Timer('fit'):
+            with Timer('predict'):
+                time.sleep(0.01)
+    print(timer_registry.GetRecord())
@@ -0,0 +1,145 @@
+import os
+import csv
+import collections
+
+
+class CaseEntry:
+    '''
+    One case of the extraction manifest: the ROI path, the image path of each modality, the label and the path of the
+    quality features. An empty path means that the file was not found when the case was scanned.
+    '''
+    def __init__(self, case_name, case_folder, roi_path='', data_path_dict=None, label='', quality_feature_path='',
+                 is_included=True):
+        self.case_name = case_name
+        self.case_folder = case_folder
+        self.roi_path = roi_path
+        self.data_path_dict = collections.OrderedDict() if data_path_dict is None else data_path_dict
+        self.label = label
+        self.quality_feature_path = quality_feature_path
+        self.is_included = is_included
+
+    def IsComplete(self, modality_name_list):
+        if not self.roi_path:
+            return False
+        for modality_name in modality_name_list:
+            if not self.data_path_dict.get(modality_name, ''):
+                return False
+        return True
+
+
+class ExtractionManifest:
+    '''
+    The index of the cases for the radiomics extraction. The root folder is scanned once with os.scandir and the files
+    of each case are looked up in the listing of the case folder, instead of probing each candidate path. The manifest
+    could be saved as a csv file, edited (add cases, or set Include to 0 to exclude cases), and loaded to run the
+    extraction again without scanning.
+    '''
+    def __init__(self):
+        self.__case_dict = collections.OrderedDict()
+        self.modality_name_list = []
+
+    def __len__(self):
+        return len(self.__case_dict)
+
+    def __contains__(self, case_name):
+        return case_name in self.__case_dict
+
+    def GetCase(self, case_name):
+        return self.__case_dict[case_name]
+
+    def GetCaseList(self, is_included_only=True):
+        return [case for case in self.__case_dict.values() if case.is_included or not is_included_only]
+
+    def AddCase(self, case):
+        self.__case_dict[case.case_name] = case
+
+    def RemoveCase(self, case_name):
+        self.__case_dict.pop(case_name, None)
+
+    def SetIncluded(self, case_name, is_included):
+        self.__case_dict[case_name].is_included = is_included
+
+    def __FindFile(self, case_folder, file_name_set, name_list):
+        for name in name_list:
+            if name in file_name_set:
+                return os.path.join(case_folder, name)
+        return ''
+
+    def __ReadLabel(self, label_path):
+        label_value = 0
+        with open(label_path, 'r') as csvfile:
+            reader = csv.reader(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            for row in reader:
+                label_value = row[0]
+        return str(label_value)
+
+    def __ScanCase(self, case_name, case_folder, config_dict):
+        with os.scandir(case_folder) as iterator:
+            file_name_set = {entry.name for entry in iterator if entry.is_file()}
+
+        case = CaseEntry(case_name, case_folder)
+        case.roi_path = self.__FindFile(case_folder, file_name_set, ['ROI.nii', 'ROI.nii.gz'])
+        if not case.roi_path:
+            print('Check the ROI file path of case: ' + case_folder)
+
+        for modality_name in self.modality_name_list:
+            data_name = 'data' + str(config_dict[str(modality_name)])
+            data_path = self.__FindFile(case_folder, file_name_set, [data_name + '.nii', data_name + '.nii.gz'])
+            if not data_path:
+                print('Check the Data file path of case: ' + case_folder)
+            case.data_path_dict[modality_name] = data_path
+
+        if 'label.csv' in file_name_set:
+            case.label = self.__ReadLabel(os.path.join(case_folder, 'label.csv'))
+        if 'QualityFeature.csv' in file_name_set:
+            case.quality_feature_path = os.path.join(case_folder, 'QualityFeature.csv')
+        return case
+
+    def Scan(self, root_folder, config_dict, modality_name_list):
+        '''
+        Build the manifest from the root folder.
+        :param root_folder: The folder which contains one folder for each case.
+        :param config_dict: The dict of the modality name and the index N of the image file data<N>.nii(.gz).
+        :param modality_name_list: The modalities to extract.
+        :return: The number of the cases.
+        '''
+        self.__case_dict = collections.OrderedDict()
+        self.modality_name_list = list(modality_name_list)
+
+        with os.scandir(root_folder) as iterator:
+            case_folder_list = sorted((entry.name, entry.path) for entry in iterator if entry.is_dir())
+
+        for case_name, case_folder in case_folder_list:
+            self.AddCase(self.__ScanCase(case_name, case_folder, config_dict))
+        return len(self.__case_dict)
+
+    def Save(self, store_path):
+        header = ['CaseName', 'Include', 'CaseFolder', 'ROI'] + \
+                 ['Data_' + modality_name for modality_name in self.modality_name_list] + ['Label', 'QualityFeature']
+        with open(store_path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(header)
+            for case in self.__case_dict.values():
+                row = [case.case_name, int(case.is_included), case.case_folder, case.roi_path]
+                row += [case.data_path_dict.get(modality_name, '') for modality_name in self.modality_name_list]
+                row += [case.label, case.quality_feature_path]
+                writer.writerow(row)
+
+    def Load(self, file_path):
+        self.__case_dict = collections.OrderedDict()
+        with open(file_path, 'r', newline='') as csvfile:
+            reader = csv.DictReader(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            self.modality_name_list = [name[len('Data_'):] for name in reader.fieldnames if name.startswith('Data_')]
+            for row in reader:
+                data_path_dict = collections.OrderedDict(
+                    (modality_name, row['Data_' + modality_name]) for modality_name in self.modality_name_list)
+                is_included = row.get('Include', '1').strip() not in ['0', 'False', 'false', '']
+                self.AddCase(CaseEntry(row['CaseName'], row.get('CaseFolder', ''), row['ROI'], data_path_dict,
+                                       row.get('Label', ''), row.get('QualityFeature', ''), is_included))
+        return len(self.__case_dict)
+
+if __name__ == '__main__':
+    manifest = ExtractionManifest()
+    manifest.Scan(r'x:\Radiomics_ZhangJing\MM_Ly', {'T1C': 1}, ['T1C'])
+    manifest.Save(r'x:\Radiomics_ZhangJing\MM_Ly\manifest.csv')
+    print(len(manifest))
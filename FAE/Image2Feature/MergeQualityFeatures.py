@@ -1,9 +1,97 @@
 # This class should be applied after Radiomics features extracted.
-from FAE.Image2Feature.RadiomicsFeatureExtractor import RadiomicsFeatureExtractor
+import os
+import pandas as pd
+
+from FAE.DataContainer.DataContainer import DataContainer
 
 class MergeQualityFeature():
-    def __init__(self, extractor):
-        self.extractor = extractor
+    '''
+    Merge the quality features onto the extracted radiomics features. The quality features of each case are stored as a
+    csv file with two columns (the name and the value of each quality feature). The quality folder could contain one
+    folder for each case with the quality file (the layout of the extraction), or one csv file named by the case. All
+    quality features are collected into one table and joined onto the feature table by the case name once, so the quality
+    features could be added or updated without extracting the radiomics features again.
+    '''
+    def __init__(self, prefix='Quality_', quality_file_name='QualityFeature.csv'):
+        self.prefix = prefix
+        self.quality_file_name = quality_file_name
+        self.missing_case_list = []
+        self.extra_case_list = []
+
+    def __ReadQualityFile(self, file_path):
+        quality = pd.read_csv(file_path, header=None, index_col=0).iloc[:, 0]
+        quality.index = [self.prefix + str(name) for name in quality.index]
+        return pd.to_numeric(quality, errors='coerce')
+
+    def LoadQualityFeature(self, quality_folder):
+        '''
+        Collect the quality features of all cases.
+        :param quality_folder: The folder of the case folders, or the folder of the csv files named by the cases.
+        :return: The DataFrame of the quality features, indexed by the case name.
+        '''
+        quality_dict = {}
+        with os.scandir(quality_folder) as iterator:
+            for entry in iterator:
+                if entry.is_dir():
+                    file_path = os.path.join(entry.path, self.quality_file_name)
+                    if os.path.isfile(file_path):
+                        quality_dict[entry.name] = self.__ReadQualityFile(file_path)
+                elif entry.is_file() and entry.name.endswith('.csv'):
+                    quality_dict[os.path.splitext(entry.name)[0]] = self.__ReadQualityFile(entry.path)
+
+        quality_frame = pd.DataFrame.from_dict(quality_dict, orient='index')
+        return quality_frame.sort_index(axis=1)
+
+    def Merge(self, feature_frame, quality_frame):
+        '''
+        Join the quality features onto the feature table by the case name. The quality columns which already exist in
+        the feature table are replaced. The cases without quality features are filled with NaN.
+        :param feature_frame: The DataFrame of the features, indexed by the case name.
+        :param quality_frame: The DataFrame of the quality features, indexed by the case name.
+        :return: The merged DataFrame.
+        '''
+        feature_frame = feature_frame.copy()
+        feature_frame.index = feature_frame.index.astype(str)
+        quality_frame = quality_frame.copy()
+        quality_frame.index = quality_frame.index.astype(str)
+
+        self.missing_case_list = sorted(set(feature_frame.index) - set(quality_frame.index))
+        self.extra_case_list = sorted(set(quality_frame.index) - set(feature_frame.index))
+        if self.missing_case_list:
+            print('{:d} cases have no quality features and are filled with NaN: {}'.format(
+                len(self.missing_case_list), self.missing_case_list[:10]))
+        if self.extra_case_list:
+            print('{:d} cases with quality features are not in the feature table: {}'.format(
+                len(self.extra_case_list), self.extra_case_list[:10]))
+
+        feature_frame = feature_frame.drop(columns=[column for column in quality_frame.columns
+                                                    if column in feature_frame.columns])
+        return feature_frame.join(quality_frame, how='left')
+
+    def Run(self, feature_table, quality_folder, store_path=''):
+        '''
+        Merge the quality features into the DataContainer.
+        :param feature_table: The DataContainer, or the path of the feature csv file (the first column is the case name).
+        :param quality_folder: The folder of the quality features, see LoadQualityFeature.
+        :param store_path: If set, the merged features would be stored as a csv file.
+        :return: The DataContainer with the quality features.
+        '''
+        if isinstance(feature_table, DataContainer):
+            if feature_table.GetFrame() is None:
+                feature_table.UpdateFrameByData()
+            feature_frame = feature_table.GetFrame()
+        else:
+            feature_frame = pd.read_csv(feature_table, header=0, index_col=0)
+
+        merged_frame = self.Merge(feature_frame, self.LoadQualityFeature(quality_folder))
+
+        data_container = DataContainer()
+        data_container.SetFrame(merged_frame)
+        if store_path:
+            data_container.Save(store_path)
+        return data_container
 
 if __name__ == '__main__':
-    pass
\ No newline at end of file
+    merge = MergeQualityFeature()
+    data_container = merge.Run(r'..\..\Example\numeric_feature.csv', r'x:\Radiomics_ZhangJing\MM_Ly')
+    data_container.ShowInformation()
@@ -4,18 +4,365 @@ import os
 import csv
 import copy
 import logging
+import hashlib
+import pickle
+import numpy as np
 import pandas as pd
+import SimpleITK as sitk
+from concurrent.futures import ProcessPoolExecutor
 
 from FAE.Func.Visualization import LoadWaitBar
+from FAE.Image2Feature.ExtractionManifest import ExtractionManifest
+
+class RoiLoader:
+    '''
+    Load the images for the extractor. The ROI of a case is read once and kept in memory, and the same ROI image is fed
+    to the extractor for all modalities of the case. If crop_padding is set, the image and the ROI are cropped to the
+    bounding box of the ROI (plus crop_padding voxels on each side) before the extraction. The bounding box is found at
+    the first crop of the ROI and kept with it. The crop is only applied when the image and the ROI share the same
+    geometry.
+    '''
+    def __init__(self, crop_padding=None, max_roi_number=4):
+        self.crop_padding = crop_padding
+        self.max_roi_number = max_roi_number
+        self.__roi_dict = collections.OrderedDict()
+
+    def __GetBoundingBox(self, roi_image):
+        roi_array = sitk.GetArrayViewFromImage(roi_image)
+        nonzero_index = np.nonzero(roi_array)
+        if len(nonzero_index[0]) == 0:
+            return None
+        # The array is indexed as (z, y, x), while SimpleITK uses (x, y, z)
+        lower = [int(np.min(index)) for index in nonzero_index][::-1]
+        upper = [int(np.max(index)) for index in nonzero_index][::-1]
+        return lower, upper
+
+    def GetRoi(self, roi_path):
+        if roi_path in self.__roi_dict:
+            self.__roi_dict.move_to_end(roi_path)
+            return self.__roi_dict[roi_path]
+
+        roi_image = sitk.ReadImage(roi_path)
+        roi = (roi_image, {})
+        self.__roi_dict[roi_path] = roi
+        while len(self.__roi_dict) > self.max_roi_number:
+            self.__roi_dict.popitem(last=False)
+        return roi
+
+    def __IsSameGeometry(self, image, roi_image):
+        return image.GetSize() == roi_image.GetSize() and \
+               np.allclose(image.GetOrigin(), roi_image.GetOrigin()) and \
+               np.allclose(image.GetSpacing(), roi_image.GetSpacing()) and \
+               np.allclose(image.GetDirection(), roi_image.GetDirection())
+
+    def __Crop(self, image, bounding_box):
+        lower, upper = bounding_box
+        size = image.GetSize()
+        index = [max(0, low - self.crop_padding) for low in lower]
+        crop_size = [min(size[axis] - 1, upper[axis] + self.crop_padding) - index[axis] + 1 for axis in range(len(size))]
+        return sitk.RegionOfInterest(image, crop_size, index)
+
+    def Load(self, data_path, roi_path):
+        '''
+        Load the image and the ROI of one modality.
+        :param data_path: The path of the image.
+        :param roi_path: The path of the ROI. The decoded ROI is reused for the following modalities of the same case.
+        :return: The image and the ROI (SimpleITK.Image).
+        '''
+        image = sitk.ReadImage(data_path)
+        roi_image, crop_roi_dict = self.GetRoi(roi_path)
+        if self.crop_padding is None or not self.__IsSameGeometry(image, roi_image):
+            return image, roi_image
+
+        if 'bounding_box' not in crop_roi_dict:
+            crop_roi_dict['bounding_box'] = self.__GetBoundingBox(roi_image)
+        bounding_box = crop_roi_dict['bounding_box']
+        if bounding_box is None:
+            return image, roi_image
+
+        if 'roi' not in crop_roi_dict:
+            crop_roi_dict['roi'] = self.__Crop(roi_image, bounding_box)
+        return self.__Crop(image, bounding_box), crop_roi_dict['roi']
+
+def ExtractModalityFeature(extractor, data_path, roi_path, modality_name, roi_loader=None):
+    if roi_loader is None:
+        result = extractor.execute(data_path, roi_path)
+    else:
+        image, roi_image = roi_loader.Load(data_path, roi_path)
+        result = extractor.execute(image, roi_image)
+    feature_names = []
+    feature_values = list(result.values())
+    for feature_name in list(result.keys()):
+        feature_names.append(modality_name + '_' + feature_name)
+    return feature_names, feature_values
+
+# Each worker process builds its own extractor from the parameter file once, and reuses it for the following tasks.
+_process_extractor = None
+_process_parameter_file = None
+_process_roi_loader = None
+
+def _GetProcessExtractor(radiomics_parameter_file):
+    global _process_extractor, _process_parameter_file
+    if _process_extractor is None or _process_parameter_file != radiomics_parameter_file:
+        _process_extractor = featureextractor.RadiomicsFeaturesExtractor(radiomics_parameter_file)
+        _process_parameter_file = radiomics_parameter_file
+    return _process_extractor
+
+def _GetProcessRoiLoader(crop_padding):
+    global _process_roi_loader
+    if _process_roi_loader is None or _process_roi_loader.crop_padding != crop_padding:
+        _process_roi_loader = RoiLoader(crop_padding)
+    return _process_roi_loader
+
+def _ExtractModalityInProcess(task):
+    radiomics_parameter_file, data_path, roi_path, modality_name, crop_padding = task
+    return ExtractModalityFeature(_GetProcessExtractor(radiomics_parameter_file), data_path, roi_path, modality_name,
+                                  _GetProcessRoiLoader(crop_padding))
+
+def _ExtractCaseInProcess(task_list):
+    return [_ExtractModalityInProcess(task) for task in task_list]
+
+class FeatureCache:
+    '''
+    The cache of the extracted features of each pair of case and modality. The key is made of the signatures of the image
+    and the ROI files (the path with the modified time and the size, or the MD5 of the content), the MD5 of the radiomics
+    parameter file and the modality name. Each item is stored as a pickle file in the cache folder, so the unchanged
+    cases are not extracted again.
+    '''
+    def __init__(self, cache_folder, radiomics_parameter_file, is_content_hash=False):
+        self.cache_folder = cache_folder
+        self.is_content_hash = is_content_hash
+        if not os.path.exists(self.cache_folder):
+            os.makedirs(self.cache_folder)
+
+        if os.path.isfile(radiomics_parameter_file):
+            self.parameter_hash = self.__ContentHash(radiomics_parameter_file)
+        else:
+            self.parameter_hash = hashlib.md5(str(radiomics_parameter_file).encode('utf-8')).hexdigest()
+
+    def __ContentHash(self, file_path):
+        md5 = hashlib.md5()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                md5.update(chunk)
+        return md5.hexdigest()
+
+    def __FileSignature(self, file_path):
+        if self.is_content_hash:
+            return self.__ContentHash(file_path)
+        stat = os.stat(file_path)
+        return '{}_{:d}_{:d}'.format(os.path.abspath(file_path), int(stat.st_mtime * 1e6), stat.st_size)
+
+    def GetKey(self, data_path, roi_path, modality_name, option=''):
+        key = '|'.join([self.__FileSignature(data_path), self.__FileSignature(roi_path), self.parameter_hash, modality_name,
+                        option])
+        return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+    def Get(self, key):
+        cache_path = os.path.join(self.cache_folder, key + '.pkl')
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, 'rb') as file:
+                return pickle.load(file)
+        except Exception:
+            return None
+
+    def Set(self, key, result):
+        cache_path = os.path.join(self.cache_folder, key + '.pkl')
+        with open(cache_path + '.tmp', 'wb') as file:
+            pickle.dump(result, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(cache_path + '.tmp', cache_path)
+
+class FeatureLogWriter:
+    '''
+    The append-only writer of the extracted features. The header is written once and one row is appended for each case,
+    which is flushed and synced to the disk at once. The rows are written into a log file (<store_path>.part), and
+    Finish() renames it to the store path atomically, so a crash never leaves a broken features.csv. If the log file
+    exists, Resume() reads the extracted cases back and drops the row broken by the crash.
+    '''
+    def __init__(self, store_path):
+        self.store_path = store_path
+        self.log_path = store_path + '.part'
+        self.header = []
+        self.case_list = []
+        self.feature_values = []
+        self.__file = None
+        self.__writer = None
+
+    def Resume(self):
+        if not os.path.exists(self.log_path):
+            return False
+
+        with open(self.log_path, 'r', newline='') as file:
+            content = file.read()
+        # The last line without the line break may be cut by the crash.
+        valid_content = content[:content.rfind('\n') + 1]
+
+        rows = list(csv.reader(valid_content.splitlines(), delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL))
+        if len(rows) == 0:
+            os.remove(self.log_path)
+            return False
+
+        self.header = rows[0]
+        self.case_list, self.feature_values = [], []
+        for row in rows[1:]:
+            self.case_list.append(row[0])
+            self.feature_values.append(row[1:])
+
+        with open(self.log_path, 'w', newline='') as file:
+            self.__writer = csv.writer(file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            self.__writer.writerow(self.header)
+            for case_name, feature_value in zip(self.case_list, self.feature_values):
+                self.__writer.writerow([case_name] + feature_value)
+            file.flush()
+            os.fsync(file.fileno())
+
+        self.__file = open(self.log_path, 'a', newline='')
+        self.__writer = csv.writer(self.__file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        return True
+
+    def __Sync(self):
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+
+    def WriteHeader(self, feature_name_list):
+        self.header = ['CaseName'] + list(feature_name_list)
+        self.__file = open(self.log_path, 'w', newline='')
+        self.__writer = csv.writer(self.__file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        self.__writer.writerow(self.header)
+        self.__Sync()
+
+    def Append(self, case_name, feature_value):
+        row = list(map(str, feature_value))
+        row.insert(0, case_name)
+        self.__writer.writerow(row)
+        self.__Sync()
+
+    def Finish(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+        if os.path.exists(self.log_path):
+            os.replace(self.log_path, self.store_path)
+
+class FeatureSchema:
+    '''
+    The feature names (columns) of the extracted features. The name to column lookup is a dict, and the values of each
+    case are written into a row preallocated with NaN by the column index, so a missing feature of a case never shifts
+    the following columns. The missing and the extra (not in the schema) features are recorded for each case. The
+    diagnostics of pyradiomics (versions, hashes, bounding boxes...) are split from the numeric features by the name.
+    '''
+    def __init__(self, feature_name_list=()):
+        self.feature_name_list = list(feature_name_list)
+        self.__column_dict = {feature_name: index for index, feature_name in enumerate(self.feature_name_list)}
+        self.report = collections.OrderedDict()
+
+        self.diagnostics_index = [index for index, feature_name in enumerate(self.feature_name_list)
+                                  if self.IsDiagnostics(feature_name)]
+        diagnostics_set = set(self.diagnostics_index)
+        self.numeric_index = [index for index in range(len(self.feature_name_list)) if index not in diagnostics_set]
+
+    def IsDiagnostics(self, feature_name):
+        return feature_name.startswith('diagnostics_') or '_diagnostics_' in feature_name
+
+    def GetNumericName(self):
+        return [self.feature_name_list[index] for index in self.numeric_index]
+
+    def GetDiagnosticsName(self):
+        return [self.feature_name_list[index] for index in self.diagnostics_index]
+
+    def SplitRow(self, row):
+        '''
+        Split a row into the numeric features and the diagnostics.
+        :param row: The row of feature values in the order of the schema.
+        :return: The numeric features (float32 array, NaN if the value could not be converted) and the diagnostics.
+        '''
+        numeric_value = np.full((len(self.numeric_index),), np.nan, dtype=np.float32)
+        for numeric_index, index in enumerate(self.numeric_index):
+            try:
+                numeric_value[numeric_index] = float(row[index])
+            except (TypeError, ValueError):
+                pass
+        return numeric_value, [row[index] for index in self.diagnostics_index]
+
+    def __len__(self):
+        return len(self.feature_name_list)
+
+    def __contains__(self, feature_name):
+        return feature_name in self.__column_dict
+
+    def GetIndex(self, feature_name):
+        return self.__column_dict.get(feature_name, -1)
+
+    def Align(self, case_name, feature_dict):
+        '''
+        Write the features of one case into a row of the schema.
+        :param case_name: The name of the case, used for the report.
+        :param feature_dict: The dict of the feature name and the feature value.
+        :return: The row of feature values. The missing features are filled with NaN.
+        '''
+        row = [np.nan for _ in range(len(self.feature_name_list))]
+        is_filled = [False for _ in range(len(self.feature_name_list))]
+        extra_feature_list = []
+        for feature_name, feature_value in feature_dict.items():
+            index = self.__column_dict.get(feature_name, -1)
+            if index < 0:
+                extra_feature_list.append(feature_name)
+            else:
+                row[index] = feature_value
+                is_filled[index] = True
+
+        missing_feature_list = [feature_name for feature_name, filled in zip(self.feature_name_list, is_filled)
+                                if not filled]
+        if missing_feature_list or extra_feature_list:
+            self.report[case_name] = (missing_feature_list, extra_feature_list)
+            print('Case {}: {:d} missing features were filled with NaN, {:d} extra features were ignored.'.format(
+                case_name, len(missing_feature_list), len(extra_feature_list)))
+        return row
+
+    def SaveReport(self, store_path):
+        with open(store_path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(['CaseName', 'Missing', 'Extra'])
+            for case_name, (missing_feature_list, extra_feature_list) in self.report.items():
+                writer.writerow([case_name, ';'.join(missing_feature_list), ';'.join(extra_feature_list)])
 
 class RadiomicsFeatureExtractor:
-    def __init__(self, radiomics_parameter_file, config_file, modality_name_list):
+    '''
+    Extract the radiomics features of all cases in the root folder. Each case folder contains the ROI (ROI.nii or
+    ROI.nii.gz), the images (data<N>.nii or data<N>.nii.gz) and the label.csv. The cases could be extracted by several
+    processes (process_number > 1), and each process uses its own extractor built from the same parameter file. The
+    parallel unit could be 'case' or 'modality' (each pair of case and modality). The results are always merged in the
+    sorted case order, so the stored features are the same as the serial extraction. The features are appended to the
+    store file case by case, and a restarted extraction skips the cases which were already stored. The features of each
+    case and modality are cached (in <store_folder>/FeatureCache by default), and only the new or modified cases are
+    extracted when the extraction is run again. The columns are fixed by the first case (FeatureSchema), and the missing
+    or extra features of the other cases are reported in feature_schema_report.csv. The ROI of each case is loaded once
+    for all modalities (RoiLoader), and the images could be cropped to the ROI with crop_padding. The cases are indexed
+    by an ExtractionManifest, which is saved as manifest.csv in the store folder and could be edited and passed to
+    Execute to run the extraction without scanning the root folder again. Besides features.csv, the numeric features are
+    stored as a float32 matrix in features.npz (see DataContainer.LoadBinary), and the diagnostics in diagnostics.csv.
+    '''
+    def __init__(self, radiomics_parameter_file, config_file, modality_name_list, process_number=1, parallel_unit='case',
+                 cache_folder='', is_content_hash=False, crop_padding=None):
         self.feature_values = []
         self.case_list = []
         self.feature_name_list = []
+        self.numeric_values = []
+        self.diagnostics_values = []
+        self.schema = None
+        self.__case_set = set()
         self.config_dict = dict()
 
         self.modality_name_list = modality_name_list
+        self.radiomics_parameter_file = radiomics_parameter_file
+        self.process_number = process_number
+        self.parallel_unit = parallel_unit
+        self.cache_folder = cache_folder
+        self.is_content_hash = is_content_hash
+        self.crop_padding = crop_padding
+        self.roi_loader = RoiLoader(crop_padding)
         self.logger = logging.getLogger(__name__)
         try:
             self.extractor = featureextractor.RadiomicsFeaturesExtractor(radiomics_parameter_file)
@@ -30,124 +377,118 @@ class RadiomicsFeatureExtractor:
                 for row in reader:
                     self.config_dict[row[0]] = row[1]
 
-    def __GetFeatureValuesEachModality(self, data_path, roi_path, modality_name):
-        result = self.extractor.execute(data_path, roi_path)
-        feature_names = []
-        feature_values = list(result.values())
-        for feature_name in list(result.keys()):
-            feature_names.append(modality_name + '_' + feature_name)
-        return feature_names, feature_values
+    def __GetModalityTask(self, case):
+        if not case.IsComplete(self.modality_name_list):
+            return []
+
+        task_list = []
+        for modality_name in self.modality_name_list:
+            task_list.append((self.radiomics_parameter_file, case.data_path_dict[modality_name], case.roi_path,
+                              modality_name, self.crop_padding))
+        return task_list
+
+    def __ExtractAllCases(self, case_list, cache=None):
+        case_task_list = []
+        for case in case_list:
+            case_name = case.case_name
+            task_list = self.__GetModalityTask(case)
+            if not task_list:
+                print('Skip the case: ', case_name)
+                continue
 
-    def __GetFeatureValues(self, case_folder):
-        feature_dict = {}
-        if os.path.exists(os.path.join(case_folder, 'ROI.nii')):
-            roi_path = os.path.join(case_folder, 'ROI.nii')
-        elif os.path.exists(os.path.join(case_folder, 'ROI.nii.gz')):
-            roi_path = os.path.join(case_folder, 'ROI.nii.gz')
-        else:
-            self.logger.error('Check the ROI file path of case: ' + case_folder)
+            if cache:
+                option = '' if self.crop_padding is None else 'crop{}'.format(self.crop_padding)
+                key_list = [cache.GetKey(task[1], task[2], task[3], option) for task in task_list]
+                cached_list = [cache.Get(key) for key in key_list]
+            else:
+                key_list = [None for _ in task_list]
+                cached_list = [None for _ in task_list]
+            pending_list = [task for task, cached in zip(task_list, cached_list) if cached is None]
+            case_task_list.append((case_name, case, key_list, cached_list, pending_list))
+
+        def MergeResult(key_list, cached_list, pending_result_list):
+            pending_result_list = iter(pending_result_list)
+            modality_result = []
+            for key, cached in zip(key_list, cached_list):
+                if cached is None:
+                    cached = next(pending_result_list)
+                    if cache:
+                        cache.Set(key, cached)
+                modality_result.append(cached)
+            return modality_result
+
+        if self.process_number <= 1:
+            for case_name, case, key_list, cached_list, pending_list in case_task_list:
+                pending_result_list = [ExtractModalityFeature(self.extractor, task[1], task[2], task[3], self.roi_loader)
+                                       for task in pending_list]
+                yield case_name, case, MergeResult(key_list, cached_list, pending_result_list)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.process_number) as executor:
+            if self.parallel_unit == 'modality':
+                result_iterator = executor.map(_ExtractModalityInProcess,
+                                               [task for case_task in case_task_list for task in case_task[4]])
+                for case_name, case, key_list, cached_list, pending_list in case_task_list:
+                    pending_result_list = [next(result_iterator) for _ in pending_list]
+                    yield case_name, case, MergeResult(key_list, cached_list, pending_result_list)
+            else:
+                result_iterator = executor.map(_ExtractCaseInProcess, [case_task[4] for case_task in case_task_list])
+                for (case_name, case, key_list, cached_list, _), pending_result_list in zip(case_task_list, result_iterator):
+                    yield case_name, case, MergeResult(key_list, cached_list, pending_result_list)
 
-        quality_feature_path = os.path.join(case_folder, 'QualityFeature.csv')
-        if os.path.exists(quality_feature_path):
-            with open(quality_feature_path, 'r') as csvfile:
-                reader = csv.reader(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+    def __GetCaseFeature(self, case, modality_result):
+        feature_dict = {}
+        # Add quality feature
+        if case.quality_feature_path:
+            with open(case.quality_feature_path, 'r') as csvfile:
+                reader = csv.reader(csvfile, delimiter=',', quotechar='"',  quoting=csv.QUOTE_MINIMAL)
                 for row in reader:
                     feature_dict['Quality_' + row[0]] = row[1]
 
-        for data_num in range(len(self.modality_name_list)):
-            modality_name = self.modality_name_list[data_num]
-
-            if os.path.exists(os.path.join(case_folder,'data' + str(self.config_dict[str(modality_name)]) + '.nii')):
-                data_name = 'data' + str(self.config_dict[str(modality_name)]) + '.nii'
-                data_path = os.path.join(case_folder, data_name)
-            elif os.path.exists(os.path.join(case_folder,'data' + str(self.config_dict[str(modality_name)]) + '.nii.gz')):
-                data_name = 'data' + str(self.config_dict[str(modality_name)]) + '.nii.gz'
-                data_path = os.path.join(case_folder, data_name)
-            else:
-                self.logger.error('Check the Data file path of case: ' + case_folder)
-
-            feature_names_each_modality, feature_values_each_modality = self.__GetFeatureValuesEachModality(data_path, roi_path, modality_name)
+        # Add Radiomics features
+        for feature_names_each_modality, feature_values_each_modality in modality_result:
             for feature_name, feature_value in zip(feature_names_each_modality, feature_values_each_modality):
-                if feature_name in self.feature_name_list:
-                    feature_dict[feature_name] = feature_value
-                else:
-                    print('Check the feature name in the feature name list')
+                feature_dict[feature_name] = feature_value
 
         feature_dict = collections.OrderedDict(sorted(feature_dict.items()))
-        feature_values = list(feature_dict.values())
 
         # Add Label
-        label_value = 0
-        label_path = os.path.join(case_folder, 'label.csv')
-        if os.path.exists(label_path):
-            with open(label_path, 'r') as csvfile:
-                reader = csv.reader(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-                for row in reader:
-                    label_value = row[0]
-
-            feature_values.insert(0, label_value)
+        if case.label != '':
+            feature_dict['label'] = case.label
+            feature_dict.move_to_end('label', last=False)
         else:
-            print('No label file!: ', label_path)
+            print('No label file!: ', os.path.join(case.case_folder, 'label.csv'))
 
+        return feature_dict
 
-        return feature_values
+    def __GetFeatureValues(self, case_name, case, modality_result):
+        return self.schema.Align(case_name, self.__GetCaseFeature(case, modality_result))
 
     def __MergeCase(self, case_name, feature_values):
-        if case_name in self.case_list:
+        if case_name in self.__case_set:
             print('The case exists!')
             return False
         else:
+            self.__case_set.add(case_name)
             self.case_list.append(case_name)
             self.feature_values.append(feature_values)
+            numeric_value, diagnostics_value = self.schema.SplitRow(feature_values)
+            self.numeric_values.append(numeric_value)
+            self.diagnostics_values.append(diagnostics_value)
             return True
 
-    def __InitialFeatureValues(self, case_folder):
-        feature_dict = {}
-        if os.path.exists(os.path.join(case_folder, 'ROI.nii')):
-            roi_path = os.path.join(case_folder, 'ROI.nii')
-        elif os.path.exists(os.path.join(case_folder, 'ROI.nii.gz')):
-            roi_path = os.path.join(case_folder, 'ROI.nii.gz')
-        else:
-            self.logger.error('Check the ROI file path of case: ' + case_folder)
-
-        # Add quality feature
-        quality_feature_path = os.path.join(case_folder, 'QualityFeature.csv')
-        if os.path.exists(quality_feature_path):
-            with open(quality_feature_path, 'r') as csvfile:
-                reader = csv.reader(csvfile, delimiter=',', quotechar='"',  quoting=csv.QUOTE_MINIMAL)
-                for row in reader:
-                    feature_dict['Quality_' + row[0]] = row[1]
-
-        # Add Radiomics features
-        for data_num in range(len(self.modality_name_list)):
-            modality_name = self.modality_name_list[data_num]
-            data_path = os.path.join(case_folder, 'data' + str(self.config_dict[str(modality_name)]) + '.nii')
-            if not os.path.exists(data_path):
-                data_path = os.path.join(case_folder, 'data' + str(self.config_dict[str(modality_name)]) + '.nii.gz')
-
-            feature_names_each_modality, feature_values_each_modality = self.__GetFeatureValuesEachModality(data_path, roi_path, modality_name)
-            for feature_name, feature_value in zip(feature_names_each_modality, feature_values_each_modality):
-                feature_dict[feature_name] = feature_value
-
-        feature_dict = collections.OrderedDict(sorted(feature_dict.items()))
-        feature_names = list(feature_dict.keys())
-        feature_values = list(feature_dict.values())
-
-        # Add Label
-        label_value = 0
-        label_path = os.path.join(case_folder, 'label.csv')
-        if os.path.exists(label_path):
-            with open(label_path, 'r') as csvfile:
-                reader = csv.reader(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-                for row in reader:
-                    label_value = row[0]
-            feature_names.insert(0, 'label')
-            feature_values.insert(0, label_value)
-        else:
-            print('No label file!: ', label_path)
-
-        self.feature_name_list = feature_names
-        self.feature_values.append(feature_values)
+    def __SplitAllCases(self):
+        self.numeric_values, self.diagnostics_values = [], []
+        for feature_values in self.feature_values:
+            numeric_value, diagnostics_value = self.schema.SplitRow(feature_values)
+            self.numeric_values.append(numeric_value)
+            self.diagnostics_values.append(diagnostics_value)
+
+    def __InitialFeatureValues(self, case_name, case, modality_result):
+        feature_dict = self.__GetCaseFeature(case, modality_result)
+        self.schema = FeatureSchema(feature_dict.keys())
+        self.feature_name_list = self.schema.feature_name_list
+        self.__MergeCase(case_name, list(feature_dict.values()))
         self.__TempSave('temp.csv')
 
     def __TempSave(self, store_path):
@@ -156,23 +497,48 @@ class RadiomicsFeatureExtractor:
             for feature_name, feature_value in zip(self.feature_name_list, self.feature_values[0]):
                 writer.writerow([feature_name, feature_value])
 
-    def __IterateCase(self, root_folder, store_path=''):
-        case_name_list = os.listdir(root_folder)
-        case_name_list.sort()
-        for case_name in case_name_list:
-            case_path = os.path.join(root_folder, case_name)
-            if os.path.isfile(case_path):
-                continue
+    def __IterateCase(self, manifest, store_path=''):
+        case_list = manifest.GetCaseList()
+
+        writer, cache = None, None
+        if self.cache_folder:
+            cache = FeatureCache(self.cache_folder, self.radiomics_parameter_file, self.is_content_hash)
+        elif store_path:
+            cache = FeatureCache(os.path.join(os.path.dirname(store_path), 'FeatureCache'),
+                                 self.radiomics_parameter_file, self.is_content_hash)
+
+        if store_path:
+            writer = FeatureLogWriter(store_path)
+            if writer.Resume():
+                self.schema = FeatureSchema(writer.header[1:])
+                self.feature_name_list = self.schema.feature_name_list
+                self.case_list = writer.case_list
+                self.feature_values = writer.feature_values
+                self.__case_set = set(self.case_list)
+                self.__SplitAllCases()
+                case_list = [case for case in case_list if case.case_name not in self.__case_set]
+                print('Resume the extraction, {:d} cases were extracted.'.format(len(self.__case_set)))
+
+        for case_name, case, modality_result in self.__ExtractAllCases(case_list, cache):
             print(case_name)
-            if self.feature_name_list != [] and self.feature_values != []:
-                feature_values = self.__GetFeatureValues(case_path)
-                self.__MergeCase(case_name, feature_values)
+            if self.schema is not None:
+                feature_values = self.__GetFeatureValues(case_name, case, modality_result)
+                is_merged = self.__MergeCase(case_name, feature_values)
             else:
-                self.__InitialFeatureValues(case_path)
-                self.case_list.append(case_name)
+                self.__InitialFeatureValues(case_name, case, modality_result)
+                is_merged = True
+                if writer:
+                    writer.WriteHeader(self.feature_name_list)
+
+            if writer and is_merged:
+                writer.Append(case_name, self.feature_values[-1])
 
-            if store_path:
-                self.Save(store_path)
+        if writer:
+            writer.Finish()
+            if self.schema is not None:
+                self.SaveBinary(os.path.dirname(store_path))
+                if self.schema.report:
+                    self.schema.SaveReport(os.path.join(os.path.dirname(store_path), 'feature_schema_report.csv'))
 
     def Save(self, store_path):
         header = copy.deepcopy(self.feature_name_list)
@@ -185,24 +551,68 @@ class RadiomicsFeatureExtractor:
                 row.insert(0, case_name)
                 writer.writerow(row)
 
+    def SaveBinary(self, store_folder):
+        '''
+        Store the numeric features as a float32 matrix in features.npz, and the diagnostics in diagnostics.csv.
+        :param store_folder: The folder to store the files.
+        '''
+        numeric_name = self.schema.GetNumericName()
+        if self.numeric_values:
+            array = np.stack(self.numeric_values).astype(np.float32)
+        else:
+            array = np.zeros((0, len(numeric_name)), dtype=np.float32)
+        np.savez(os.path.join(store_folder, 'features.npz'), array=array,
+                 case_name=np.array(self.case_list, dtype=str), feature_name=np.array(numeric_name, dtype=str))
+
+        with open(os.path.join(store_folder, 'diagnostics.csv'), 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            writer.writerow(['CaseName'] + self.schema.GetDiagnosticsName())
+            for case_name, diagnostics_value in zip(self.case_list, self.diagnostics_values):
+                writer.writerow([case_name] + list(map(str, diagnostics_value)))
+
     def Read(self, file_path):
         self.feature_values = []
         self.case_list = []
         self.feature_name_list = []
+        self.schema = None
 
         with open(file_path, 'r', newline='') as csvfile:
             reader = csv.reader(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
             for row in reader:
-                if row[0] == '':
-                    self.feature_name_list = row[1:]
+                if row[0] == '' or (row[0] == 'CaseName' and self.schema is None):
+                    self.schema = FeatureSchema(row[1:])
+                    self.feature_name_list = self.schema.feature_name_list
                 else:
                     self.case_list.append(row[0])
                     self.feature_values.append(row[1:])
-
-    def Execute(self, root_folder, store_folder=''):
+        self.__case_set = set(self.case_list)
+        if self.schema is not None:
+            self.__SplitAllCases()
+
+    def GetManifest(self, root_folder):
+        manifest = ExtractionManifest()
+        manifest.Scan(root_folder, self.config_dict, self.modality_name_list)
+        return manifest
+
+    def Execute(self, root_folder, store_folder='', manifest=None):
+        '''
+        Extract the features of all cases and store them in store_folder/features.csv.
+        :param root_folder: The folder of the cases. It is scanned only if the manifest is not set.
+        :param store_folder: The folder to store the features, the manifest and the cache.
+        :param manifest: An ExtractionManifest or the path of a saved manifest (csv).
+        '''
         if not os.path.exists(store_folder):
             os.mkdir(store_folder)
-        self.__IterateCase(root_folder, store_path=os.path.join(store_folder, 'features.csv'))
+
+        if manifest is None:
+            manifest = self.GetManifest(root_folder)
+            manifest.Save(os.path.join(store_folder, 'manifest.csv'))
+        elif isinstance(manifest, str):
+            manifest_path = manifest
+            manifest = ExtractionManifest()
+            manifest.Load(manifest_path)
+
+        self.__IterateCase(manifest, store_path=os.path.join(store_folder, 'features.csv'))
 
 def main():
     extractor = RadiomicsFeatureExtractor(r'..\RadiomicsParams.yaml', r'x:\Radiomics_ZhangJing\MM_Ly\FileConfig.csv', ['T1C'])
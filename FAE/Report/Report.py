@@ -6,6 +6,7 @@ import pandas as pd
 import csv
 
 from FAE.FeatureAnalysis.FeaturePipeline import OnePipeline
+from FAE.FeatureAnalysis.PredictionArchive import PredictionArchive, LoadPrediction
 from FAE.DataContainer.DataContainer import DataContainer
 
 class Report:
@@ -17,23 +18,37 @@ class Report:
     def Run(self, training_data_container, pipeline, result_folder, store_folder, testing_data_container=DataContainer()):
         # Data Description
         data_description_text = "    "
-        if len(np.unique(training_data_container.GetLabel())) != 2:
-            print('Only works for the 2-label classification')
+        class_list = np.unique(training_data_container.GetLabel())
+        if len(class_list) < 2:
+            print('At least 2 labels are needed for the classification')
             return False
-        positive_number = len(
-            np.where(training_data_container.GetLabel() == np.max(training_data_container.GetLabel()))[0])
-        negative_number = len(training_data_container.GetLabel()) - positive_number
 
-        data_description_text += "We selected {:d} cases as the training data set. {:d} of them were marked as positive and the left {:d} " \
-               "were marked as negative. ".format(len(training_data_container.GetCaseName()), positive_number, negative_number)
+        if len(class_list) == 2:
+            positive_number = len(
+                np.where(training_data_container.GetLabel() == np.max(training_data_container.GetLabel()))[0])
+            negative_number = len(training_data_container.GetLabel()) - positive_number
+
+            data_description_text += "We selected {:d} cases as the training data set. {:d} of them were marked as positive and the left {:d} " \
+                   "were marked as negative. ".format(len(training_data_container.GetCaseName()), positive_number, negative_number)
+        else:
+            class_number_text = ', '.join(['{:d} of label {}'.format(int(np.sum(training_data_container.GetLabel() == temp)), temp)
+                                           for temp in class_list])
+            data_description_text += "We selected {:d} cases as the training data set ({:s}). The {:d} labels were " \
+                                     "classified by one-vs-rest and the macro average of the metrics was reported. " \
+                                     "".format(len(training_data_container.GetCaseName()), class_number_text, len(class_list))
         if testing_data_container.IsEmpty():
             data_description_text += "Since the number of the samples were limited, there were no independent testing data. "
-        else:
+        elif len(class_list) == 2:
             positive_number = len(
                 np.where(testing_data_container.GetLabel() == np.max(testing_data_container.GetLabel()))[0])
             negative_number = len(testing_data_container.GetLabel()) - positive_number
             data_description_text += "We also selected another {:d} cases as the independent testing data set ({:d}/{:d} = positive/negative). \n" \
                     "".format(len(testing_data_container.GetCaseName()), positive_number, negative_number)
+        else:
+            class_number_text = ', '.join(['{:d} of label {}'.format(int(np.sum(testing_data_container.GetLabel() == temp)), temp)
+                                           for temp in class_list])
+            data_description_text += "We also selected another {:d} cases as the independent testing data set ({:s}). \n" \
+                    "".format(len(testing_data_container.GetCaseName()), class_number_text)
 
         # Method Description
         method_description_text = "    "
@@ -53,12 +68,23 @@ class Report:
                                      "FeAture Explorer (FAE, v0.1.1, https://github.com/salan668/FAE) on Python (3.5.4, https://www.python.org/). \n"
 
         # Result Description
+        root_folder = result_folder
         result_folder = os.path.join(result_folder, pipeline.GetStoreName())
         result = pd.read_csv(os.path.join(result_folder, 'result.csv'), index_col=0)
-        train_pred = np.load(os.path.join(result_folder, 'train_predict.npy'))
-        train_label = np.load(os.path.join(result_folder, 'train_label.npy'))
-        val_pred = np.load(os.path.join(result_folder, 'val_predict.npy'))
-        val_label = np.load(os.path.join(result_folder, 'val_label.npy'))
+        # The index of the archive is loaded once for all the data types.
+        archive = None
+        if PredictionArchive.IsAvailable(root_folder):
+            archive = PredictionArchive(root_folder)
+            archive.Load()
+        data_type_list = ['train', 'val'] if testing_data_container.IsEmpty() else ['train', 'val', 'test']
+        prediction_dict = {}
+        for data_type in data_type_list:
+            prediction_dict[data_type] = LoadPrediction(root_folder, pipeline.GetStoreName(), data_type, archive)
+            if prediction_dict[data_type] is None:
+                print('The {} prediction of {} does not exist.'.format(data_type, pipeline.GetStoreName()))
+                return False
+        train_pred, train_label = prediction_dict['train']
+        val_pred, val_label = prediction_dict['val']
 
         from FAE.Visualization.DrawROCList import DrawROCList
         if not testing_data_container.IsEmpty():
@@ -74,8 +100,7 @@ class Report:
                                                 float(result.loc['test_accuracy'].values)
                                                 )
 
-            test_pred = np.load(os.path.join(result_folder, 'test_predict.npy'))
-            test_label = np.load(os.path.join(result_folder, 'test_label.npy'))
+            test_pred, test_label = prediction_dict['test']
             DrawROCList([train_pred, val_pred, test_pred], [train_label, val_label, test_label], name_list=['train', 'val', 'test'],
                         store_path=os.path.join(store_folder, 'ROC.jpg'), is_show=False)
         else:
@@ -122,9 +147,10 @@ class Report:
         if len(candidate_file) > 0:
             coef = pd.read_csv(candidate_file[0], index_col=0, header=0)
             table_2_header = 'Table 2. The coefficients of features in the model. '
-            table_2 = [['Features', 'Coef in model']]
+            # The multi-class model has one column for each class.
+            table_2 = [['Features'] + (['Coef in model'] if coef.shape[1] == 1 else list(coef.columns))]
             for index in coef.index:
-                table_2.append([str(index), "{:.3f}".format(coef.loc[index].values[0])])
+                table_2.append([str(index)] + ["{:.3f}".format(value) for value in coef.loc[index].values])
 
         else:
             with open(os.path.join(result_folder, 'feature_select_info.csv'), 'r', newline='') as file:
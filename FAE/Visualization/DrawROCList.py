@@ -4,15 +4,38 @@ from matplotlib import cm
 import numpy as np
 import seaborn as sns
 
+from FAE.Func.Metric import LabelToColumn
+
 color_list = sns.color_palette('deep') + sns.color_palette('bright')
 
-def DrawROCList(pred_list, label_list, name_list='', store_path='', is_show=True, fig=plt.figure()):
+def ComputeROC(pred, label, classes=None):
+    '''
+    Compute the ROC curve. For the multi-class prediction with shape (cases, classes), the micro-average ROC curve is
+    computed, and the label is mapped to the column of the prediction by LabelToColumn.
+    :param classes: The sorted classes of the training data. If it is None, the classes in the label are used.
+    :return: (fpr, tpr, auc)
+    '''
+    pred, label = np.asarray(pred), np.asarray(label)
+    if pred.ndim == 2:
+        # The micro-average ROC curve of the one-vs-rest multi-class prediction
+        column = LabelToColumn(label, pred.shape[1], classes)
+        label = np.asarray(column[:, np.newaxis] == np.arange(pred.shape[1])[np.newaxis, :], dtype=int).ravel()
+        pred = pred.ravel()
+    fpr, tpr, threshold = roc_curve(label, pred)
+    auc = roc_auc_score(label, pred)
+    return fpr, tpr, auc
+
+def DrawROCList(pred_list, label_list, name_list='', store_path='', is_show=True, fig=None, roc_list=None):
     '''
     To Draw the ROC curve.
-    :param pred_list: The list of the prediction.
+    :param pred_list: The list of the prediction. For the multi-class prediction with shape (cases, classes), the
+    micro-average ROC curve is drawn.
     :param label_list: The list of the label.
     :param name_list: The list of the legend name.
     :param store_path: The store path. Support jpg and eps.
+    :param fig: The figure to draw on. A new figure is created if None.
+    :param roc_list: The list of (fpr, tpr, auc) computed by ComputeROC. If set, the ROC curves are not computed again
+    from pred_list and label_list.
     :return: None
 
     Apr-28-18, Yang SONG [yang.song.91@foxmail.com]
@@ -24,12 +47,16 @@ def DrawROCList(pred_list, label_list, name_list='', store_path='', is_show=True
     if not isinstance(name_list, list):
         name_list = [name_list]
 
+    if fig is None:
+        fig = plt.figure()
     fig.clear()
     axes = fig.add_subplot(1, 1, 1)
 
-    for index in range(len(pred_list)):
-        fpr, tpr, threshold = roc_curve(label_list[index], pred_list[index])
-        auc = roc_auc_score(label_list[index], pred_list[index])
+    if roc_list is None:
+        roc_list = [ComputeROC(pred, label) for pred, label in zip(pred_list, label_list)]
+
+    for index in range(len(roc_list)):
+        fpr, tpr, auc = roc_list[index]
         name_list[index] = name_list[index] + (' (AUC = %0.3f)' % auc)
 
         axes.plot(fpr, tpr, color=color_list[index], label='ROC curve (AUC = %0.3f)' % auc,linewidth=3)
@@ -7,7 +7,7 @@ color = sns.color_palette('deep') + sns.color_palette('bright')
 
 
 def FeatureSort(feature_name, group=np.array(()), group_name=[], value=[], store_path='',
-                is_sort=True, is_show=True, fig=plt.figure()):
+                is_sort=True, is_show=True, fig=None):
     '''
     Draw the plot of the sorted feature, an option is to draw different color according to the group and group value.
 
@@ -43,6 +43,8 @@ def FeatureSort(feature_name, group=np.array(()), group_name=[], value=[], store
         sub_group[group[index], index] = value[index]
     y = range(len(feature_name))
 
+    if fig is None:
+        fig = plt.figure()
     fig.clear()
     ax = fig.add_subplot(111)
 
@@ -140,11 +142,11 @@ def SeperateRadiomicsFeatures(feature_name):
 
     return sub_feature_name, np.asarray(group, dtype=np.uint8), group_name
 
-def SortRadiomicsFeature(feature_name, value=[], store_path='', is_show=False, fig=plt.figure()):
+def SortRadiomicsFeature(feature_name, value=[], store_path='', is_show=False, fig=None):
     sub_feature_name, group, group_name = SeperateRadiomicsFeatures(feature_name)
     FeatureSort(sub_feature_name, group, group_name, value, store_path, is_show=is_show, fig=fig)
 
-def GeneralFeatureSort(feature_name, value=[], store_path='', is_sort=True, max_num=-1, is_show=True, fig=plt.figure()):
+def GeneralFeatureSort(feature_name, value=[], store_path='', is_sort=True, max_num=-1, is_show=True, fig=None):
     if not isinstance(value, list):
         value = list(value)
     if value == []:
@@ -160,6 +162,8 @@ def GeneralFeatureSort(feature_name, value=[], store_path='', is_sort=True, max_
         value = value[:max_num]
         feature_name = feature_name[:max_num]
 
+    if fig is None:
+        fig = plt.figure()
     fig.clear()
     ax = fig.add_subplot(111)
 
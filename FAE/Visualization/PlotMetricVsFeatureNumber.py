@@ -3,7 +3,7 @@ import seaborn as sns
 import numpy as np
 color_list = sns.color_palette('deep') + sns.color_palette('bright')
 
-def DrawCurve(x, y_list, xlabel='', ylabel='', title='', name_list=[], store_path='', is_show=True, fig=plt.figure()):
+def DrawCurve(x, y_list, xlabel='', ylabel='', title='', name_list=[], store_path='', is_show=True, fig=None):
     '''
     Draw the curve like ROC
     :param x: the vector of the x
@@ -14,11 +14,14 @@ def DrawCurve(x, y_list, xlabel='', ylabel='', title='', name_list=[], store_pat
     :param name_list: the legend name list corresponding to y list
     :param store_path: the store path, supporting jpg and esp format
     :param is_show: Boolen, if it was set to True, the figure would show.
+    :param fig: The figure to draw on. A new figure is created if None.
     :return:
     '''
     if not isinstance(y_list, list):
         y_list = [y_list]
 
+    if fig is None:
+        fig = plt.figure()
     fig.clear()
     axes = fig.add_subplot(1, 1, 1)
 
@@ -43,10 +46,12 @@ def DrawCurve(x, y_list, xlabel='', ylabel='', title='', name_list=[], store_pat
     # plt.close(fig)
     return axes
 
-def DrawBar(x_ticks, y_list, ylabel='', title='', name_list=[], store_path='', is_show=True, fig=plt.figure()):
+def DrawBar(x_ticks, y_list, ylabel='', title='', name_list=[], store_path='', is_show=True, fig=None):
     if not isinstance(y_list, list):
         y_list = [y_list]
 
+    if fig is None:
+        fig = plt.figure()
     fig.clear()
     axes = fig.add_subplot(1, 1, 1)
     width = 0.3
@@ -0,0 +1,134 @@
+import os
+import threading
+import collections
+
+from FAE.FeatureAnalysis.PredictionArchive import PredictionArchive, LoadPrediction
+from FAE.Visualization.DrawROCList import ComputeROC
+
+
+class ROCCache:
+    '''
+    The LRU cache of the predictions, the labels and the ROC curves of the pipelines. The item is keyed by (the pipeline
+    folder, the data type), where the data type is 'train', 'val' or 'test', and it is (prediction, label, (fpr, tpr,
+    auc)), or None if the pipeline has no prediction of that data type. The requested item is loaded at once if it is
+    not cached. The neighbor pipelines could be prefetched by a background thread, so moving through the pipelines does
+    not wait for the files. If the PredictionArchive of the result folder is set, the predictions are read from it.
+    '''
+    def __init__(self, max_item_number=128):
+        self.max_item_number = max_item_number
+        self.archive = None
+        self.__cache = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.__condition = threading.Condition(self.__lock)
+        self.__prefetch_queue = collections.deque()
+        self.__worker = None
+
+    def __Load(self, case_folder, data_type):
+        prediction = LoadPrediction(os.path.dirname(case_folder), os.path.basename(case_folder), data_type,
+                                    self.archive)
+        if prediction is None:
+            return None
+        pred, label = prediction
+        return pred, label, ComputeROC(pred, label)
+
+    def __Put(self, key, item):
+        # The lock must be held.
+        self.__cache[key] = item
+        self.__cache.move_to_end(key)
+        while len(self.__cache) > self.max_item_number:
+            self.__cache.popitem(last=False)
+
+    def Get(self, case_folder, data_type):
+        '''
+        :return: (prediction, label, (fpr, tpr, auc)), or None if the prediction does not exist.
+        '''
+        key = (case_folder, data_type)
+        with self.__lock:
+            if key in self.__cache:
+                self.__cache.move_to_end(key)
+                return self.__cache[key]
+
+        item = self.__Load(case_folder, data_type)
+        with self.__lock:
+            self.__Put(key, item)
+        return item
+
+    def IsCached(self, case_folder, data_type):
+        with self.__lock:
+            return (case_folder, data_type) in self.__cache
+
+    def Clear(self):
+        with self.__lock:
+            self.__cache.clear()
+            self.__prefetch_queue.clear()
+        self.archive = None
+
+    def SetArchive(self, result_folder):
+        '''
+        Use the PredictionArchive of the result folder if it exists.
+        '''
+        self.Clear()
+        if PredictionArchive.IsAvailable(result_folder):
+            self.archive = PredictionArchive(result_folder)
+            self.archive.Load()
+
+    def Prefetch(self, case_folder_list, data_type_list=('train', 'val', 'test')):
+        '''
+        Load the items in the background thread. The items which are still waiting from the former call are dropped,
+        since the selection has moved.
+        '''
+        with self.__condition:
+            self.__prefetch_queue.clear()
+            for case_folder in case_folder_list:
+                for data_type in data_type_list:
+                    if (case_folder, data_type) not in self.__cache:
+                        self.__prefetch_queue.append((case_folder, data_type))
+
+            if self.__worker is None or not self.__worker.is_alive():
+                self.__worker = threading.Thread(target=self.__PrefetchWorker, daemon=True)
+                self.__worker.start()
+            self.__condition.notify()
+
+    def __PrefetchWorker(self):
+        while True:
+            with self.__condition:
+                while not self.__prefetch_queue:
+                    self.__condition.wait()
+                key = self.__prefetch_queue.popleft()
+                if key in self.__cache:
+                    continue
+
+            try:
+                item = self.__Load(*key)
+            except Exception as ex:
+                print('Prefetch {} failed: {}'.format(key, ex))
+                continue
+            with self.__lock:
+                if key not in self.__cache:
+                    self.__Put(key, item)
+
+
+def GetNeighborCaseName(pipelines, normalizer_name, dimension_reduction_name, feature_selector_name, feature_number,
+                        classifier_name):
+    '''
+    Get the names of the pipelines next to the current one, i.e. the pipelines which differ from it by one step along
+    one of the normalizer, the dimension reduction, the feature selector, the feature number or the classifier.
+    '''
+    name_list = [[normalizer.GetName() for normalizer in pipelines.GetNormalizerList()],
+                 [dimension_reduction.GetName() for dimension_reduction in pipelines.GetDimensionReductionList()],
+                 [feature_selector.GetName() for feature_selector in pipelines.GetFeatureSelectorList()],
+                 [str(number) for number in pipelines.GetFeatureNumberList()],
+                 [classifier.GetName() for classifier in pipelines.GetClassifierList()]]
+    current = [normalizer_name, dimension_reduction_name, feature_selector_name, str(feature_number), classifier_name]
+    if any(name not in names for name, names in zip(current, name_list)):
+        return []
+
+    case_name_list = []
+    for axis in range(len(current)):
+        index = name_list[axis].index(current[axis])
+        for neighbor_index in [index - 1, index + 1]:
+            if 0 <= neighbor_index < len(name_list[axis]):
+                neighbor = list(current)
+                neighbor[axis] = name_list[axis][neighbor_index]
+                case_name_list.append('_'.join(neighbor))
+    return case_name_list
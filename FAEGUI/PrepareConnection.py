@@ -1,6 +1,5 @@
 
 import numpy as np
-from copy import deepcopy
 
 from PyQt5.QtWidgets import *
 from GUI.Prepare import Ui_Prepare
@@ -10,11 +9,16 @@ from FAE.DataContainer import DataSeparate
 from FAE.DataContainer.DataBalance import UpSampling, DownSampling, SmoteSampling, DataBalance
 
 from PyQt5.QtCore import QItemSelectionModel,QModelIndex
+from FAEGUI.TableModel import DataContainerTableModel
+
 class PrepareConnection(QWidget, Ui_Prepare):
     def __init__(self, parent=None):
         super(PrepareConnection, self).__init__(parent)
         self.setupUi(self)
         self.data_container = DataContainer()
+        self.table_model = DataContainerTableModel(self)
+        self.tableFeature.setModel(self.table_model)
+        self.tableFeature.setSortingEnabled(True)
 
         self.buttonLoad.clicked.connect(self.LoadData)
         self.buttonRemove.clicked.connect(self.RemoveNonValidValue)
@@ -24,25 +28,10 @@ class PrepareConnection(QWidget, Ui_Prepare):
         self.buttonSave.clicked.connect(self.CheckAndSave)
 
     def UpdateTable(self):
+        self.table_model.SetDataContainer(self.data_container)
         if self.data_container.GetArray().size == 0:
             return
 
-        self.tableFeature.setRowCount(len(self.data_container.GetCaseName()))
-        header_name = deepcopy(self.data_container.GetFeatureName())
-        header_name.insert(0, 'Label')
-        self.tableFeature.setColumnCount(len(header_name))
-        self.tableFeature.setHorizontalHeaderLabels(header_name)
-        self.tableFeature.setVerticalHeaderLabels(list(map(str, self.data_container.GetCaseName())))
-
-        for row_index in range(len(self.data_container.GetCaseName())):
-            for col_index in range(len(header_name)):
-                if col_index == 0:
-                    self.tableFeature.setItem(row_index, col_index, QTableWidgetItem(str(self.data_container.GetLabel()[row_index])))
-                else:
-                    self.tableFeature.setItem(row_index, col_index, QTableWidgetItem(str(self.data_container.GetArray()[row_index, col_index - 1])))
-
-
-
         text = "The number of cases: {:d}\n".format(len(self.data_container.GetCaseName()))
         text += "The number of features: {:d}\n".format(len(self.data_container.GetFeatureName()))
         if len(np.unique(self.data_container.GetLabel())) == 2:
@@ -83,13 +72,11 @@ class PrepareConnection(QWidget, Ui_Prepare):
     def CheckAndSave(self):
         if self.data_container.IsEmpty():
             QMessageBox.warning(self, "Warning", "There is no data", QMessageBox.Ok)
-        elif self.data_container.HasNonValidNumber():
+        elif self.table_model.HasNonValidNumber():
             QMessageBox.warning(self, "Warning", "There are nan items", QMessageBox.Ok)
-            non_valid_number_Index = self.data_container.FindNonValidNumberIndex()
-            old_edit_triggers = self.tableFeature.editTriggers()
-            self.tableFeature.setEditTriggers(QAbstractItemView.CurrentChanged)
-            self.tableFeature.setCurrentCell(non_valid_number_Index[0],non_valid_number_Index[1]+1)
-            self.tableFeature.setEditTriggers(old_edit_triggers)
+            non_valid_index = self.table_model.GetFirstNonValidIndex()
+            self.tableFeature.setCurrentIndex(non_valid_index)
+            self.tableFeature.scrollTo(non_valid_index)
         else:
             data_balance = DataBalance()
             if self.radioDownSampling.isChecked():
@@ -14,37 +14,32 @@ from FAE.FeatureAnalysis.FeaturePipeline import FeatureAnalysisPipelines
 from FAE.FeatureAnalysis.CrossValidation import *
 
 import os
+import time
 import struct
 
 class CVRun(QThread):
     signal = pyqtSignal(str)
-
-    def __init__(self):
-        super().__init__()
-        pass
+    finish_signal = pyqtSignal(str)
 
     def SetProcessConnectionAndStore_folder(self, process_connection, store_folder):
         self._process_connection = process_connection
         self._store_folder = store_folder
 
     def run(self):
-        for current_normalizer_name, current_dimension_reductor_name, \
-            current_feature_selector_name, curreent_feature_num, \
-            current_classifier_name, num, total_num \
-                in self._process_connection.fae.Run(self._process_connection.training_data_container,
-                                                      self._process_connection.testing_data_container,
-                                                      self._store_folder):
-            text = self._process_connection.GenerateVerboseTest(current_normalizer_name,
-                                                     current_dimension_reductor_name,
-                                                     current_feature_selector_name,
-                                                     current_classifier_name,
-                                                     curreent_feature_num,
-                                                     num,
-                                                     total_num)
-
+        text = ''
+        total_number = 0
+        for progress in self._process_connection.fae.Run(self._process_connection.training_data_container,
+                                                         self._process_connection.testing_data_container,
+                                                         self._store_folder):
+            text = self._process_connection.GenerateVerboseTest(progress)
+            total_number = progress.total_number
             self.signal.emit(text)  # 反馈信号出去
 
-        self.signal.emit(text + "\n DONE!")
+        # A cancel which arrives after the last pipeline finished does not drop any pipeline.
+        if self._process_connection.fae.GetFinishedNumber() < total_number:
+            self.finish_signal.emit(text + "\n CANCELLED! The finished pipelines are saved.")
+        else:
+            self.finish_signal.emit(text + "\n DONE!")
         self._process_connection.SetStateAllButtonWhenRunning(True)
 
 
@@ -59,10 +54,20 @@ class ProcessConnection(QWidget, Ui_Process):
         self.__process_feature_selector_list = []
         self.__process_feature_number_list = []
         self.__process_classifier_list = []
+        self.__process_option_text = {}
 
         super(ProcessConnection, self).__init__(parent)
         self.setupUi(self)
 
+        # The verbose text is updated at most once in verbose_update_interval (second), so a fast run is not slowed by
+        # redrawing the text. The latest progress in the interval is shown when the interval ends.
+        self.verbose_update_interval = 0.25
+        self.__pending_verbose_text = None
+        self.__last_verbose_time = None
+        self.__verbose_timer = QTimer(self)
+        self.__verbose_timer.setSingleShot(True)
+        self.__verbose_timer.timeout.connect(self.__FlushVerboseText)
+
         self.buttonLoadTrainingData.clicked.connect(self.LoadTrainingData)
         self.buttonLoadTestingData.clicked.connect(self.LoadTestingData)
 
@@ -100,6 +105,8 @@ class ProcessConnection(QWidget, Ui_Process):
         self.radio10Folder.clicked.connect(self.UpdatePipelineText)
 
         self.buttonRun.clicked.connect(self.Run)
+        self.buttonPause.clicked.connect(self.PauseOrResume)
+        self.buttonCancel.clicked.connect(self.Cancel)
 
         self.UpdatePipelineText()
         self.SetStateButtonBeforeLoading(False)
@@ -125,34 +132,30 @@ class ProcessConnection(QWidget, Ui_Process):
         except:
             print('Loading Testing Data Error')
 
-    def GenerateVerboseTest(self, normalizer_name, dimension_reduction_name, feature_selector_name, classifier_name, feature_num,
-                       current_num, total_num):
-        text = "Current:\n"
-
-        text += "{:s} / ".format(normalizer_name)
-        for temp in self.__process_normalizer_list:
-            text += (temp.GetName() + ", ")
-        text += '\n'
-
-        text += "{:s} / ".format(dimension_reduction_name)
-        for temp in self.__process_dimension_reduction_list:
-            text += (temp.GetName() + ", ")
-        text += '\n'
-
-        text += "{:s} / ".format(feature_selector_name)
-        for temp in self.__process_feature_selector_list:
-            text += (temp.GetName() + ", ")
-        text += '\n'
-
-        text += "Feature Number: {:d} / [{:d}-{:d}]\n".format(feature_num, self.spinBoxMinFeatureNumber.value(), self.spinBoxMaxFeatureNumber.value())
-
-        text += "{:s} / ".format(classifier_name)
-        for temp in self.__process_classifier_list:
-            text += (temp.GetName() + ", ")
-        text += '\n'
-
-        text += "Total process: {:d} / {:d}".format(current_num, total_num)
-        return text
+    def GenerateVerboseTest(self, progress):
+        '''
+        Generate the verbose text of the progress.
+        :param progress: The PipelineProgress yielded by FeatureAnalysisPipelines.Run.
+        '''
+        line_list = ["Current:",
+                     "{:s} / {:s}".format(progress.normalizer_name, self.__process_option_text['normalizer']),
+                     "{:s} / {:s}".format(progress.dimension_reduction_name,
+                                          self.__process_option_text['dimension_reduction']),
+                     "{:s} / {:s}".format(progress.feature_selector_name,
+                                          self.__process_option_text['feature_selector']),
+                     "Feature Number: {:d} / {:s}".format(progress.feature_number,
+                                                          self.__process_option_text['feature_number']),
+                     "{:s} / {:s}".format(progress.classifier_name, self.__process_option_text['classifier']),
+                     "Total process: {:d} / {:d}".format(progress.current_number, progress.total_number),
+                     "",
+                     progress.GetStatusText()]
+
+        if progress.timing:
+            line_list.append("\nLast pipeline:")
+            for stage_name, elapsed in progress.timing.items():
+                if '/' not in stage_name:
+                    line_list.append("{:s}: {:.2f} s".format(stage_name, elapsed))
+        return '\n'.join(line_list)
 
     def SetStateAllButtonWhenRunning(self, state):
         self.buttonLoadTrainingData.setEnabled(state)
@@ -160,6 +163,29 @@ class ProcessConnection(QWidget, Ui_Process):
         
         self.SetStateButtonBeforeLoading(state)
 
+        self.buttonPause.setText('Pause')
+        self.buttonPause.setEnabled(not state)
+        self.buttonCancel.setEnabled(not state)
+
+    def PauseOrResume(self):
+        run_control = self.fae.GetRunControl()
+        if run_control.IsPaused():
+            run_control.Resume()
+            self.buttonPause.setText('Pause')
+        else:
+            # The run is paused after the pipeline or the fold which is running.
+            run_control.Pause()
+            self.buttonPause.setText('Resume')
+
+    def Cancel(self):
+        reply = QMessageBox.question(self, 'Cancel?', 'The running pipeline would be dropped, and the finished pipelines '
+                                                      'would be kept. Do you want to cancel the run?',
+                                     QMessageBox.Yes, QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.fae.GetRunControl().Cancel()
+            self.buttonPause.setEnabled(False)
+            self.buttonCancel.setEnabled(False)
+
     def SetStateButtonBeforeLoading(self, state):
         self.buttonRun.setEnabled(state)
         
@@ -234,10 +260,12 @@ class ProcessConnection(QWidget, Ui_Process):
                 # text = self.textEditVerbose.toPlainText()
                 # self.textEditVerbose.setPlainText(text + "\n DONE!")
 
+                self.fae.GetRunControl().Reset()
                 thread = CVRun()
                 thread.moveToThread(QThread())
                 thread.SetProcessConnectionAndStore_folder(self, store_folder)
-                thread.signal.connect(self.textEditVerbose.setPlainText)
+                thread.signal.connect(self.UpdateVerboseText)
+                thread.finish_signal.connect(self.FinishVerboseText)
                 thread.start()
                 self.SetStateAllButtonWhenRunning(False)
 
@@ -250,6 +278,32 @@ class ProcessConnection(QWidget, Ui_Process):
             else:
                 QMessageBox.about(self, 'Pipeline Error', 'Pipeline must include Classifier and CV method')
 
+    def UpdateVerboseText(self, text):
+        self.__pending_verbose_text = text
+        if self.__verbose_timer.isActive():
+            return
+
+        wait_time = 0.
+        if self.__last_verbose_time is not None:
+            wait_time = self.verbose_update_interval - (time.perf_counter() - self.__last_verbose_time)
+        if wait_time > 0:
+            self.__verbose_timer.start(int(np.ceil(wait_time * 1000)))
+        else:
+            self.__FlushVerboseText()
+
+    def __FlushVerboseText(self):
+        if self.__pending_verbose_text is not None:
+            self.textEditVerbose.setPlainText(self.__pending_verbose_text)
+            self.__pending_verbose_text = None
+            self.__last_verbose_time = time.perf_counter()
+
+    def FinishVerboseText(self, text):
+        # The final text is always shown at once, and the pending progress is dropped.
+        self.__verbose_timer.stop()
+        self.__pending_verbose_text = None
+        self.__last_verbose_time = None
+        self.textEditVerbose.setPlainText(text)
+
     def MinFeatureNumberChange(self):
         if self.spinBoxMinFeatureNumber.value() > self.spinBoxMaxFeatureNumber.value():
             self.spinBoxMinFeatureNumber.setValue(self.spinBoxMaxFeatureNumber.value())
@@ -323,6 +377,15 @@ class ProcessConnection(QWidget, Ui_Process):
         else:
             return False
 
+        # The option text is built once here, and used by GenerateVerboseTest in the running thread.
+        self.__process_option_text = {
+            'normalizer': ', '.join(temp.GetName() for temp in self.__process_normalizer_list),
+            'dimension_reduction': ', '.join(temp.GetName() for temp in self.__process_dimension_reduction_list),
+            'feature_selector': ', '.join(temp.GetName() for temp in self.__process_feature_selector_list),
+            'feature_number': '[{:d}-{:d}]'.format(min(self.__process_feature_number_list),
+                                                   max(self.__process_feature_number_list)),
+            'classifier': ', '.join(temp.GetName() for temp in self.__process_classifier_list)}
+
         self.fae.SetNormalizerList(self.__process_normalizer_list)
         self.fae.SetDimensionReductionList(self.__process_dimension_reduction_list)
         self.fae.SetFeatureSelectorList(self.__process_feature_selector_list)
@@ -6,6 +6,7 @@ from FAE.FeatureAnalysis.FeaturePipeline import FeatureAnalysisPipelines, OnePip
 from FAE.Report.Report import Report
 
 from FAE.Visualization.DrawROCList import DrawROCList
+from FAE.Visualization.ROCCache import ROCCache, GetNeighborCaseName
 
 import os
 
@@ -13,6 +14,7 @@ class ReportConnection(QWidget, Ui_Report):
     def __init__(self, parent=None):
         self._root_folder = ''
         self._fae = FeatureAnalysisPipelines()
+        self._roc_cache = ROCCache()
         self._training_data_container = DataContainer()
         self._testing_data_container = DataContainer()
         self._current_pipeline = OnePipeline()
@@ -137,6 +139,7 @@ class ReportConnection(QWidget, Ui_Report):
             try:
                 self.lineEditResultPath.setText(self._root_folder)
                 self._fae.LoadAll(self._root_folder)
+                self._roc_cache.SetArchive(self._root_folder)
                 self.SetResultDescription()
                 self.InitialUi()
             except Exception as ex:
@@ -150,6 +153,7 @@ class ReportConnection(QWidget, Ui_Report):
     def ClearAll(self):
         self.buttonLoadResult.setEnabled(True)
         self.buttonClearResult.setEnabled(False)
+        self._roc_cache.Clear()
 
     def InitialUi(self):
         # Update ROC canvers
@@ -211,28 +215,32 @@ class ReportConnection(QWidget, Ui_Report):
         except Exception as ex:
             QMessageBox.about(self, "Load Error", ex.__str__())
 
-        pred_list, label_list, name_list = [], [], []
-        if self.checkROCTrain.isChecked():
-            train_pred = np.load(os.path.join(case_folder, 'train_predict.npy'))
-            train_label = np.load(os.path.join(case_folder, 'train_label.npy'))
-            pred_list.append(train_pred)
-            label_list.append(train_label)
-            name_list.append('train')
-        if self.checkROCValidation.isChecked():
-            val_pred = np.load(os.path.join(case_folder, 'val_predict.npy'))
-            val_label = np.load(os.path.join(case_folder, 'val_label.npy'))
-            pred_list.append(val_pred)
-            label_list.append(val_label)
-            name_list.append('validation')
-        if self.checkROCTest.isChecked():
-            if os.path.exists(os.path.join(case_folder, 'test_label.npy')):
-                test_pred = np.load(os.path.join(case_folder, 'test_predict.npy'))
-                test_label = np.load(os.path.join(case_folder, 'test_label.npy'))
-                pred_list.append(test_pred)
-                label_list.append(test_label)
-                name_list.append('Test')
+        pred_list, label_list, name_list, roc_list = [], [], [], []
+        data_type_list = []
+        for is_checked, data_type, name in [(self.checkROCTrain.isChecked(), 'train', 'train'),
+                                            (self.checkROCValidation.isChecked(), 'val', 'validation'),
+                                            (self.checkROCTest.isChecked(), 'test', 'Test')]:
+            if not is_checked:
+                continue
+            data_type_list.append(data_type)
+            item = self._roc_cache.Get(case_folder, data_type)
+            if item is not None:
+                pred_list.append(item[0])
+                label_list.append(item[1])
+                roc_list.append(item[2])
+                name_list.append(name)
 
         if len(pred_list) > 0:
-            DrawROCList(pred_list, label_list, name_list=name_list, is_show=False, fig=self.canvasROC.getFigure())
+            DrawROCList(pred_list, label_list, name_list=name_list, is_show=False, fig=self.canvasROC.getFigure(),
+                        roc_list=roc_list)
+
+        if data_type_list:
+            neighbor_list = GetNeighborCaseName(self._fae, self.comboNormalizer.currentText(),
+                                                self.comboDimensionReduction.currentText(),
+                                                self.comboFeatureSelector.currentText(),
+                                                self.spinBoxFeatureNumber.value(),
+                                                self.comboClassifier.currentText())
+            self._roc_cache.Prefetch([os.path.join(self._root_folder, name) for name in neighbor_list],
+                                     data_type_list)
 
         self.canvasROC.draw()
\ No newline at end of file
@@ -0,0 +1,210 @@
+import numpy as np
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from PyQt5.QtGui import QColor
+
+
+class DataContainerTableModel(QAbstractTableModel):
+    '''
+    The table model over the array of the DataContainer. The first column is the label and the following columns are
+    the features. The view only asks for the visible cells, so each cell is formatted when it is shown instead of
+    building one item for each cell. The non-valid cells (NaN) are found once when the data container is set and are
+    highlighted. Sorting only re-orders the row index, the array is never copied.
+    '''
+    def __init__(self, parent=None):
+        super(DataContainerTableModel, self).__init__(parent)
+        self.__label = np.array([])
+        self.__array = np.zeros((0, 0))
+        self.__case_name = []
+        self.__header = []
+        self.__non_valid_mask = np.zeros((0, 0), dtype=bool)
+        self.__row_order = np.array([], dtype=int)
+        self.non_valid_color = QColor(255, 150, 150)
+
+    def SetDataContainer(self, data_container):
+        self.beginResetModel()
+        self.__label = np.asarray(data_container.GetLabel())
+        self.__array = data_container.GetArray()
+        self.__case_name = list(map(str, data_container.GetCaseName()))
+        self.__header = ['Label'] + list(data_container.GetFeatureName())
+        if self.__array.size > 0:
+            label_mask = np.isnan(self.__label) if self.__label.dtype.kind == 'f' else \
+                np.zeros(self.__label.shape, dtype=bool)
+            self.__non_valid_mask = np.concatenate((label_mask[:, np.newaxis], np.isnan(self.__array)), axis=1)
+            self.__row_order = np.arange(self.__array.shape[0])
+        else:
+            self.__non_valid_mask = np.zeros((0, 0), dtype=bool)
+            self.__row_order = np.array([], dtype=int)
+        self.endResetModel()
+
+    def __GetValue(self, row, column):
+        if column == 0:
+            return self.__label[row]
+        return self.__array[row, column - 1]
+
+    def GetColumnValue(self, column):
+        if column == 0:
+            return self.__label
+        return self.__array[:, column - 1]
+
+    def HasNonValidNumber(self):
+        return bool(np.any(self.__non_valid_mask))
+
+    def GetFirstNonValidIndex(self):
+        '''
+        :return: The model index of the first non-valid cell in the current row order, or an invalid index.
+        '''
+        if not self.HasNonValidNumber():
+            return QModelIndex()
+        row, column = np.argwhere(self.__non_valid_mask[self.__row_order])[0]
+        return self.index(int(row), int(column))
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.__row_order)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or len(self.__row_order) == 0:
+            return 0
+        return len(self.__header)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+
+        row = self.__row_order[index.row()]
+        if role == Qt.DisplayRole:
+            return str(self.__GetValue(row, index.column()))
+        elif role == Qt.BackgroundRole:
+            if self.__non_valid_mask[row, index.column()]:
+                return self.non_valid_color
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return self.__header[section]
+        return self.__case_name[self.__row_order[section]]
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if len(self.__row_order) == 0:
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        value = np.asarray(self.GetColumnValue(column), dtype=np.float64)
+        if order == Qt.DescendingOrder:
+            value = -value
+        # NaN is always put at the end
+        row_order = np.argsort(np.where(np.isnan(value), np.inf, value), kind='mergesort')
+
+        old_order = self.__row_order
+        new_position = np.empty_like(row_order)
+        new_position[row_order] = np.arange(len(row_order))
+        old_index_list = self.persistentIndexList()
+        self.__row_order = row_order
+        self.changePersistentIndexList(old_index_list,
+                                       [self.index(int(new_position[old_order[index.row()]]), index.column())
+                                        for index in old_index_list])
+        self.layoutChanged.emit()
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    '''
+    The table model over the DataFrame, e.g. the result sheet of the pipelines. The columns are kept as the arrays of the
+    DataFrame and the cells are formatted when they are shown. The rows could be sorted by one column and filtered by a
+    sub-string of the index (the name of the pipeline). Both only change the row index which maps the view to the
+    DataFrame.
+    '''
+    def __init__(self, parent=None):
+        super(DataFrameTableModel, self).__init__(parent)
+        self.__column_list = []
+        self.__header = []
+        self.__index = np.array([], dtype=object)
+        self.__sorted_order = np.array([], dtype=int)
+        self.__filter_mask = np.array([], dtype=bool)
+        self.__row_order = np.array([], dtype=int)
+        self.__filter_text = ''
+
+    def SetFrame(self, df):
+        self.beginResetModel()
+        self.__column_list = [df[column].to_numpy() for column in df.columns]
+        self.__header = list(map(str, df.columns))
+        self.__index = np.array(list(map(str, df.index)), dtype=object)
+        self.__sorted_order = np.arange(df.shape[0])
+        self.__filter_mask = self.__GetFilterMask(self.__filter_text)
+        self.__UpdateRowOrder()
+        self.endResetModel()
+
+    def __GetFilterMask(self, text):
+        if text == '':
+            return np.ones(self.__index.shape, dtype=bool)
+        text = text.lower()
+        return np.array([text in name.lower() for name in self.__index], dtype=bool)
+
+    def __UpdateRowOrder(self):
+        self.__row_order = self.__sorted_order[self.__filter_mask[self.__sorted_order]]
+
+    def SetFilter(self, text):
+        '''
+        Only show the rows whose index contains the text (case insensitive). The empty text shows all rows.
+        '''
+        self.beginResetModel()
+        self.__filter_text = text
+        self.__filter_mask = self.__GetFilterMask(text)
+        self.__UpdateRowOrder()
+        self.endResetModel()
+
+    def GetRowName(self, row):
+        return self.__index[self.__row_order[row]]
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.__row_order)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.__header)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return QVariant()
+        return str(self.__column_list[index.column()][self.__row_order[index.row()]])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return self.__header[section]
+        return self.__index[self.__row_order[section]]
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if len(self.__index) == 0 or column < 0:
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        value = self.__column_list[column]
+        if value.dtype.kind in 'biuf':
+            value = value.astype(np.float64)
+            if order == Qt.DescendingOrder:
+                value = -value
+            # NaN is always put at the end
+            sorted_order = np.argsort(np.where(np.isnan(value), np.inf, value), kind='mergesort')
+        else:
+            sorted_order = np.argsort(value.astype(str), kind='mergesort')
+            if order == Qt.DescendingOrder:
+                sorted_order = sorted_order[::-1]
+
+        old_row_order = self.__row_order
+        self.__sorted_order = sorted_order
+        self.__UpdateRowOrder()
+        new_position = np.full(self.__index.shape, -1, dtype=int)
+        new_position[self.__row_order] = np.arange(len(self.__row_order))
+        old_index_list = self.persistentIndexList()
+        self.changePersistentIndexList(old_index_list,
+                                       [self.index(int(new_position[old_row_order[index.row()]]), index.column())
+                                        for index in old_index_list])
+        self.layoutChanged.emit()
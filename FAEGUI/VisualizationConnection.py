@@ -1,15 +1,17 @@
-from copy import deepcopy
-
 from PyQt5.QtWidgets import *
+from PyQt5.QtCore import Qt
 from GUI.Visualization import Ui_Visualization
 
 from FAE.FeatureAnalysis.Classifier import *
 from FAE.FeatureAnalysis.FeaturePipeline import FeatureAnalysisPipelines
+from FAE.FeatureAnalysis.ResultIndex import ResultIndex
 from FAE.Report.Report import Report
 
 from FAE.Visualization.DrawROCList import DrawROCList
+from FAE.Visualization.ROCCache import ROCCache, GetNeighborCaseName
 from FAE.Visualization.PlotMetricVsFeatureNumber import DrawCurve, DrawBar
 from FAE.Visualization.FeatureSort import GeneralFeatureSort, SortRadiomicsFeature
+from FAEGUI.TableModel import DataFrameTableModel
 
 import os
 
@@ -17,6 +19,8 @@ class VisualizationConnection(QWidget, Ui_Visualization):
     def __init__(self, parent=None):
         self._root_folder = ''
         self._fae = FeatureAnalysisPipelines()
+        self._roc_cache = ROCCache()
+        self._result_index = ResultIndex()
         self.sheet_dict = dict()
 
         super(VisualizationConnection, self).__init__(parent)
@@ -31,6 +35,11 @@ class VisualizationConnection(QWidget, Ui_Visualization):
         self.__contribution = self.canvasFeature.getFigure().add_subplot(111)
 
         # Update Sheet
+        self.sheet_model = DataFrameTableModel(self)
+        self.tableClinicalStatistic.setModel(self.sheet_model)
+        self.tableClinicalStatistic.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.tableClinicalStatistic.setSortingEnabled(True)
+        self.lineEditSheetFilter.textChanged.connect(self.sheet_model.SetFilter)
         self.comboSheet.currentIndexChanged.connect(self.UpdateSheet)
         self.checkMaxFeatureNumber.stateChanged.connect(self.UpdateSheet)
 
@@ -84,6 +93,8 @@ class VisualizationConnection(QWidget, Ui_Visualization):
             try:
                 self.lineEditResultPath.setText(self._root_folder)
                 self._fae.LoadAll(self._root_folder)
+                self._roc_cache.SetArchive(self._root_folder)
+                self._result_index.LoadOrBuild(self._root_folder, self._fae)
                 self.SetResultDescription()
                 self.SetResultTable()
                 self.InitialUi()
@@ -148,14 +159,12 @@ class VisualizationConnection(QWidget, Ui_Visualization):
         self.spinFeatureSelectorFeatureNumber.setValue(1)
         self.spinClassifierFeatureNumber.setValue(1)
 
-        self.tableClinicalStatistic.clear()
-
-        self.tableClinicalStatistic.setRowCount(0)
-        self.tableClinicalStatistic.setColumnCount(0)
-        self.tableClinicalStatistic.setHorizontalHeaderLabels(list([]))
-        self.tableClinicalStatistic.setVerticalHeaderLabels(list([]))
+        self.lineEditSheetFilter.clear()
+        self.sheet_model.SetFrame(pd.DataFrame())
 
         self._fae = FeatureAnalysisPipelines()
+        self._result_index.Clear()
+        self._roc_cache.Clear()
         self._root_folder = ''
         self.sheet_dict = dict()
 
@@ -220,7 +229,8 @@ class VisualizationConnection(QWidget, Ui_Visualization):
             self.comboContributionFeatureSelector.addItem(selector.GetName())
         for classifier in self._fae.GetClassifierList():
             specific_name = classifier.GetName() + '_coef.csv'
-            if self._SearchSpecificFile(specific_name, int(self._fae.GetFeatureNumberList()[0])):
+            if self._SearchSpecificFile(specific_name, self._fae.GetFeatureSelectorList()[0].GetName(),
+                                        self._fae.GetFeatureNumberList()[0], classifier.GetName()):
                 self.comboContributionClassifier.addItem(classifier.GetName())
 
     def UpdateROC(self):
@@ -239,29 +249,33 @@ class VisualizationConnection(QWidget, Ui_Visualization):
 
         case_folder = os.path.join(self._root_folder, case_name)
 
-        pred_list, label_list, name_list = [], [], []
-        if self.checkROCTrain.isChecked():
-            train_pred = np.load(os.path.join(case_folder, 'train_predict.npy'))
-            train_label = np.load(os.path.join(case_folder, 'train_label.npy'))
-            pred_list.append(train_pred)
-            label_list.append(train_label)
-            name_list.append('train')
-        if self.checkROCValidation.isChecked():
-            val_pred = np.load(os.path.join(case_folder, 'val_predict.npy'))
-            val_label = np.load(os.path.join(case_folder, 'val_label.npy'))
-            pred_list.append(val_pred)
-            label_list.append(val_label)
-            name_list.append('validation')
-        if self.checkROCTest.isChecked():
-            if os.path.exists(os.path.join(case_folder, 'test_label.npy')):
-                test_pred = np.load(os.path.join(case_folder, 'test_predict.npy'))
-                test_label = np.load(os.path.join(case_folder, 'test_label.npy'))
-                pred_list.append(test_pred)
-                label_list.append(test_label)
-                name_list.append('Test')
+        pred_list, label_list, name_list, roc_list = [], [], [], []
+        data_type_list = []
+        for is_checked, data_type, name in [(self.checkROCTrain.isChecked(), 'train', 'train'),
+                                            (self.checkROCValidation.isChecked(), 'val', 'validation'),
+                                            (self.checkROCTest.isChecked(), 'test', 'Test')]:
+            if not is_checked:
+                continue
+            data_type_list.append(data_type)
+            item = self._roc_cache.Get(case_folder, data_type)
+            if item is not None:
+                pred_list.append(item[0])
+                label_list.append(item[1])
+                roc_list.append(item[2])
+                name_list.append(name)
 
         if len(pred_list) > 0:
-            DrawROCList(pred_list, label_list, name_list=name_list, is_show=False, fig=self.canvasROC.getFigure())
+            DrawROCList(pred_list, label_list, name_list=name_list, is_show=False, fig=self.canvasROC.getFigure(),
+                        roc_list=roc_list)
+
+        if data_type_list:
+            neighbor_list = GetNeighborCaseName(self._fae, self.comboNormalizer.currentText(),
+                                                self.comboDimensionReduction.currentText(),
+                                                self.comboFeatureSelector.currentText(),
+                                                self.spinBoxFeatureNumber.value(),
+                                                self.comboClassifier.currentText())
+            self._roc_cache.Prefetch([os.path.join(self._root_folder, name) for name in neighbor_list],
+                                     data_type_list)
 
         self.canvasROC.draw()
 
@@ -331,61 +345,26 @@ class VisualizationConnection(QWidget, Ui_Visualization):
             x_ticks = list(map(int, self._fae.GetFeatureNumberList()))
             x_label = 'Feature Number'
 
-        max_axis_list = [0, 1, 2, 3, 4]
-        max_axis_list.remove(selected_index)
-        max_axis = tuple(max_axis_list)
-
         index = self._UpdatePlotButtons(selected_index)
 
         show_data = []
         name_list = []
 
         if self.comboPlotY.currentText() == 'AUC':
-            if self.checkPlotTrain.isChecked():
-                temp = deepcopy(self._fae.GetAUCMetric()['train'])
-                if self.checkPlotMaximum.isChecked():
-                    show_data.append(np.max(temp, axis=max_axis).tolist())
-                else:
-                    show_data.append(temp[index].tolist())
-                name_list.append('Train')
-            if self.checkPlotValidation.isChecked():
-                temp = deepcopy(self._fae.GetAUCMetric()['val'])
-                if self.checkPlotMaximum.isChecked():
-                    show_data.append(np.max(temp, axis=max_axis).tolist())
-                else:
-                    show_data.append(temp[index].tolist())
-                name_list.append('Validation')
-            if self.checkPlotTest.isChecked():
-                temp = deepcopy(self._fae.GetAUCMetric()['test'])
-                if temp.size > 0:
-                    if self.checkPlotMaximum.isChecked():
-                        show_data.append(np.max(temp, axis=max_axis).tolist())
-                    else:
-                        show_data.append(temp[index].tolist())
-                    name_list.append('Test')
-        elif self.comboPlotY.currentText() == 'Accuracy':
-            if self.checkPlotTrain.isChecked():
-                temp = deepcopy(self._fae.GetAccuracyMetric()['train'])
-                if self.checkPlotMaximum.isChecked():
-                    show_data.append(np.max(temp, axis=max_axis).tolist())
-                else:
-                    show_data.append(temp[index].tolist())
-                name_list.append('Train')
-            if self.checkPlotValidation.isChecked():
-                temp = deepcopy(self._fae.GetAccuracyMetric()['val'])
-                if self.checkPlotMaximum.isChecked():
-                    show_data.append(np.max(temp, axis=max_axis).tolist())
-                else:
-                    show_data.append(temp[index].tolist())
-                name_list.append('Validation')
-            if self.checkPlotTest.isChecked():
-                temp = deepcopy(self._fae.GetAccuracyMetric()['test'])
-                if temp.size > 0:
-                    if self.checkPlotMaximum.isChecked():
-                        show_data.append(np.max(temp, axis=max_axis).tolist())
-                    else:
-                        show_data.append(temp[index].tolist())
-                    name_list.append('Test')
+            metric_dict, aggregate_dict = self._fae.GetAUCMetric(), self._fae.GetAUCAggregate()
+        else:
+            metric_dict, aggregate_dict = self._fae.GetAccuracyMetric(), self._fae.GetAccuracyAggregate()
+
+        for is_checked, data_type, name in [(self.checkPlotTrain.isChecked(), 'train', 'Train'),
+                                            (self.checkPlotValidation.isChecked(), 'val', 'Validation'),
+                                            (self.checkPlotTest.isChecked(), 'test', 'Test')]:
+            if not is_checked or metric_dict[data_type].size == 0:
+                continue
+            if self.checkPlotMaximum.isChecked():
+                show_data.append(aggregate_dict[data_type].GetAxisMax(selected_index).tolist())
+            else:
+                show_data.append(metric_dict[data_type][index].tolist())
+            name_list.append(name)
 
         if len(show_data) > 0:
             if selected_index == 3:
@@ -403,7 +382,9 @@ class VisualizationConnection(QWidget, Ui_Visualization):
 
         if self.radioContributionFeatureSelector.isChecked():
             file_name = self.comboContributionFeatureSelector.currentText() + '_sort.csv'
-            file_path = self._SearchSpecificFile(file_name, int(self._fae.GetFeatureNumberList()[0]))
+            file_path = self._SearchSpecificFile(file_name, self.comboContributionFeatureSelector.currentText(),
+                                                 self._fae.GetFeatureNumberList()[0],
+                                                 self._fae.GetClassifierList()[0].GetName())
             if file_path:
                 df = pd.read_csv(file_path, index_col=0)
 
@@ -414,11 +395,14 @@ class VisualizationConnection(QWidget, Ui_Visualization):
                                    is_show=False, fig=self.canvasFeature.getFigure())
         elif self.radioContributionClassifier.isChecked():
             specific_name = self.comboContributionClassifier.currentText() + '_coef.csv'
-            file_path = self._SearchSpecificFile(specific_name, self.spinClassifierFeatureNumber.value())
+            file_path = self._SearchSpecificFile(specific_name, self.comboContributionFeatureSelector.currentText(),
+                                                 self.spinClassifierFeatureNumber.value(),
+                                                 self.comboContributionClassifier.currentText())
             if file_path:
                 df = pd.read_csv(file_path, index_col=0)
                 feature_name = list(df.index)
-                value = list(np.abs(df.iloc[:, 0]))
+                # The norm of the coefficients of all classes for the multi-class model.
+                value = list(np.linalg.norm(df.values, axis=1))
                 try:
                     SortRadiomicsFeature(feature_name, value, is_show=False, fig=self.canvasFeature.getFigure())
                 except:
@@ -453,29 +437,33 @@ class VisualizationConnection(QWidget, Ui_Visualization):
             text += (index.GetName() + '\n')
         text += '\n'
 
+        text += "Best Pipelines (Validation AUC):\n"
+        for value, metric_index in self._fae.GetAUCAggregate()['val'].GetTop(5):
+            text += "{:.3f} {:s}\n".format(value, self._fae.GetPipelineName(metric_index))
+        text += '\n'
+
         self.textEditDescription.setPlainText(text)
 
     def UpdateSheet(self):
-        data = np.array([])
         df = pd.DataFrame()
         if self.comboSheet.currentText() == 'Train':
-            data = self._fae.GetAUCMetric()['train']
+            aggregate = self._fae.GetAUCAggregate()['train']
             df = self.sheet_dict['train']
         elif self.comboSheet.currentText() == 'Validation':
-            data = self._fae.GetAUCMetric()['val']
+            aggregate = self._fae.GetAUCAggregate()['val']
             df = self.sheet_dict['val']
         elif self.comboSheet.currentText() == 'Test':
-            data = self._fae.GetAUCMetric()['test']
+            aggregate = self._fae.GetAUCAggregate()['test']
             df = self.sheet_dict['test']
         elif self.comboSheet.currentText() == 'Test On Val':
-            data = self._fae.GetAUCMetric()['val']
+            aggregate = self._fae.GetAUCAggregate()['val']
             df = self.sheet_dict['test']
         else:
             return
 
         if self.checkMaxFeatureNumber.isChecked():
             name_list = []
-            arg_max_index = np.argmax(data, axis=3)
+            arg_max_index = aggregate.GetBestFeatureNumberIndex()
             for normalizer, normalizer_index in zip(self._fae.GetNormalizerList(), range(len(self._fae.GetNormalizerList()))):
                 for dimension_reducer, dimension_reducer_index in zip(self._fae.GetDimensionReductionList(),
                                                                       range(len(self._fae.GetDimensionReductionList()))):
@@ -492,14 +480,10 @@ class VisualizationConnection(QWidget, Ui_Visualization):
 
             df = df.loc[name_list]
 
-        self.tableClinicalStatistic.setRowCount(df.shape[0])
-        self.tableClinicalStatistic.setColumnCount(df.shape[1])
-        self.tableClinicalStatistic.setHorizontalHeaderLabels(list(df.columns))
-        self.tableClinicalStatistic.setVerticalHeaderLabels(list(df.index))
-
-        for row_index in range(df.shape[0]):
-            for col_index in range(df.shape[1]):
-                self.tableClinicalStatistic.setItem(row_index, col_index, QTableWidgetItem(str(df.iloc[row_index, col_index])))
+        self.sheet_model.SetFrame(df)
+        header = self.tableClinicalStatistic.horizontalHeader()
+        if 0 <= header.sortIndicatorSection() < df.shape[1]:
+            self.sheet_model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
 
     def SetResultTable(self):
         self.sheet_dict['train'] = pd.read_csv(os.path.join(self._root_folder, 'train_result.csv'), index_col=0)
@@ -513,11 +497,12 @@ class VisualizationConnection(QWidget, Ui_Visualization):
 
         self.UpdateSheet()
 
-    def _SearchSpecificFile(self, specific_file_name, feature_number):
-        for rt, folder, files in os.walk(self._root_folder):
-            for file_name in files:
-                # print(file_name)
-                if (file_name.lower() == specific_file_name.lower()) and ('_{:d}_'.format(feature_number) in rt):
-                    return os.path.join(rt, file_name)
-
-        return ''
+    def _SearchSpecificFile(self, specific_file_name, feature_selector_name, feature_number, classifier_name):
+        '''
+        Find the result file of the pipeline with the first normalizer and the first dimension reduction in the result
+        index.
+        '''
+        key = ResultIndex.GetKey(self._fae.GetNormalizerList()[0].GetName(),
+                                 self._fae.GetDimensionReductionList()[0].GetName(),
+                                 feature_selector_name, feature_number, classifier_name)
+        return self._result_index.GetFilePath(key, specific_file_name)
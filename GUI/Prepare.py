@@ -109,10 +109,8 @@ class Ui_Prepare(object):
         self.buttonSave.setObjectName("buttonSave")
         self.verticalLayout.addWidget(self.buttonSave)
         self.horizontalLayout.addLayout(self.verticalLayout)
-        self.tableFeature = QtWidgets.QTableWidget(Prepare)
+        self.tableFeature = QtWidgets.QTableView(Prepare)
         self.tableFeature.setObjectName("tableFeature")
-        self.tableFeature.setColumnCount(0)
-        self.tableFeature.setRowCount(0)
         self.horizontalLayout.addWidget(self.tableFeature)
         self.totalLayout.addLayout(self.horizontalLayout, 0, 0, 1, 1)
 
@@ -198,6 +198,17 @@ class Ui_Process(object):
         self.buttonRun.setMinimumSize(QtCore.QSize(0, 50))
         self.buttonRun.setObjectName("buttonRun")
         self.verticalLayout.addWidget(self.buttonRun)
+        self.horizontalLayoutRunControl = QtWidgets.QHBoxLayout()
+        self.horizontalLayoutRunControl.setObjectName("horizontalLayoutRunControl")
+        self.buttonPause = QtWidgets.QPushButton(Process)
+        self.buttonPause.setEnabled(False)
+        self.buttonPause.setObjectName("buttonPause")
+        self.horizontalLayoutRunControl.addWidget(self.buttonPause)
+        self.buttonCancel = QtWidgets.QPushButton(Process)
+        self.buttonCancel.setEnabled(False)
+        self.buttonCancel.setObjectName("buttonCancel")
+        self.horizontalLayoutRunControl.addWidget(self.buttonCancel)
+        self.verticalLayout.addLayout(self.horizontalLayoutRunControl)
         self.horizontalLayout_5.addLayout(self.verticalLayout)
         self.verticalLayout_2 = QtWidgets.QVBoxLayout()
         self.verticalLayout_2.setObjectName("verticalLayout_2")
@@ -274,6 +285,8 @@ class Ui_Process(object):
         self.radio5folder.setText(_translate("Process", "5-Folder"))
         self.radio10Folder.setText(_translate("Process", "10-Folder"))
         self.buttonRun.setText(_translate("Process", "Run and Save"))
+        self.buttonPause.setText(_translate("Process", "Pause"))
+        self.buttonCancel.setText(_translate("Process", "Cancel"))
         self.label_5.setText(_translate("Process", "Pipeline Description:"))
         self.label_3.setText(_translate("Process", "Data Description"))
         self.label_4.setText(_translate("Process", "Verbose"))
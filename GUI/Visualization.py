@@ -48,6 +48,12 @@ class Ui_Visualization(object):
         self.comboSheet = QtWidgets.QComboBox(Visualization)
         self.comboSheet.setObjectName("comboSheet")
         self.verticalLayout_2.addWidget(self.comboSheet)
+        self.labelSheetFilter = QtWidgets.QLabel(Visualization)
+        self.labelSheetFilter.setObjectName("labelSheetFilter")
+        self.verticalLayout_2.addWidget(self.labelSheetFilter)
+        self.lineEditSheetFilter = QtWidgets.QLineEdit(Visualization)
+        self.lineEditSheetFilter.setObjectName("lineEditSheetFilter")
+        self.verticalLayout_2.addWidget(self.lineEditSheetFilter)
         spacerItem = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
         self.verticalLayout_2.addItem(spacerItem)
         self.label = QtWidgets.QLabel(Visualization)
@@ -59,10 +65,8 @@ class Ui_Visualization(object):
         spacerItem1 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
         self.verticalLayout_2.addItem(spacerItem1)
         self.horizontalLayout.addLayout(self.verticalLayout_2)
-        self.tableClinicalStatistic = QtWidgets.QTableWidget(Visualization)
+        self.tableClinicalStatistic = QtWidgets.QTableView(Visualization)
         self.tableClinicalStatistic.setObjectName("tableClinicalStatistic")
-        self.tableClinicalStatistic.setColumnCount(0)
-        self.tableClinicalStatistic.setRowCount(0)
         self.horizontalLayout.addWidget(self.tableClinicalStatistic)
         self.horizontalLayout_2.addLayout(self.horizontalLayout)
         self.horizontalLayout_2.setStretch(1, 2)
@@ -214,6 +218,7 @@ class Ui_Visualization(object):
         self.buttonClearResult.setText(_translate("Visualization", "Clear"))
         self.buttonSave.setText(_translate("Visualization", "Save Figure"))
         self.label_7.setText(_translate("Visualization", "Show:"))
+        self.labelSheetFilter.setText(_translate("Visualization", "Filter:"))
         self.label.setText(_translate("Visualization", "Maximum AUC along:"))
         self.checkMaxFeatureNumber.setText(_translate("Visualization", "Feature Number"))
         self.label_2.setText(_translate("Visualization", "ROC Curve"))